@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import LLMCallMetric
 
-# Register your models here.
+
+class LLMCallMetricAdmin(admin.ModelAdmin):
+    list_display = (
+        "started_at", "chain", "model", "wall_ms", "queue_wait_ms",
+        "input_tokens", "output_tokens", "retries", "cache_hit", "json_repair", "success",
+    )
+    list_filter = ("chain", "model", "cache_hit", "json_repair", "success")
+    date_hierarchy = "started_at"
+    ordering = ("-started_at",)
+
+
+admin.site.register(LLMCallMetric, LLMCallMetricAdmin)
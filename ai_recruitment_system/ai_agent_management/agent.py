@@ -1,6 +1,14 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+import asyncio
+import time
 from .ai_models import AIConfigManager
-from .utils import TextExtractor, ChainBuilder
+from .cache import LLMResponseCache
+from .dispatch import AsyncLLMDispatcher, ChainCall, DispatchResult
+from .rate_limit import rate_limiter
+from .routing import HedgedRouter, LengthRouter
+from .streaming_json import IncrementalJSONParser
+from .telemetry import needs_json_repair, telemetry
+from .utils import TextExtractor, ChainBuilder, estimate_tokens, load_llm_json
 import os
 
 
@@ -11,6 +19,11 @@ class AIAgent:
         self.config_manager = AIConfigManager()
         self.chain_builder = ChainBuilder(self.config_manager)
         self.text_extractor = TextExtractor()
+        self.response_cache = LLMResponseCache()
+        self.rate_limiter = rate_limiter
+        self.telemetry = telemetry
+        self.router = HedgedRouter(self)
+        self.length_router = LengthRouter()
 
         # Update API key if provided
         if api_key:
@@ -24,39 +37,300 @@ class AIAgent:
         """Update model configuration"""
         self.config_manager.update_config(config_name, **kwargs)
 
-    def parse_cv(self, cv_text: str, use_fast_model: bool = False) -> Dict[str, Any]:
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the LLM response cache"""
+        return self.response_cache.stats()
 
+    def _cache_key(self, chain, inputs: Dict[str, Any]) -> str:
+        config_name = (chain.metadata or {}).get("config_name", "")
+        config = self.config_manager.configs.get(config_name)
+        return LLMResponseCache.make_key(
+            config_name=config_name,
+            model_name=config.model_name if config else "",
+            temperature=config.temperature if config else None,
+            template=chain.prompt.template,
+            inputs=inputs,
+        )
+
+    def _quota_request(self, chain, inputs: Dict[str, Any]):
+        config = self.config_manager.configs.get(
+            (chain.metadata or {}).get("config_name", "")
+        )
+        tokens = estimate_tokens(chain.prompt.template) + sum(
+            estimate_tokens(value) for value in inputs.values()
+        )
+        return config, tokens
+
+    def _acquire_quota(self, chain, inputs: Dict[str, Any]) -> float:
+        """Wait for provider quota before an LLM call"""
+        config, tokens = self._quota_request(chain, inputs)
+        if config is None:
+            return 0.0
+        return self.rate_limiter.acquire_for_config(config, tokens)
+
+    async def _aacquire_quota(self, chain, inputs: Dict[str, Any]) -> float:
+        config, tokens = self._quota_request(chain, inputs)
+        if config is None:
+            return 0.0
+        return await self.rate_limiter.aacquire_for_config(config, tokens)
+
+    def _record_call(
+        self,
+        chain,
+        inputs: Dict[str, Any],
+        started: float,
+        output: Optional[str] = None,
+        error: Optional[str] = None,
+        cache_hit: bool = False,
+        queue_wait: float = 0.0,
+        retries: int = 0,
+        streamed: bool = False,
+    ):
+        """Hand one chain invocation to the call telemetry"""
+        config_name = (chain.metadata or {}).get("config_name", "")
+        config, input_tokens = self._quota_request(chain, inputs)
+        elapsed = time.monotonic() - started
+        if error is None and not cache_hit and not streamed:
+            self.length_router.observe(config_name, input_tokens, elapsed - queue_wait)
+        self.telemetry.record(
+            chain=(chain.metadata or {}).get("chain", config_name),
+            config_name=config_name,
+            model=config.model_name if config else "",
+            provider=config.provider if config else "",
+            wall_ms=elapsed * 1000,
+            queue_wait_ms=queue_wait * 1000,
+            input_tokens=input_tokens,
+            output_tokens=estimate_tokens(output),
+            retries=retries,
+            cache_hit=cache_hit,
+            streamed=streamed,
+            json_repair=needs_json_repair(output),
+            success=error is None,
+            error=error,
+        )
+
+    @staticmethod
+    def _cacheable(chain, output) -> bool:
+        """Keep empty, truncated or otherwise unparseable outputs out of the cache"""
+        if not isinstance(output, str) or not output.strip():
+            return False
+        if not (getattr(chain, "metadata", None) or {}).get("json_output"):
+            return True
         try:
+            load_llm_json(output)
+        except ValueError:
+            return False
+        return True
 
-            cleaned_text = TextExtractor.clean_text(cv_text)
+    def _run_chain(self, chain, use_cache: bool = True, **inputs) -> str:
+        """Run a chain, hedged and circuit-broken when AI_ROUTING has an SLO for it"""
+        if self.router.policy(chain) is None:
+            return self._call_chain(chain, use_cache, **inputs)
+        return self.router.run(
+            chain, lambda target, **kwargs: self._call_chain(target, use_cache, **kwargs), inputs
+        )
 
-            # Choose model based on text length
-            if len(cleaned_text) > 5000:
-                use_fast_model = True
+    def _call_chain(self, chain, use_cache: bool = True, **inputs) -> str:
+        """Run a chain, serving identical invocations from the response cache"""
+        started = time.monotonic()
+        key = None
+        if use_cache:
+            key = self._cache_key(chain, inputs)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._record_call(chain, inputs, started, cached, cache_hit=True)
+                return cached
+        else:
+            self.response_cache.record_bypass()
+
+        waited = self._acquire_quota(chain, inputs)
+        try:
+            result = chain.run(**inputs)
+        except Exception as e:
+            self._record_call(chain, inputs, started, error=str(e), queue_wait=waited)
+            raise
+        self._record_call(chain, inputs, started, result, queue_wait=waited)
+        if key is not None and self._cacheable(chain, result):
+            self.response_cache.set(key, result)
+        return result
+
+    async def _arun_chain(
+        self,
+        chain,
+        use_cache: bool = True,
+        timeout: Optional[float] = None,
+        attempt: int = 1,
+        **inputs,
+    ) -> str:
+        """Async counterpart of _run_chain; timeout covers the LLM call only.
+
+        attempt is the dispatcher's attempt number, recorded as retries.
+        """
+        started = time.monotonic()
+        key = None
+        if use_cache:
+            key = self._cache_key(chain, inputs)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._record_call(chain, inputs, started, cached, cache_hit=True)
+                return cached
+        else:
+            self.response_cache.record_bypass()
+
+        waited = await self._aacquire_quota(chain, inputs)
+        try:
+            result = await asyncio.wait_for(chain.arun(**inputs), timeout)
+        except Exception as e:
+            error = f"timed out after {timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            self._record_call(
+                chain, inputs, started, error=error, queue_wait=waited, retries=attempt - 1
+            )
+            raise
+        self._record_call(
+            chain, inputs, started, result, queue_wait=waited, retries=attempt - 1
+        )
+        if key is not None and self._cacheable(chain, result):
+            self.response_cache.set(key, result)
+        return result
+
+    def stream_chain(self, chain, use_cache: bool = True, **inputs) -> Iterator[str]:
+        """Run a chain and yield the model output as it is generated"""
+        started = time.monotonic()
+        key = None
+        if use_cache:
+            key = self._cache_key(chain, inputs)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._record_call(chain, inputs, started, cached, cache_hit=True, streamed=True)
+                yield cached
+                return
+        else:
+            self.response_cache.record_bypass()
+
+        waited = self._acquire_quota(chain, inputs)
+        parts = []
+        try:
+            for chunk in chain.llm.stream(chain.prompt.format(**inputs)):
+                text = getattr(chunk, "content", chunk)
+                if not text:
+                    continue
+                parts.append(text)
+                yield text
+        except Exception as e:
+            self._record_call(
+                chain, inputs, started, "".join(parts), error=str(e), queue_wait=waited, streamed=True
+            )
+            raise
+        result = "".join(parts)
+        self._record_call(chain, inputs, started, result, queue_wait=waited, streamed=True)
+        if key is not None and self._cacheable(chain, result):
+            self.response_cache.set(key, result)
+
+    def stream_questions(
+        self,
+        question_type: str,
+        applications_data: Dict[str, Any],
+        num_questions: int,
+        use_cache: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield each generated question as soon as the model closes it"""
+        chain = self.chain_builder.create_question_generation_chain(question_type)
+        parser = IncrementalJSONParser("questions")
+        for text in self.stream_chain(
+            chain,
+            use_cache,
+            applications_data=applications_data,
+            num_questions=num_questions,
+        ):
+            yield from parser.feed(text)
+
+    def run_batch(self, calls: Iterable[ChainCall], **options) -> Iterator[DispatchResult]:
+        """Run chain calls concurrently, yielding results as they complete.
+
+        options are passed to AsyncLLMDispatcher (concurrency, timeout,
+        retries, backoff).
+        """
+        return AsyncLLMDispatcher(self, **options).iter_results(calls)
+
+    def screening_call(
+        self, key, applications_data, use_fast_model: bool = False, use_cache: bool = True
+    ) -> ChainCall:
+        """Build a batchable candidate screening call"""
+        chain = self.chain_builder.create_candidates_screening_chain(use_fast_model)
+        return ChainCall(
+            key=key,
+            chain=chain,
+            inputs={"applications_data": applications_data},
+            use_cache=use_cache,
+        )
+
+    def question_generation_call(
+        self,
+        key,
+        question_type: str,
+        applications_data: Dict[str, Any],
+        num_questions: int,
+        use_cache: bool = True,
+    ) -> ChainCall:
+        """Build a batchable question generation call"""
+        chain = self.chain_builder.create_question_generation_chain(question_type)
+        return ChainCall(
+            key=key,
+            chain=chain,
+            inputs={
+                "applications_data": applications_data,
+                "num_questions": num_questions,
+            },
+            use_cache=use_cache,
+        )
+
+    def parse_cv(
+        self, cv_text: str, use_fast_model: bool = False, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Parse a CV on the config the length router picks for its size.
+
+        use_fast_model restricts the choice to the fast config. Documents too
+        long for every config are compressed by section instead of truncated.
+        """
+        try:
+
+            template_name = "get_cv_parsing_template"
+            route, cleaned_text = self.length_router.choose(
+                "cv_parsing",
+                TextExtractor.clean_text(cv_text, max_length=None, keep_lines=True),
+                reserved_tokens=estimate_tokens(
+                    self.chain_builder.get_template(template_name).template
+                ),
+                configs=["fast_parser"] if use_fast_model else None,
+            )
 
             # Create and run parsing chain
-            chain = self.chain_builder.create_cv_parsing_chain(use_fast_model)
-            result = chain.run(cv_text=cleaned_text)
+            chain = self.chain_builder.get_chain(route.config_name, template_name)
+            with self.telemetry.route(route.label):
+                result = self._run_chain(chain, use_cache, cv_text=cleaned_text)
 
             return {
                 "success": True,
                 "parsed_data": result,
                 "text_length": len(cleaned_text),
-                "model_used": "fast" if use_fast_model else "detailed",
+                "model_used": "fast" if route.config_name == "fast_parser" else "detailed",
+                "route": route.as_dict(),
             }
 
         except Exception as e:
             return {"success": False, "error": str(e), "parsed_data": {}}
 
     def screen_applications(
-        self, applications_data, use_fast_model: bool = False
+        self, applications_data, use_fast_model: bool = False, use_cache: bool = True
     ) -> Dict[str, Any]:
 
         try:
 
             # Create and run parsing chain
             chain = self.chain_builder.create_candidates_screening_chain(use_fast_model)
-            result = chain.run(applications_data=applications_data)
+            result = self._run_chain(
+                chain, use_cache, applications_data=applications_data
+            )
 
             return {
                 "success": True,
@@ -69,15 +343,22 @@ class AIAgent:
             return {"success": False, "error": str(e), "parsed_data": {}}
 
     def generate_questions(
-        self, question_type: str, applications_data: Dict[str, Any], num_questions: int
+        self,
+        question_type: str,
+        applications_data: Dict[str, Any],
+        num_questions: int,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """Generate interview questions based on CV data"""
         try:
 
             # Create and run question generation chain
             chain = self.chain_builder.create_question_generation_chain(question_type)
-            result = chain.run(
-                applications_data=applications_data, num_questions=num_questions
+            result = self._run_chain(
+                chain,
+                use_cache,
+                applications_data=applications_data,
+                num_questions=num_questions,
             )
 
             return {"success": True, "questions": result}
@@ -94,7 +375,8 @@ class AIAgent:
         previous_questions,
         exam_duration,
         current_time,
-        physical_appearance
+        physical_appearance,
+        use_cache: bool = False,
     ) -> Dict[str, Any]:
         """Generate interview questions based on CV data"""
         try:
@@ -110,7 +392,9 @@ class AIAgent:
                 current_time,
                 physical_appearance
             )
-            result = chain.run(
+            result = self._run_chain(
+                chain,
+                use_cache,
                 company_info=company_info,
                 job_description=job_description,
                 cv_content=cv_content,
@@ -1,10 +1,12 @@
 import os
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+import threading
+from dataclasses import astuple, dataclass
+from typing import Dict, Any, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_community.llms import Ollama
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import BaseOutputParser
+from django.conf import settings
 import json
 
 
@@ -20,6 +22,21 @@ class ModelConfig:
     frequency_penalty: float = 0.0
     presence_penalty: float = 0.0
     timeout: int = 60
+    requests_per_minute: Optional[int] = None  # provider quota, shared per model
+    tokens_per_minute: Optional[int] = None
+
+
+# Per-process registry of configured model clients. Entries are keyed by the
+# full config so a client is only rebuilt when one of its fields changes, and
+# reusing the instance keeps its HTTP connection pool alive between calls.
+_client_registry: Dict[Tuple, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def clear_client_registry():
+    """Drop every pooled model client (and the chains built on them)"""
+    with _registry_lock:
+        _client_registry.clear()
 
 
 class AIConfigManager:
@@ -57,6 +74,14 @@ class AIConfigManager:
                 temperature=0.1,
                 max_tokens=10000,  # Increased from 2000 to 4000
             ),
+            # Local model raced against interview_question_generator by the router
+            "interview_fallback": ModelConfig(
+                provider="ollama",
+                model_name=os.getenv("AI_FALLBACK_MODEL", "llama3.1:8b"),
+                temperature=0.1,
+                max_tokens=2000,
+                timeout=30,
+            ),
             "gemini_question_generator": ModelConfig(
                 provider="google",
                 model_name="gemini-2.5-flash",
@@ -64,9 +89,57 @@ class AIConfigManager:
                 max_tokens=10000,  # Increased from 2000 to 4000
             ),
         }
+        self.apply_provider_override()
+        self.apply_provider_quotas()
+
+    def apply_provider_override(self):
+        """Point every config at settings.AI_PROVIDER_OVERRIDE (e.g. local_fake)"""
+        override = getattr(settings, "AI_PROVIDER_OVERRIDE", None)
+        if override:
+            for config in self.configs.values():
+                config.provider = override
+
+    def apply_provider_quotas(self):
+        """Apply per provider/model rate limits from settings.AI_PROVIDER_QUOTAS"""
+        quotas = getattr(settings, "AI_PROVIDER_QUOTAS", {})
+        for config in self.configs.values():
+            quota = quotas.get(f"{config.provider}:{config.model_name}", {})
+            for key, value in quota.items():
+                if hasattr(config, key) and getattr(config, key) is None:
+                    setattr(config, key, value)
+
+    def fingerprint(self, config_name: str) -> Tuple:
+        """Hashable snapshot of a config, used to key pooled clients and chains"""
+        return (config_name,) + astuple(self.configs[config_name])
 
     def get_model(self, config_name: str, **kwargs) -> ChatOpenAI:
-        """Get configured LLM instance"""
+        """Get the pooled LLM instance for a config, building it on first use"""
+        try:
+            key = (self.fingerprint(config_name), tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Unhashable overrides (e.g. callback lists) get a private client
+            return self.build_model(config_name, **kwargs)
+
+        return self.pooled(key, lambda: self.build_model(config_name, **kwargs))
+
+    def pooled(self, key: Tuple, factory):
+        """Return the registry entry for key, creating it with factory() once.
+
+        Keys must contain the owning config's fingerprint so that
+        update_config can evict them.
+        """
+        value = _client_registry.get(key)
+        if value is None:
+            with _registry_lock:
+                value = _client_registry.get(key)
+                if value is None:
+                    value = factory()
+                    _client_registry[key] = value
+        return value
+
+    def build_model(self, config_name: str, **kwargs) -> ChatOpenAI:
+        """Construct a new LLM instance for a config"""
         config = self.configs[config_name]
 
         if config.provider == "openai":
@@ -87,6 +160,13 @@ class AIConfigManager:
                 num_predict=config.max_tokens,
                 **kwargs,
             )
+        elif config.provider == "local_fake":
+            from .fake_llm import LocalFakeChatModel
+
+            return LocalFakeChatModel(
+                model_name=config.model_name,
+                **{**getattr(settings, "AI_LOCAL_FAKE", {}), **kwargs},
+            )
         elif config.provider == "google":
             return ChatGoogleGenerativeAI(
                 model=config.model_name,
@@ -103,10 +183,20 @@ class AIConfigManager:
     def update_config(self, config_name: str, **kwargs):
         """Update model configuration"""
         if config_name in self.configs:
+            previous = self.fingerprint(config_name)
             for key, value in kwargs.items():
                 if hasattr(self.configs[config_name], key):
                     setattr(self.configs[config_name], key, value)
+            if self.fingerprint(config_name) != previous:
+                self._evict(previous)
+
+    def _evict(self, fingerprint: Tuple):
+        with _registry_lock:
+            for key in [k for k in _client_registry if fingerprint in k]:
+                del _client_registry[key]
 
     def add_config(self, config_name: str, config: ModelConfig):
         """Add a new model configuration"""
         self.configs[config_name] = config
+        self.apply_provider_override()
+        self.apply_provider_quotas()
@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, List, Optional
+from .utils import estimate_tokens
+
+
+class TokenBudgetBatcher:
+    """Pack prompt items into groups that fit a model's token budget.
+
+    Each group stays under max_tokens of estimated input and holds at most
+    max_items entries, which bounds the size of the JSON the model has to
+    produce for it. Items are packed in the given order so callers can keep
+    related items (e.g. applications to the same job) together.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        max_items: Optional[int] = None,
+        reserved_tokens: int = 0,
+        estimator: Callable[[Any], int] = estimate_tokens,
+    ):
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.reserved_tokens = reserved_tokens
+        self.estimator = estimator
+
+    @property
+    def budget(self) -> int:
+        return max(1, self.max_tokens - self.reserved_tokens)
+
+    def pack(self, items: List[Any]) -> List[List[Any]]:
+        """Split items into groups that respect the token and size budgets"""
+        groups: List[List[Any]] = []
+        current: List[Any] = []
+        used = 0
+
+        for item in items:
+            cost = self.estimator(item)
+            full = self.max_items is not None and len(current) >= self.max_items
+            if current and (used + cost > self.budget or full):
+                groups.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+
+        if current:
+            groups.append(current)
+        return groups
+
+
+def fit_application_to_budget(
+    application: Dict[str, Any], budget: int, field: str = "cv_content"
+) -> Dict[str, Any]:
+    """Shorten one oversized application so it fits a group on its own"""
+    overflow = estimate_tokens(application) - budget
+    if overflow <= 0 or not application.get(field):
+        return application
+
+    text = application[field]
+    keep = max(0, len(text) - overflow * 4)
+    return {**application, field: text[:keep]}
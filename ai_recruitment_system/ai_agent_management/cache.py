@@ -0,0 +1,222 @@
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from django.conf import settings
+from .redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SETTINGS = {
+    "ENABLED": True,
+    "TTL": 60 * 60 * 24 * 7,  # one week
+    "MAX_ENTRIES": 20000,  # shared Redis entries
+    "LOCAL_MAX_ENTRIES": 512,  # in-process LRU entries
+    "MAX_VALUE_BYTES": 512 * 1024,  # responses bigger than this are not cached
+    "KEY_PREFIX": "ai:llm_cache",
+    # Shared hit/miss counters are summed in process and written to Redis at
+    # most every STATS_FLUSH_INTERVAL seconds, so lookups stay off the network
+    "STATS_FLUSH_INTERVAL": 10.0,
+}
+
+
+class LLMResponseCache:
+    """Content-addressed cache for LLM chain outputs.
+
+    Entries are keyed by a hash of (config name, model, temperature, template,
+    rendered inputs). Lookups go through an in-process LRU first and then the
+    shared Redis backend, so identical prompts never pay for a second LLM
+    round-trip while the entry is alive.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {
+            **DEFAULT_CACHE_SETTINGS,
+            **getattr(settings, "AI_LLM_CACHE", {}),
+            **(options or {}),
+        }
+        self.enabled = self.options["ENABLED"]
+        self.ttl = self.options["TTL"]
+        self.max_entries = self.options["MAX_ENTRIES"]
+        self.local_max_entries = self.options["LOCAL_MAX_ENTRIES"]
+        self.max_value_bytes = self.options["MAX_VALUE_BYTES"]
+        self.prefix = self.options["KEY_PREFIX"]
+
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "local_hits": 0, "misses": 0, "sets": 0, "bypassed": 0}
+        self._unflushed: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+        self.stats_flush_interval = self.options["STATS_FLUSH_INTERVAL"]
+        atexit.register(self.flush_stats)
+
+    @staticmethod
+    def make_key(
+        config_name: str,
+        model_name: str,
+        temperature: float,
+        template: str,
+        inputs: Dict[str, Any],
+    ) -> str:
+        """Build the content hash for a chain invocation"""
+        payload = json.dumps(
+            {
+                "config": config_name,
+                "model": model_name,
+                "temperature": temperature,
+                "template": template,
+                "inputs": inputs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.time():
+                    self._local.move_to_end(key)
+                    self._record("hits", "local_hits")
+                    return value
+                del self._local[key]
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                value = client.get(self._redis_key(key))
+                if value is not None:
+                    value = value.decode("utf-8")
+                    ttl = client.ttl(self._redis_key(key))
+                    self._store_local(key, value, ttl if ttl and ttl > 0 else self.ttl)
+                    self._record("hits")
+                    return value
+            except Exception as e:
+                logger.warning("LLM cache read failed: %s", e)
+
+        self._record("misses")
+        return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        """Store an LLM output under key"""
+        if not self.enabled or not isinstance(value, str):
+            return
+        if len(value.encode("utf-8")) > self.max_value_bytes:
+            return
+
+        ttl = ttl or self.ttl
+        self._store_local(key, value, ttl)
+        self._record("sets")
+
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            index_key = f"{self.prefix}:index"
+            pipe = client.pipeline()
+            pipe.set(self._redis_key(key), value, ex=ttl)
+            pipe.zadd(index_key, {key: time.time()})
+            pipe.zcard(index_key)
+            size = pipe.execute()[-1]
+
+            # Size-based eviction: drop the oldest entries above the limit
+            overflow = size - self.max_entries
+            if overflow > 0:
+                stale = client.zrange(index_key, 0, overflow - 1)
+                if stale:
+                    pipe = client.pipeline()
+                    pipe.delete(*[self._redis_key(k.decode("utf-8")) for k in stale])
+                    pipe.zrem(index_key, *stale)
+                    pipe.execute()
+        except Exception as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def record_bypass(self):
+        """Count a call that skipped the cache on request"""
+        self._record("bypassed")
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._local.clear()
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            index_key = f"{self.prefix}:index"
+            keys = client.zrange(index_key, 0, -1)
+            if keys:
+                client.delete(*[self._redis_key(k.decode("utf-8")) for k in keys])
+            client.delete(index_key)
+        except Exception as e:
+            logger.warning("LLM cache clear failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and, when available, all workers"""
+        self.flush_stats()
+        with self._lock:
+            local = dict(self._stats)
+            local["local_entries"] = len(self._local)
+
+        result = {"process": local}
+        client = get_redis_client()
+        if client is not None:
+            try:
+                shared = client.hgetall(f"{self.prefix}:stats")
+                result["shared"] = {k.decode(): int(v) for k, v in shared.items()}
+                result["shared"]["entries"] = client.zcard(f"{self.prefix}:index")
+            except Exception as e:
+                logger.warning("LLM cache stats unavailable: %s", e)
+
+        lookups = local["hits"] + local["misses"]
+        result["hit_rate"] = round(local["hits"] / lookups, 4) if lookups else 0.0
+        return result
+
+    def _store_local(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._local[key] = (value, time.time() + ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _record(self, *counters: str):
+        with self._lock:
+            for counter in counters:
+                self._stats[counter] += 1
+                self._unflushed[counter] = self._unflushed.get(counter, 0) + 1
+            due = time.monotonic() - self._flushed_at >= self.stats_flush_interval
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Add the counters recorded since the last flush to the shared Redis hash"""
+        with self._lock:
+            pending, self._unflushed = self._unflushed, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            for counter, amount in pending.items():
+                pipe.hincrby(f"{self.prefix}:stats", counter, amount)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Could not flush LLM cache stats: %s", e)
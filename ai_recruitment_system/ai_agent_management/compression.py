@@ -0,0 +1,209 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+
+# Section kinds by keep priority: core sections are kept longest, boilerplate
+# is dropped as soon as a document is over budget.
+CORE = 0
+HEADER = 1
+USEFUL = 2
+BOILERPLATE = 3
+
+SECTION_KEYWORDS = [
+    ("experience", CORE, r"experience|employment|work history|career history|professional background"),
+    ("skills", CORE, r"skills|technologies|competencies|tech stack|expertise|tools"),
+    ("education", CORE, r"education|academic|qualifications|degrees?"),
+    ("summary", USEFUL, r"summary|profile|objective|about me"),
+    ("projects", USEFUL, r"projects?|portfolio"),
+    ("certifications", USEFUL, r"certifications?|certificates|licen[cs]es|training|courses"),
+    ("achievements", USEFUL, r"achievements|awards|honou?rs|publications"),
+    ("languages", USEFUL, r"languages"),
+    ("references", BOILERPLATE, r"references|referees"),
+    ("interests", BOILERPLATE, r"hobbies|interests|extracurricular"),
+    ("personal", BOILERPLATE, r"personal (?:details|information|data)|declaration"),
+]
+HEADING = [
+    (name, kind, re.compile(rf"^(?:[a-z&/]+\s+){{0,2}}(?:{words})(?:\s+[a-z&/]+){{0,2}}$"))
+    for name, kind, words in SECTION_KEYWORDS
+]
+# "Page 2", "Page 2 of 3", "Page 2/3", "2 of 3" - never a date range like "09/2019"
+PAGE_MARKER = re.compile(r"^(?:page\s+\d+(?:\s*(?:/|of)\s*\d+)?|\d+\s+of\s+\d+)$", re.IGNORECASE)
+# Lines this close to a page break are candidates for running headers/footers
+PAGE_EDGE_LINES = 2
+HEADER_MAX_CHARS = 400
+TRIM_MARKER = "[...]"
+
+
+@dataclass
+class Section:
+    name: str
+    kind: int
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(len(line) + 1 for line in self.lines)
+
+
+def split_pages(text: str) -> List[List[str]]:
+    """Whitespace-collapsed, non-blank lines per page.
+
+    Pages break at form feeds and after explicit page markers, which are
+    themselves dropped.
+    """
+    pages = [[]]
+    for raw_page in text.split("\f"):
+        for raw in raw_page.splitlines():
+            line = re.sub(r"\s+", " ", raw).strip()
+            if not line:
+                continue
+            if PAGE_MARKER.match(line):
+                pages.append([])
+                continue
+            pages[-1].append(line)
+        pages.append([])
+    return [page for page in pages if page]
+
+
+def running_lines(pages: List[List[str]]) -> set:
+    """Lines found at the top or bottom edge of two or more pages"""
+    counts = {}
+    for page in pages:
+        edges = set(page[:PAGE_EDGE_LINES]) | set(page[-PAGE_EDGE_LINES:])
+        for line in edges:
+            counts[line] = counts.get(line, 0) + 1
+    return {line for line, count in counts.items() if count > 1}
+
+
+def normalise_lines(text: str) -> List[str]:
+    """Collapse whitespace per line, dropping blank lines, page markers and running headers/footers.
+
+    Only the repeats of a header/footer at page edges are dropped; the same
+    line inside a page body (a second "Software Engineer") is kept.
+    """
+    pages = split_pages(text)
+    running = running_lines(pages) if len(pages) > 1 else set()
+    lines, seen = [], set()
+    for page in pages:
+        last = len(page) - 1
+        for index, line in enumerate(page):
+            at_edge = index < PAGE_EDGE_LINES or last - index < PAGE_EDGE_LINES
+            if at_edge and line in running:
+                if line in seen:
+                    continue
+                seen.add(line)
+            lines.append(line)
+    return lines
+
+
+def heading_kind(line: str):
+    """(name, kind) when line is a recognised section heading"""
+    if len(line) > 50 or line.endswith("."):
+        return None
+    words = re.sub(r"[^a-z&/ ]", " ", line.lower()).split()
+    candidate = " ".join(words)
+    for name, kind, pattern in HEADING:
+        if pattern.match(candidate):
+            return name, kind
+    return None
+
+
+def split_sections(lines: List[str]) -> List[Section]:
+    sections = [Section("header", HEADER)]
+    for line in lines:
+        heading = heading_kind(line)
+        if heading:
+            sections.append(Section(heading[0], heading[1], [line]))
+        else:
+            sections[-1].lines.append(line)
+    if len(sections) == 1:
+        # No recognisable structure: treat the whole document as core text
+        sections[0].kind = CORE
+        sections[0].name = "body"
+    return [s for s in sections if s.lines]
+
+
+def trim(section: Section, limit: int) -> bool:
+    """Keep the leading lines of section within limit chars; True if anything was cut"""
+    if section.size <= limit:
+        return False
+    kept, used = [], len(TRIM_MARKER) + 1
+    for line in section.lines:
+        if used + len(line) + 1 > limit:
+            room = limit - used - 1
+            # Cut an oversized first line at a word boundary rather than losing it
+            if not kept and room > 40:
+                kept.append(line[:room].rsplit(" ", 1)[0])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    section.lines = kept + [TRIM_MARKER]
+    return True
+
+
+def allocate(sizes: List[int], budget: int) -> List[int]:
+    """Max-min fair split of budget: small sections stay whole, big ones share the rest"""
+    shares = [0] * len(sizes)
+    left, count = budget, len(sizes)
+    for index in sorted(range(len(sizes)), key=lambda i: sizes[i]):
+        shares[index] = min(sizes[index], left // count)
+        left -= shares[index]
+        count -= 1
+    return shares
+
+
+def has_content(section: Section) -> bool:
+    body = section.lines if section.kind == HEADER or section.name == "body" else section.lines[1:]
+    return any(line != TRIM_MARKER for line in body)
+
+
+def compress_document(text: str, max_chars: int) -> Tuple[str, Dict[str, Any]]:
+    """Fit a CV into max_chars without blind truncation.
+
+    Text that already fits is returned unchanged. Otherwise whitespace,
+    page markers and repeated header/footer lines are removed first. If that is not enough, boilerplate sections (references, hobbies,
+    personal details) are dropped, then the remaining budget is filled by
+    priority - experience, skills and education, then the contact header,
+    then summary/projects/certifications. A tier that does not fit whole
+    keeps its small sections intact and trims the big ones to their
+    leading lines.
+    """
+    original = len(text)
+    info = {"original_chars": original, "compressed": False, "dropped": [], "trimmed": []}
+    if original <= max_chars:
+        info["chars"] = original
+        return text, info
+
+    lines = normalise_lines(text)
+    sections = split_sections(lines)
+
+    if sum(s.size for s in sections) > max_chars:
+        info["compressed"] = True
+        remaining = max_chars
+        for kind in (CORE, HEADER, USEFUL, BOILERPLATE):
+            tier = [s for s in sections if s.kind == kind]
+            if not tier:
+                continue
+            if kind == BOILERPLATE or remaining <= 0:
+                info["dropped"].extend(s.name for s in tier)
+                sections = [s for s in sections if s.kind != kind]
+                continue
+            if kind == HEADER:
+                for section in tier:
+                    trim(section, HEADER_MAX_CHARS)
+            if sum(s.size for s in tier) > remaining:
+                shares = allocate([s.size for s in tier], remaining)
+                for section, share in zip(tier, shares):
+                    trim(section, share)
+                    if not has_content(section):
+                        info["dropped"].append(section.name)
+                    elif section.lines[-1] == TRIM_MARKER:
+                        info["trimmed"].append(section.name)
+                tier = [s for s in tier if has_content(s)]
+                sections = [s for s in sections if s.kind != kind or has_content(s)]
+            remaining -= sum(s.size for s in tier)
+
+    output = "\n".join(line for section in sections for line in section.lines)
+    info["chars"] = len(output)
+    return output, info
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DISPATCH_SETTINGS = {
+    "CONCURRENCY": 8,
+    "TIMEOUT": 120,  # seconds per LLM call, excluding rate-limit waits
+    "RETRIES": 2,
+    "BACKOFF": 2.0,  # seconds, doubled after every failed attempt
+}
+
+
+@dataclass
+class ChainCall:
+    """One chain invocation submitted to the dispatcher"""
+
+    key: Any
+    chain: Any
+    inputs: Dict[str, Any]
+    use_cache: bool = True
+
+
+@dataclass
+class DispatchResult:
+    """Outcome of a ChainCall"""
+
+    key: Any
+    success: bool
+    output: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class _Done:
+    pass
+
+
+class AsyncLLMDispatcher:
+    """Fan out chain invocations with bounded concurrency, timeouts and retries.
+
+    Calls run on the LangChain async APIs inside a private event loop, so a
+    single Celery prefork worker can keep a whole batch in flight. Results
+    are yielded in completion order.
+    """
+
+    def __init__(
+        self,
+        agent,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ):
+        options = {**DEFAULT_DISPATCH_SETTINGS, **getattr(settings, "AI_DISPATCH", {})}
+        self.agent = agent
+        self.concurrency = concurrency or options["CONCURRENCY"]
+        self.timeout = timeout or options["TIMEOUT"]
+        self.retries = options["RETRIES"] if retries is None else retries
+        self.backoff = options["BACKOFF"] if backoff is None else backoff
+
+    async def _run_one(self, call: ChainCall, semaphore: asyncio.Semaphore) -> DispatchResult:
+        started = time.monotonic()
+        error = None
+        attempts = 0
+        async with semaphore:
+            while attempts <= self.retries:
+                attempts += 1
+                try:
+                    output = await self.agent._arun_chain(
+                        call.chain,
+                        call.use_cache,
+                        timeout=self.timeout,
+                        attempt=attempts,
+                        **call.inputs,
+                    )
+                    return DispatchResult(
+                        key=call.key,
+                        success=True,
+                        output=output,
+                        attempts=attempts,
+                        elapsed=time.monotonic() - started,
+                    )
+                except asyncio.TimeoutError:
+                    error = f"LLM call timed out after {self.timeout}s"
+                except Exception as e:
+                    error = str(e)
+                logger.warning(
+                    "LLM call %s failed (attempt %s/%s): %s",
+                    call.key, attempts, self.retries + 1, error,
+                )
+                if attempts <= self.retries:
+                    await asyncio.sleep(self.backoff * (2 ** (attempts - 1)))
+
+        return DispatchResult(
+            key=call.key,
+            success=False,
+            error=error,
+            attempts=attempts,
+            elapsed=time.monotonic() - started,
+        )
+
+    async def iter_completed(self, calls: Iterable[ChainCall]) -> AsyncIterator[DispatchResult]:
+        """Async generator yielding results as the calls complete"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._run_one(call, semaphore)) for call in calls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def iter_results(self, calls: Iterable[ChainCall]) -> Iterator[DispatchResult]:
+        """Run calls on a background event loop and yield results as they complete.
+
+        Results are handed back to the calling thread, so callers can use the
+        Django ORM while the rest of the batch is still in flight.
+        """
+        results = queue.Queue()
+        calls = list(calls)
+
+        def runner():
+            async def main():
+                async for result in self.iter_completed(calls):
+                    results.put(result)
+
+            try:
+                asyncio.run(main())
+            except BaseException as e:
+                results.put(e)
+            finally:
+                results.put(_Done)
+
+        thread = threading.Thread(target=runner, name="llm-dispatch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _Done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            thread.join()
+            # Write the calls recorded inside the event loop from this thread
+            self.agent.telemetry.flush()
+
+    def run(self, calls: Iterable[ChainCall]) -> List[DispatchResult]:
+        """Run calls and return all results in completion order"""
+        return list(self.iter_results(calls))
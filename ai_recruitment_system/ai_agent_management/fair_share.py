@@ -0,0 +1,277 @@
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from celery import current_app
+from celery.result import AsyncResult
+from celery.signals import task_postrun
+from django.conf import settings
+from .idempotency import claim_submission
+from .redis_utils import get_redis_client
+from .telemetry import percentile
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_FAIR_SHARE_SETTINGS = {
+    "ENABLED": True,
+    "KEY_PREFIX": "ai:fair",
+    # Tasks dispatched through the scheduler; anything else runs unthrottled
+    "TASKS": [
+        "ai_agent_management.tasks.screen_candidates_applications",
+        "ai_agent_management.tasks.generate_exam_questions",
+    ],
+    "MAX_IN_FLIGHT": 4,  # tasks queued or running on the batch workers, all tenants
+    "TENANT_CAP": 2,  # tasks in flight per tenant
+    "WEIGHT": 1,  # tasks a tenant may start per round-robin turn
+    "TENANTS": {},  # company id -> {"weight": n, "cap": n} overrides
+    "LEASE": 60 * 60 * 2,  # seconds before a slot whose task never reported back is reclaimed
+    "WAIT_SAMPLES": 1000,  # recent queue waits kept per tenant
+}
+
+# Bucket for work that belongs to no company (e.g. an exam without a job)
+DEFAULT_TENANT = "none"
+
+ENQUEUE_SCRIPT = """
+redis.call('RPUSH', KEYS[1], ARGV[2])
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+return redis.call('LLEN', KEYS[1])
+"""
+
+# Weighted round robin over the tenant ring: each turn a tenant starts up to
+# its weight in jobs, bounded by its own cap and the global in-flight limit,
+# then moves to the back of the ring. Returns the job envelopes to publish.
+PUMP_SCRIPT = """
+local p = ARGV[1]
+local now = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local max_in_flight = tonumber(ARGV[4])
+local default_cap = tonumber(ARGV[5])
+local default_weight = tonumber(ARGV[6])
+local tenants = cjson.decode(ARGV[7])
+local ring = p .. ':ring'
+local running = p .. ':running'
+
+redis.call('ZREMRANGEBYSCORE', running, '-inf', now - lease)
+local out = {}
+local idle = 0
+while idle < redis.call('LLEN', ring) and redis.call('ZCARD', running) < max_in_flight do
+    local tenant = redis.call('LPOP', ring)
+    local queue = p .. ':q:' .. tenant
+    local slots = p .. ':running:' .. tenant
+    redis.call('ZREMRANGEBYSCORE', slots, '-inf', now - lease)
+    local override = tenants[tenant] or {}
+    local weight = tonumber(override['weight'] or default_weight)
+    local cap = tonumber(override['cap'] or default_cap)
+
+    local sent = 0
+    while sent < weight and redis.call('ZCARD', slots) < cap
+        and redis.call('ZCARD', running) < max_in_flight do
+        local job = redis.call('LPOP', queue)
+        if not job then
+            break
+        end
+        local task_id = cjson.decode(job)['task_id']
+        redis.call('ZADD', slots, now, task_id)
+        redis.call('ZADD', running, now, task_id)
+        redis.call('HSET', p .. ':tasks', task_id, tenant)
+        table.insert(out, job)
+        sent = sent + 1
+    end
+
+    if redis.call('LLEN', queue) > 0 then
+        redis.call('RPUSH', ring, tenant)
+    else
+        redis.call('SREM', p .. ':members', tenant)
+    end
+    if sent == 0 then
+        idle = idle + 1
+    else
+        idle = 0
+    end
+end
+return out
+"""
+
+RELEASE_SCRIPT = """
+local tenant = redis.call('HGET', KEYS[1], ARGV[2])
+if not tenant then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[2])
+redis.call('ZREM', ARGV[1] .. ':running', ARGV[2])
+redis.call('ZREM', ARGV[1] .. ':running:' .. tenant, ARGV[2])
+return 1
+"""
+
+
+def fair_share_settings() -> Dict[str, Any]:
+    return {**DEFAULT_FAIR_SHARE_SETTINGS, **getattr(settings, "AI_FAIR_SHARE", {})}
+
+
+class FairShareScheduler:
+    """Per-company fair-share admission in front of the batch AI tasks.
+
+    Submissions wait in a Redis list per tenant (company). Jobs are released
+    to Celery by weighted round robin across tenants, never exceeding a
+    tenant's cap or the global in-flight limit, so one company's thousands
+    of screenings cannot hold every batch worker and the provider quota.
+    A slot is freed when its task finishes (task_postrun), which also
+    releases the next jobs. Queue waits are recorded per tenant.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**fair_share_settings(), **(options or {})}
+        self.prefix = self.options["KEY_PREFIX"]
+
+    @property
+    def client(self):
+        return get_redis_client() if self.options["ENABLED"] else None
+
+    def handles(self, task_name: str) -> bool:
+        return task_name in self.options["TASKS"]
+
+    def submit(self, task, company_id, *args, **kwargs) -> AsyncResult:
+        """Queue task(*args, **kwargs) under company_id's share.
+
+        company_id None queues the task in the shared DEFAULT_TENANT bucket.
+
+        Identical submissions attach to the pending one (see idempotency).
+        Falls back to apply_async when Redis is unavailable.
+        """
+        task_id, existing = claim_submission(task, args, kwargs)
+        if existing is not None:
+            return existing
+        client = self.client
+        if client is None or not self.handles(task.name):
+            return task.apply_async(args=args, kwargs=kwargs, task_id=task_id)
+
+        tenant = str(company_id if company_id is not None else DEFAULT_TENANT)
+        job = json.dumps(
+            {
+                "task": task.name,
+                "task_id": task_id,
+                "tenant": tenant,
+                "args": list(args),
+                "kwargs": kwargs,
+                "enqueued_at": time.time(),
+            },
+            default=str,
+        )
+        try:
+            client.eval(
+                ENQUEUE_SCRIPT,
+                3,
+                f"{self.prefix}:q:{tenant}",
+                f"{self.prefix}:members",
+                f"{self.prefix}:ring",
+                tenant,
+                job,
+            )
+        except Exception as e:
+            logger.warning("Fair-share queue unavailable, running %s directly: %s", task.name, e)
+            return task.apply_async(args=args, kwargs=kwargs, task_id=task_id)
+        self.pump()
+        return AsyncResult(task_id, app=task.app)
+
+    def pump(self) -> int:
+        """Publish every job the tenant shares allow right now"""
+        client = self.client
+        if client is None:
+            return 0
+        try:
+            jobs = client.eval(
+                PUMP_SCRIPT,
+                0,
+                self.prefix,
+                time.time(),
+                self.options["LEASE"],
+                self.options["MAX_IN_FLIGHT"],
+                self.options["TENANT_CAP"],
+                self.options["WEIGHT"],
+                json.dumps({str(k): v for k, v in self.options["TENANTS"].items()}),
+            )
+        except Exception as e:
+            logger.warning("Fair-share dispatch failed: %s", e)
+            return 0
+
+        now = time.time()
+        pipe = client.pipeline()
+        for raw in jobs:
+            job = json.loads(raw)
+            tenant = job["tenant"]
+            waited_ms = (now - job["enqueued_at"]) * 1000
+            pipe.lpush(f"{self.prefix}:wait:{tenant}", round(waited_ms, 1))
+            pipe.ltrim(f"{self.prefix}:wait:{tenant}", 0, self.options["WAIT_SAMPLES"] - 1)
+            pipe.hincrby(f"{self.prefix}:stats:{tenant}", "dispatched", 1)
+            pipe.hincrbyfloat(f"{self.prefix}:stats:{tenant}", "waited_ms", waited_ms)
+            try:
+                current_app.send_task(
+                    job["task"], args=job["args"], kwargs=job["kwargs"], task_id=job["task_id"]
+                )
+            except Exception as e:
+                logger.warning("Could not publish %s: %s", job["task_id"], e)
+                self.release(job["task_id"])
+        try:
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Could not record fair-share waits: %s", e)
+        return len(jobs)
+
+    def release(self, task_id: str) -> bool:
+        client = self.client
+        if client is None:
+            return False
+        try:
+            return bool(client.eval(RELEASE_SCRIPT, 1, f"{self.prefix}:tasks", self.prefix, task_id))
+        except Exception as e:
+            logger.warning("Could not release fair-share slot %s: %s", task_id, e)
+            return False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-tenant queued/running counts and queue wait percentiles"""
+        client = self.client
+        if client is None:
+            return []
+        now = time.time()
+        tenants = set()
+        for pattern in (f"{self.prefix}:stats:*", f"{self.prefix}:q:*"):
+            for key in client.scan_iter(match=pattern, count=500):
+                tenants.add(key.decode().rsplit(":", 1)[1])
+
+        rows = []
+        for tenant in sorted(tenants):
+            slots = f"{self.prefix}:running:{tenant}"
+            waits = [float(w) for w in client.lrange(f"{self.prefix}:wait:{tenant}", 0, -1)]
+            counters = {
+                k.decode(): float(v)
+                for k, v in client.hgetall(f"{self.prefix}:stats:{tenant}").items()
+            }
+            dispatched = int(counters.get("dispatched", 0))
+            rows.append(
+                {
+                    "company_id": tenant,
+                    "queued": client.llen(f"{self.prefix}:q:{tenant}"),
+                    "running": client.zcount(slots, now - self.options["LEASE"], "+inf"),
+                    "dispatched": dispatched,
+                    "mean_wait_ms": round(counters.get("waited_ms", 0) / dispatched, 1) if dispatched else 0.0,
+                    "p50_wait_ms": round(percentile(waits, 0.5), 1),
+                    "p95_wait_ms": round(percentile(waits, 0.95), 1),
+                    "max_wait_ms": round(max(waits), 1) if waits else 0.0,
+                }
+            )
+        return rows
+
+
+fair_share = FairShareScheduler()
+
+
+@task_postrun.connect
+def release_fair_share_slot(sender=None, task_id=None, **extra):
+    """Free the finished task's slot and start whatever it was holding back"""
+    if sender is None or not fair_share.handles(sender.name):
+        return
+    if fair_share.release(task_id):
+        fair_share.pump()
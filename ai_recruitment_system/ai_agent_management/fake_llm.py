@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, Iterator, List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+APPLICATION_ID = re.compile(r"""["']application_id["']\s*:\s*["']?([\w-]+)""")
+
+
+class LocalFakeChatModel(BaseChatModel):
+    """Offline, deterministic stand-in for the hosted chat models.
+
+    The response is derived from the prompt: every PromptTemplates template
+    gets schema-valid output seeded by a hash of the prompt, so identical
+    prompts always produce identical answers. Latency, jitter, truncation
+    and failures can be injected to load-test the surrounding code.
+    """
+
+    model_name: str = "local-fake"
+    latency: float = 0.05  # seconds per call
+    jitter: float = 0.0  # +/- seconds added to latency
+    truncate_rate: float = 0.0  # share of responses cut short
+    failure_rate: float = 0.0  # share of calls raising an error
+    stream_chunk_chars: int = 16
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "local_fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def _respond(self, messages: List[BaseMessage]):
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        if rng.random() < self.failure_rate:
+            return None, delay
+
+        text = fake_response(prompt, rng)
+        if rng.random() < self.truncate_rate:
+            text = text[: max(1, int(len(text) * rng.uniform(0.3, 0.9)))]
+        return text, delay
+
+    @staticmethod
+    def _result(text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, delay = self._respond(messages)
+        time.sleep(delay)
+        if text is None:
+            raise RuntimeError("local_fake: injected failure")
+        return self._result(text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        if text is None:
+            raise RuntimeError("local_fake: injected failure")
+        return self._result(text)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        text, delay = self._respond(messages)
+        # Time to first token is a fifth of the call, the rest is spread over chunks
+        time.sleep(delay / 5)
+        if text is None:
+            raise RuntimeError("local_fake: injected failure")
+        pieces = [
+            text[i:i + self.stream_chunk_chars]
+            for i in range(0, len(text), self.stream_chunk_chars)
+        ]
+        for piece in pieces:
+            time.sleep(delay * 0.8 / max(1, len(pieces)))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+def _application_ids(prompt: str) -> List[str]:
+    ids = []
+    for match in APPLICATION_ID.findall(prompt):
+        if match not in ids:
+            ids.append(match)
+    return ids
+
+
+def _as_id(value: str):
+    return int(value) if value.isdigit() else value
+
+
+def fake_response(prompt: str, rng: random.Random) -> str:
+    """Schema-valid output for the template that produced prompt"""
+    if "Screen the following candidates" in prompt:
+        return fake_screening(prompt, rng)
+    if "AI HR interviewer" in prompt:
+        return fake_interview_question(prompt, rng)
+    if re.search(r"Generate \d+\s+\S", prompt) and "questions" in prompt:
+        return fake_questions(prompt, rng)
+    if "Extract structured information from the following CV" in prompt:
+        return fake_cv(prompt, rng)
+    return "OK"
+
+
+def fake_screening(prompt: str, rng: random.Random) -> str:
+    decisions = []
+    for app_id in _application_ids(prompt):
+        accepted = rng.random() < 0.5
+        decisions.append(
+            {
+                "application_id": _as_id(app_id),
+                "decision": "accepted" if accepted else "rejected",
+                "reasons": (
+                    "Skills and experience match the job requirements."
+                    if accepted
+                    else "Experience does not cover the core requirements."
+                ),
+            }
+        )
+    return "```json\n" + json.dumps(decisions, indent=2) + "\n```"
+
+
+def fake_questions(prompt: str, rng: random.Random) -> str:
+    count = int(re.search(r"Generate (\d+)", prompt).group(1))
+    ids = _application_ids(prompt)
+    kind = (
+        "coding" if "coding challenge" in prompt
+        else "aptitude" if "aptitude" in prompt
+        else "interview" if "interview questions" in prompt
+        else "technical"
+    )
+    questions = []
+    for index in range(count):
+        multiple_choice = kind in ("technical", "aptitude") and rng.random() < 0.5
+        question = {
+            "question": f"[{kind} {index + 1}] Describe how you would approach problem {rng.randint(100, 999)}.",
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "question_type": "multiple-choice" if multiple_choice else "short-answer",
+            "target_skill": rng.choice(["python", "sql", "communication", "reasoning", "design"]),
+            "expected_answer": "A structured answer covering the key trade-offs.",
+            "answer_guidelines": "Look for clarity, correctness and examples.",
+        }
+        if multiple_choice:
+            question["choices"] = [f"Option {c}" for c in "ABCD"]
+        questions.append(question)
+    document = {"application_id": _as_id(ids[0]) if ids else "application", "questions": questions}
+    return "```json\n" + json.dumps(document, indent=2) + "\n```"
+
+
+def fake_interview_question(prompt: str, rng: random.Random) -> str:
+    duration = re.search(r"Conversation duration:\s*(\d+)", prompt)
+    current = re.search(r"Current time:\s*(\d+)", prompt)
+    ended = bool(duration and current and int(current.group(1)) >= int(duration.group(1)) * 60)
+    document = {
+        "next_question": {
+            "question": (
+                "Thank you for your time, this concludes the interview."
+                if ended
+                else f"Can you tell me about a project where you had to {rng.choice(['lead a team', 'meet a tight deadline', 'resolve a conflict', 'learn a new tool'])}?"
+            ),
+            "session_ended": "yes" if ended else "no",
+            "focus_area": rng.choice(["teamwork", "leadership", "adaptability", "problem-solving"]),
+            "question_type": "closing" if ended else rng.choice(["opening", "follow_up", "probing"]),
+            "rationale": "Builds on the candidate's background.",
+            "expected_answer_elements": ["situation", "action", "result"],
+            "potential_follow_up_paths": ["ask for metrics", "ask about lessons learned"],
+        }
+    }
+    return "```json\n" + json.dumps(document, indent=2) + "\n```"
+
+
+def fake_cv(prompt: str, rng: random.Random) -> str:
+    words = re.findall(r"[A-Za-z]{4,}", prompt.split("CV Text:", 1)[-1])
+    skills = sorted(set(w.lower() for w in words))[:8]
+    return "\n".join(
+        ["# Candidate Profile", "", "## Skills"]
+        + [f"- {skill}" for skill in skills]
+        + ["", "## Experience", f"- {rng.randint(1, 15)} years of relevant experience"]
+    )
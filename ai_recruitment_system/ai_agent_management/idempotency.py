@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional, Tuple
+from celery import states
+from celery.result import AsyncResult
+from celery.signals import task_postrun
+from django.conf import settings
+from .redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_IDEMPOTENCY_SETTINGS = {
+    "ENABLED": True,
+    "KEY_PREFIX": "ai:task",
+    "IN_FLIGHT_TTL": 60 * 60,  # seconds a queued/running submission holds its key
+    # Seconds a successful result is reused for identical submissions, per task
+    # name. Tasks not listed are deduplicated while in flight only.
+    "RESULT_TTL": {},
+}
+
+# Hand the key over to the result window, or release it, only if it still
+# belongs to the finished task.
+SETTLE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+else
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+def idempotency_settings() -> Dict[str, Any]:
+    return {**DEFAULT_IDEMPOTENCY_SETTINGS, **getattr(settings, "AI_IDEMPOTENCY", {})}
+
+
+def task_key(task_name: str, args=(), kwargs=None) -> str:
+    """Redis key for a task invocation: task name plus a hash of its JSON inputs"""
+    payload = json.dumps([list(args), kwargs or {}], sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{idempotency_settings()['KEY_PREFIX']}:{task_name}:{digest}"
+
+
+def claim_submission(task, args=(), kwargs=None) -> Tuple[str, Optional[AsyncResult]]:
+    """(task id to use, existing result) for a submission.
+
+    The existing result is set when an identical submission is queued,
+    running or still inside its result window; the caller should return it
+    instead of enqueueing. Without Redis every submission is new.
+    """
+    options = idempotency_settings()
+    task_id = str(uuid.uuid4())
+    client = get_redis_client() if options["ENABLED"] else None
+    if client is None:
+        return task_id, None
+
+    key = task_key(task.name, args, kwargs)
+    try:
+        for _ in range(2):
+            if client.set(key, task_id, nx=True, ex=options["IN_FLIGHT_TTL"]):
+                return task_id, None
+            existing = client.get(key)
+            if existing is not None:
+                logger.info("Attached %s submission to task %s", task.name, existing.decode())
+                return existing.decode(), AsyncResult(existing.decode(), app=task.app)
+            # The key expired between SET and GET: try to claim it again
+    except Exception as e:
+        logger.warning("Task deduplication unavailable for %s: %s", task.name, e)
+    return task_id, None
+
+
+def submit_once(task, *args, **kwargs) -> AsyncResult:
+    """task.delay(*args, **kwargs), unless an identical call is already in hand.
+
+    While an identical submission is queued or running (or finished
+    successfully within the task's RESULT_TTL), its AsyncResult is returned
+    instead of enqueueing a duplicate. Without Redis this is plain delay().
+    """
+    task_id, existing = claim_submission(task, args, kwargs)
+    if existing is not None:
+        return existing
+    return task.apply_async(args=args, kwargs=kwargs, task_id=task_id)
+
+
+def _succeeded(state: str, retval) -> bool:
+    # The AI tasks catch their own errors and report them as {"success": False};
+    # a task that returned nothing has not confirmed success, so it is not kept
+    if state != states.SUCCESS or retval is None:
+        return False
+    return not (isinstance(retval, dict) and retval.get("success") is False)
+
+
+@task_postrun.connect
+def settle_task_key(sender=None, task_id=None, args=None, kwargs=None, retval=None, state=None, **extra):
+    """Keep a successful task's key for its result window; free it otherwise"""
+    options = idempotency_settings()
+    if not options["ENABLED"] or sender is None or not sender.name.startswith("ai_agent_management."):
+        return
+    client = get_redis_client()
+    if client is None:
+        return
+    result_ttl = options["RESULT_TTL"].get(sender.name, 0) if _succeeded(state, retval) else 0
+    try:
+        client.eval(
+            SETTLE_SCRIPT, 1, task_key(sender.name, args or (), kwargs), task_id, int(result_ttl)
+        )
+    except Exception as e:
+        logger.warning("Could not settle idempotency key for %s: %s", sender.name, e)
@@ -0,0 +1,251 @@
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from company_management.models import Company
+from examination_management.models import ApplicationExam, Exam, InterviewResponse
+from job_management.models import Application, Job
+from user_management.models import Cv, User
+
+
+SKILLS = [
+    "python", "django", "react", "sql", "docker", "aws", "excel", "marketing",
+    "sales", "leadership", "accounting", "design", "kubernetes", "java", "nursing",
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the AI tasks end to end against the local_fake provider and report "
+        "throughput, p50/p99 latency and DB query counts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applications", type=int, default=50)
+        parser.add_argument("--jobs", type=int, default=2)
+        parser.add_argument("--interviews", type=int, default=5)
+        parser.add_argument("--turns", type=int, default=3, help="Interview turns per candidate")
+        parser.add_argument("--latency", type=float, default=None, help="Fake LLM latency (s)")
+        parser.add_argument("--jitter", type=float, default=None)
+        parser.add_argument("--failure-rate", type=float, default=None)
+        parser.add_argument("--truncate-rate", type=float, default=None)
+        parser.add_argument("--use-cache", action="store_true", help="Keep the LLM response cache on")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated rows")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        fake = dict(getattr(settings, "AI_LOCAL_FAKE", {}))
+        for option, key in (
+            ("latency", "latency"),
+            ("jitter", "jitter"),
+            ("failure_rate", "failure_rate"),
+            ("truncate_rate", "truncate_rate"),
+        ):
+            if options[option] is not None:
+                fake[key] = options[option]
+        settings.AI_PROVIDER_OVERRIDE = "local_fake"
+        settings.AI_LOCAL_FAKE = fake
+
+        from ai_agent_management import tasks
+
+        tasks.agent.config_manager.apply_provider_override()
+        tasks.agent.response_cache.enabled = options["use_cache"]
+        self.tasks = tasks
+        self.rng = random.Random(options["seed"])
+        self.results = []
+
+        self.stdout.write(f"local_fake settings: {fake}")
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options["keep"]:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write("generated rows rolled back")
+
+        self.report()
+
+    def measure(self, name, items, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+        self.results.append(
+            {
+                "name": name,
+                "items": items,
+                "elapsed": elapsed,
+                "queries": len(queries),
+                "success": not isinstance(result, dict) or result.get("success", True),
+            }
+        )
+        return result
+
+    def run(self, options):
+        tasks = self.tasks
+        recruiter, jobs = self.create_jobs(options["jobs"])
+        candidates = self.create_candidates(options["applications"])
+        applications = Application.objects.bulk_create(
+            [
+                Application(
+                    u_id=user,
+                    j_id=jobs[index % len(jobs)],
+                    a_cover_letter_content=f"I would love to join as {jobs[index % len(jobs)].j_title}.",
+                    status="pending",
+                )
+                for index, user in enumerate(candidates)
+            ]
+        )
+        app_ids = [application.id for application in applications]
+
+        for user in candidates:
+            self.measure(
+                "parse_cv_task", 1, tasks.parse_cv_task, user.id, self.cv_text()
+            )
+
+        self.measure(
+            "screen_candidates_applications",
+            len(app_ids),
+            tasks.screen_candidates_applications,
+            app_ids,
+        )
+
+        # Every candidate takes the written exam regardless of screening outcome
+        Application.objects.filter(id__in=app_ids).update(status="accepted")
+        exams = {
+            job.id: Exam.objects.create(j_id=job, e_title="Written", e_type="written", e_duration=30)
+            for job in jobs
+        }
+        application_exams = ApplicationExam.objects.bulk_create(
+            [ApplicationExam(a_id=a, e_id=exams[a.j_id_id]) for a in applications]
+        )
+        mapping = [(ae.a_id_id, ae.id) for ae in application_exams]
+        for mode in ("per_application", "pool"):
+            self.measure(
+                f"generate_exam_questions[{mode}]",
+                len(mapping),
+                tasks.generate_exam_questions,
+                mapping,
+                "written",
+                mode,
+            )
+            Application.objects.filter(id__in=app_ids).update(status="accepted")
+
+        interviewees = applications[: options["interviews"]]
+        interview_exams = {
+            job.id: Exam.objects.create(j_id=job, e_title="Interview", e_type="interview", e_duration=45)
+            for job in jobs
+        }
+        for application in interviewees:
+            exam = ApplicationExam.objects.create(
+                a_id=application, e_id=interview_exams[application.j_id_id]
+            )
+            for turn in range(options["turns"]):
+                exam.current_time = turn * 120
+                exam.save(update_fields=["current_time"])
+                self.measure(
+                    "generate_next_interview_question",
+                    1,
+                    tasks.generate_next_interview_question,
+                    exam.id,
+                    application.u_id_id,
+                )
+                InterviewResponse.objects.filter(q__e=exam, r_text="").update(
+                    r_text=self.answer_text(), current_time=turn * 120 + 90
+                )
+
+    def create_jobs(self, count):
+        tag = uuid.uuid4().hex[:8]
+        recruiter = User.objects.create(
+            u_email=f"bench-recruiter-{tag}@example.com",
+            u_first_name="Bench",
+            u_middle_name="",
+            u_last_name="Recruiter",
+            u_role="recruiter",
+            u_dob=date(1985, 1, 1),
+            u_gender="other",
+            u_phone="000",
+            has_company=True,
+        )
+        company = Company.objects.create(
+            c_admin=recruiter, c_name=f"Bench {tag}", c_description="A benchmark company."
+        )
+        jobs = [
+            Job.objects.create(
+                c_id=company,
+                u_id=recruiter,
+                j_title=f"Engineer {index}",
+                j_description="Build and run services. " + " ".join(self.rng.sample(SKILLS, 5)),
+                j_requirements=", ".join(self.rng.sample(SKILLS, 4)),
+                j_deadline=timezone.now() + timedelta(days=30),
+                j_status="open",
+            )
+            for index in range(count)
+        ]
+        return recruiter, jobs
+
+    def create_candidates(self, count):
+        tag = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create(
+            [
+                User(
+                    u_email=f"bench-{tag}-{index}@example.com",
+                    u_first_name="Candidate",
+                    u_middle_name="",
+                    u_last_name=str(index),
+                    u_dob=date(1995, 1, 1),
+                    u_gender="other",
+                    u_phone="000",
+                    has_company=False,
+                )
+                for index in range(count)
+            ]
+        )
+        Cv.objects.bulk_create([Cv(user_id=user, c_content=self.cv_text()) for user in users])
+        return users
+
+    def cv_text(self):
+        skills = " ".join(self.rng.sample(SKILLS, 6))
+        return f"experienced professional skills {skills} projects delivery teamwork " * 20
+
+    def answer_text(self):
+        return "In my last role I " + " and ".join(self.rng.sample(SKILLS, 3)) + " to deliver the project."
+
+    def report(self):
+        names = []
+        for result in self.results:
+            if result["name"] not in names:
+                names.append(result["name"])
+
+        header = f"{'task':<40} {'calls':>5} {'items':>6} {'items/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} {'q/item':>7} {'failed':>6}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name in names:
+            rows = [r for r in self.results if r["name"] == name]
+            elapsed = [r["elapsed"] for r in rows]
+            items = sum(r["items"] for r in rows)
+            queries = sum(r["queries"] for r in rows)
+            self.stdout.write(
+                f"{name:<40} {len(rows):>5} {items:>6} "
+                f"{items / sum(elapsed) if sum(elapsed) else 0:>9.1f} "
+                f"{percentile(elapsed, 0.5) * 1000:>9.1f} "
+                f"{percentile(elapsed, 0.99) * 1000:>9.1f} "
+                f"{queries:>8} {queries / items if items else 0:>7.1f} "
+                f"{sum(1 for r in rows if not r['success']):>6}"
+            )
@@ -0,0 +1,64 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from langchain.chains import LLMChain
+from ai_agent_management.ai_models import AIConfigManager, clear_client_registry
+from ai_agent_management.utils import ChainBuilder, PromptTemplates
+
+
+class Command(BaseCommand):
+    help = "Measure per-call chain setup overhead with and without the client registry"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--live",
+            type=int,
+            default=0,
+            help="Also time this many real CV parsing calls per mode (uses provider quota)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        config_manager = AIConfigManager()
+        chain_builder = ChainBuilder(config_manager)
+        clear_client_registry()
+
+        def unpooled():
+            # What every call paid before: new client, template and chain
+            llm = config_manager.build_model("cv_parser")
+            template = PromptTemplates.get_cv_parsing_template()
+            return LLMChain(llm=llm, prompt=template, metadata={"config_name": "cv_parser"})
+
+        def pooled():
+            return chain_builder.create_cv_parsing_chain()
+
+        started = time.perf_counter()
+        pooled()
+        self.stdout.write(f"first pooled build: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+        for label, build in (("unpooled", unpooled), ("pooled", pooled)):
+            timings = self._time(build, iterations)
+            self.stdout.write(
+                f"{label:>9}: mean {statistics.mean(timings):.3f} ms, "
+                f"p50 {statistics.median(timings):.3f} ms, "
+                f"max {max(timings):.3f} ms over {iterations} calls"
+            )
+
+        if options["live"]:
+            sample = "Jane Doe\nSoftware engineer\nSkills: Python, Django"
+            for label, build in (("unpooled", unpooled), ("pooled", pooled)):
+                timings = self._time(lambda: build().run(cv_text=sample), options["live"])
+                self.stdout.write(
+                    f"{label:>9} live: mean {statistics.mean(timings):.1f} ms, "
+                    f"p50 {statistics.median(timings):.1f} ms over {options['live']} calls"
+                )
+
+    @staticmethod
+    def _time(func, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
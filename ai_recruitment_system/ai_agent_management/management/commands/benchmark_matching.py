@@ -0,0 +1,78 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from ai_agent_management.matching import get_matcher, top_k
+
+
+SKILLS = (
+    "python django flask fastapi javascript typescript react angular vue node "
+    "java spring kotlin swift golang rust sql postgresql mysql mongodb redis "
+    "docker kubernetes aws azure gcp terraform linux git celery rabbitmq kafka "
+    "pandas numpy tensorflow pytorch statistics excel accounting marketing sales "
+    "nursing teaching logistics procurement design figma photoshop leadership"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Benchmark the pre-screening matcher over synthetic CVs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cvs", type=int, default=100000)
+        parser.add_argument("--jobs", type=int, default=50)
+        parser.add_argument("--words", type=int, default=250, help="Words per synthetic CV")
+        parser.add_argument("--top-k", type=int, default=100)
+        parser.add_argument("--backend", default="tfidf", choices=["tfidf", "embedding"])
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        vocabulary = np.array(SKILLS + [f"term{i}" for i in range(20000)])
+        # Zipf-like word frequencies, skills somewhat more common than filler
+        weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+        weights[: len(SKILLS)] *= 5
+        weights /= weights.sum()
+
+        started = time.perf_counter()
+        words = rng.choice(len(vocabulary), size=(options["cvs"], options["words"]), p=weights)
+        cvs = [" ".join(vocabulary[row]) for row in words]
+        jobs = [
+            " ".join(rng.choice(SKILLS, size=12, replace=False)) for _ in range(options["jobs"])
+        ]
+        self.stdout.write(f"generated {len(cvs)} CVs in {time.perf_counter() - started:.1f}s")
+
+        matcher = get_matcher(options["backend"])
+        started = time.perf_counter()
+        matcher.fit(cvs, jobs)
+        fit_time = time.perf_counter() - started
+        self.stdout.write(
+            f"index: {fit_time:.2f}s ({len(cvs) / fit_time:,.0f} CVs/s)"
+        )
+        if hasattr(matcher.matrix, "nnz"):
+            self.stdout.write(
+                f"matrix: {matcher.matrix.shape[0]}x{matcher.matrix.shape[1]}, "
+                f"{matcher.matrix.nnz:,} non-zeros, "
+                f"{matcher.matrix.data.nbytes / 2**20:.1f} MiB of values"
+            )
+
+        started = time.perf_counter()
+        scores = matcher.scores(jobs)
+        score_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for row in scores:
+            top_k(row, options["top_k"])
+        partition_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for row in scores:
+            np.argsort(-row)[: options["top_k"]]
+        sort_time = time.perf_counter() - started
+
+        self.stdout.write(
+            f"scoring: {score_time * 1000 / len(jobs):.2f} ms per job "
+            f"({len(jobs)} jobs x {len(cvs)} CVs)"
+        )
+        self.stdout.write(
+            f"top-{options['top_k']}: argpartition {partition_time * 1000 / len(jobs):.2f} ms "
+            f"vs full sort {sort_time * 1000 / len(jobs):.2f} ms per job"
+        )
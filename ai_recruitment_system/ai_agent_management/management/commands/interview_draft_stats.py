@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from ai_agent_management.speculation import speculative_drafts
+
+
+class Command(BaseCommand):
+    help = "Show hit-rate counters for speculative interview question drafts"
+
+    def handle(self, *args, **options):
+        stats = speculative_drafts.stats()
+        for field in ("started", "stored", "hits", "diverged", "stale", "missing"):
+            self.stdout.write(f"{field:>9}: {stats.get(field, 0)}")
+        self.stdout.write(f" hit rate: {stats['hit_rate']:.1%}")
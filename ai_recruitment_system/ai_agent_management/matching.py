@@ -0,0 +1,182 @@
+import logging
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from django.conf import settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SHORTLIST_SETTINGS = {
+    "ENABLED": False,
+    "BACKEND": "tfidf",  # or "embedding"
+    "FRACTION": 0.3,  # share of each job's applications sent to the LLM
+    "MIN_KEEP": 5,  # never shortlist fewer than this many per job
+    "REJECT_NOT_SHORTLISTED": False,  # otherwise they are left for manual review
+    "EMBEDDING_MODEL": "sentence-transformers/all-MiniLM-L6-v2",
+}
+
+
+def shortlist_settings() -> Dict[str, Any]:
+    return {**DEFAULT_SHORTLIST_SETTINGS, **getattr(settings, "AI_SHORTLIST", {})}
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores of a 1-D array, best first"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class BaseMatcher:
+    """Index of CV texts scored against job texts by cosine similarity"""
+
+    def fit(self, documents: Sequence[str], extra_vocabulary: Sequence[str] = ()):
+        raise NotImplementedError
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def search(self, queries: Sequence[str], k: int, chunk_size: int = 256):
+        """Top-k (indices, scores) per query, scored in chunks to bound memory"""
+        results = []
+        for start in range(0, len(queries), chunk_size):
+            block = self.scores(queries[start:start + chunk_size])
+            for row in block:
+                indices = top_k(row, k)
+                results.append((indices, row[indices]))
+        return results
+
+
+class TfidfMatcher(BaseMatcher):
+    """Sparse TF-IDF index; L2-normalised rows make a dot product the cosine"""
+
+    def __init__(self, max_features: Optional[int] = 100000, ngram_range=(1, 2), min_df=1):
+        self.vectorizer = TfidfVectorizer(
+            lowercase=True,
+            stop_words="english",
+            token_pattern=r"(?u)\b[a-zA-Z][a-zA-Z]+\b",
+            ngram_range=ngram_range,
+            min_df=min_df,
+            max_features=max_features,
+            sublinear_tf=True,
+            dtype=np.float32,
+        )
+        self.matrix = None
+
+    def fit(self, documents: Sequence[str], extra_vocabulary: Sequence[str] = ()) -> "TfidfMatcher":
+        """Index documents; extra_vocabulary texts (job texts) share the IDF statistics"""
+        self.vectorizer.fit(list(documents) + list(extra_vocabulary))
+        self.matrix = self.vectorizer.transform(documents).tocsr()
+        return self
+
+    def encode(self, texts: Sequence[str]):
+        return self.vectorizer.transform(texts)
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of every query against every indexed document"""
+        return np.asarray((self.encode(queries) @ self.matrix.T).todense(), dtype=np.float32)
+
+
+class EmbeddingMatcher(BaseMatcher):
+    """Dense sentence-embedding index; needs the optional sentence-transformers package"""
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: int = 64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The embedding matcher needs sentence-transformers "
+                "(pip install sentence-transformers)"
+            ) from e
+        self.model = SentenceTransformer(model_name or shortlist_settings()["EMBEDDING_MODEL"])
+        self.batch_size = batch_size
+        self.matrix = None
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(
+                list(texts),
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ),
+            dtype=np.float32,
+        )
+
+    def fit(self, documents: Sequence[str], extra_vocabulary: Sequence[str] = ()) -> "EmbeddingMatcher":
+        self.matrix = self.encode(documents)
+        return self
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        return self.encode(queries) @ self.matrix.T
+
+
+def get_matcher(backend: Optional[str] = None):
+    backend = backend or shortlist_settings()["BACKEND"]
+    if backend == "tfidf":
+        return TfidfMatcher()
+    if backend == "embedding":
+        return EmbeddingMatcher()
+    raise ValueError(f"Unsupported matching backend: {backend}")
+
+
+def job_text(application: Dict[str, Any]) -> str:
+    return " ".join(
+        application.get(field) or ""
+        for field in ("job_title", "job_requirements", "job_description")
+    )
+
+
+def shortlist_applications(
+    applications_data: List[Dict[str, Any]],
+    fraction: Optional[float] = None,
+    min_keep: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split applications into (shortlisted, not shortlisted) by CV/job similarity.
+
+    The top `fraction` of each job's applications (at least `min_keep`) is
+    shortlisted unchanged; the others are returned with their `match_score`.
+    When the texts cannot be indexed (e.g. every CV is empty or has no usable
+    words) nothing is filtered out and every application is shortlisted.
+    """
+    options = shortlist_settings()
+    fraction = options["FRACTION"] if fraction is None else fraction
+    min_keep = options["MIN_KEEP"] if min_keep is None else min_keep
+
+    by_job: Dict[str, List[int]] = defaultdict(list)
+    for index, application in enumerate(applications_data):
+        by_job[job_text(application)].append(index)
+
+    job_texts = list(by_job)
+    try:
+        matcher = get_matcher(backend).fit(
+            [a.get("cv_content") or "" for a in applications_data], job_texts
+        )
+    except ValueError as e:
+        # TfidfVectorizer raises "empty vocabulary" when no text has a usable term
+        logger.warning("Shortlisting skipped, screening all applications: %s", e)
+        return list(applications_data), []
+    scores = matcher.scores(job_texts)
+
+    shortlisted, rest = [], []
+    for row, text in enumerate(job_texts):
+        indices = np.asarray(by_job[text])
+        job_scores = scores[row, indices]
+        keep = max(min_keep, math.ceil(fraction * len(indices)))
+        chosen = set(indices[top_k(job_scores, keep)].tolist())
+        for index, score in zip(indices.tolist(), job_scores.tolist()):
+            if index in chosen:
+                shortlisted.append(applications_data[index])
+            else:
+                rest.append({**applications_data[index], "match_score": round(score, 4)})
+
+    return shortlisted, rest
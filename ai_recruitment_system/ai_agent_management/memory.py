@@ -0,0 +1,159 @@
+import json
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from examination_management.models import InterviewQuestion
+from .streaming_json import parse_json_output
+
+
+DEFAULT_MEMORY_SETTINGS = {
+    "RECENT_TURNS": 4,  # turns kept verbatim in the prompt
+    "SUMMARY_MAX_CHARS": 2000,  # budget for the rolling summary of older turns
+    "SUMMARY_LINE_CHARS": 240,
+    "CV_MAX_CHARS": 4000,
+}
+
+
+def memory_settings() -> Dict[str, Any]:
+    return {**DEFAULT_MEMORY_SETTINGS, **getattr(settings, "AI_INTERVIEW_MEMORY", {})}
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+class InterviewMemory:
+    """Bounded conversation memory for an interview session.
+
+    The last RECENT_TURNS question/answer pairs are passed to the model
+    verbatim; older turns are folded into a rolling extractive summary that
+    stays under SUMMARY_MAX_CHARS. Only the summary is persisted on the
+    ApplicationExam, so each turn reads at most RECENT_TURNS + 1 questions
+    instead of the whole conversation.
+    """
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        options = memory_settings()
+        self.recent_turns = options["RECENT_TURNS"]
+        self.summary_max_chars = options["SUMMARY_MAX_CHARS"]
+        self.summary_line_chars = options["SUMMARY_LINE_CHARS"]
+
+        state = state or {}
+        self.summary: List[str] = state.get("summary", [])
+        self.omitted_turns: int = state.get("omitted_turns", 0)
+        self.summarized_turns: int = state.get("summarized_turns", 0)
+        self.summarized_through: int = state.get("summarized_through", 0)
+        self.recent: List[Dict[str, Any]] = []
+        self.latest_question: Optional[InterviewQuestion] = None
+
+    @classmethod
+    def load(cls, application_exam) -> "InterviewMemory":
+        state = None
+        if application_exam.conversation_memory:
+            try:
+                state = json.loads(application_exam.conversation_memory)
+            except json.JSONDecodeError:
+                state = None
+        return cls(state)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary,
+            "omitted_turns": self.omitted_turns,
+            "summarized_turns": self.summarized_turns,
+            "summarized_through": self.summarized_through,
+        }
+
+    def save(self, application_exam):
+        application_exam.conversation_memory = json.dumps(self.state())
+        application_exam.save(update_fields=["conversation_memory"])
+
+    def refresh(self, application_exam) -> List[Dict[str, Any]]:
+        """Load the turns not yet summarized and fold the overflow into the summary"""
+        questions = list(
+            InterviewQuestion.objects.filter(
+                e=application_exam, id__gt=self.summarized_through
+            )
+            .prefetch_related("interviewresponse_set")
+            .order_by("id")
+        )
+        self.latest_question = questions[-1] if questions else None
+
+        turns = [self._turn(question) for question in questions]
+        overflow = max(0, len(turns) - self.recent_turns)
+        for turn in turns[:overflow]:
+            self._summarize(turn)
+            self.summarized_through = turn["id"]
+        self.recent = turns[overflow:]
+        return self.recent
+
+    @staticmethod
+    def _turn(question: InterviewQuestion) -> Dict[str, Any]:
+        responses = list(question.interviewresponse_set.all())
+        answer = responses[0] if responses else None
+        return {
+            "id": question.id,
+            "question": {
+                "text": question.q_text,
+                "asked_at": f"{question.current_time}secs ago",
+            },
+            "answer": {
+                "text": answer.r_text if answer else "",
+                "answered_at": f"{answer.current_time if answer else 0} secs ago",
+            },
+        }
+
+    def _summarize(self, turn: Dict[str, Any]):
+        question = _clip(turn["question"]["text"], self.summary_line_chars // 2)
+        answer = _clip(turn["answer"]["text"], self.summary_line_chars // 2) or "(no answer)"
+        self.summary.append(f"Q: {question} | A: {answer}")
+        self.summarized_turns += 1
+
+        # Over budget: drop the answers of the oldest lines, then the lines themselves
+        for index, line in enumerate(self.summary):
+            if self._summary_size() <= self.summary_max_chars:
+                break
+            if " | A: " in line:
+                self.summary[index] = line.split(" | A: ", 1)[0]
+        while self.summary and self._summary_size() > self.summary_max_chars:
+            self.summary.pop(0)
+            self.omitted_turns += 1
+
+    def _summary_size(self) -> int:
+        return sum(len(line) + 1 for line in self.summary)
+
+    def prompt_context(self) -> str:
+        """Conversation so far, formatted for the previous_questions prompt input"""
+        context: Dict[str, Any] = {
+            "recent_turns": [
+                {"question": turn["question"], "answer": turn["answer"]}
+                for turn in self.recent
+            ],
+        }
+        if self.summary or self.omitted_turns:
+            context["earlier_turns_summary"] = {
+                "turns": self.summarized_turns,
+                "not_shown": self.omitted_turns,
+                "topics": self.summary,
+            }
+        return json.dumps(context)
+
+
+def cv_profile(cv) -> str:
+    """Structured CV data for prompts, falling back to clipped raw text"""
+    limit = memory_settings()["CV_MAX_CHARS"]
+    if cv is None:
+        return ""
+
+    if cv.parsed_data:
+        try:
+            data = json.loads(cv.parsed_data)
+        except json.JSONDecodeError:
+            data = cv.parsed_data
+        if isinstance(data, str):
+            # parse_cv_task stores the raw model output
+            data = parse_json_output(data)
+        if data:
+            return _clip(json.dumps(data), limit)
+
+    return _clip(cv.c_content or "", limit)
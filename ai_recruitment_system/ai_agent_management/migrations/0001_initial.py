@@ -0,0 +1,57 @@
+# Generated by Django 5.2.3 on 2025-10-24 09:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMCallMetric",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.CharField(db_index=True, max_length=64)),
+                ("config_name", models.CharField(max_length=64)),
+                ("model", models.CharField(max_length=100)),
+                ("provider", models.CharField(max_length=32)),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("wall_ms", models.FloatField(default=0.0)),
+                ("queue_wait_ms", models.FloatField(default=0.0)),
+                ("input_tokens", models.PositiveIntegerField(default=0)),
+                ("output_tokens", models.PositiveIntegerField(default=0)),
+                ("retries", models.PositiveSmallIntegerField(default=0)),
+                ("cache_hit", models.BooleanField(default=False)),
+                ("streamed", models.BooleanField(default=False)),
+                ("json_repair", models.BooleanField(default=False)),
+                ("success", models.BooleanField(default=True)),
+                ("error", models.CharField(blank=True, default="", max_length=255)),
+            ],
+            options={
+                "db_table": "llm_call_metric",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["chain", "started_at"],
+                        name="llm_metric_chain_started_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2025-10-27 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ai_agent_management", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="llmcallmetric",
+            name="route",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -1,3 +1,33 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class LLMCallMetric(models.Model):
+    """One LLM chain invocation, kept for a rolling retention window"""
+
+    chain = models.CharField(max_length=64, db_index=True)
+    config_name = models.CharField(max_length=64)
+    model = models.CharField(max_length=100)
+    provider = models.CharField(max_length=32)
+    route = models.CharField(max_length=64, blank=True, default="")
+    started_at = models.DateTimeField(default=timezone.now, db_index=True)
+    wall_ms = models.FloatField(default=0.0)
+    queue_wait_ms = models.FloatField(default=0.0)
+    input_tokens = models.PositiveIntegerField(default=0)
+    output_tokens = models.PositiveIntegerField(default=0)
+    retries = models.PositiveSmallIntegerField(default=0)
+    cache_hit = models.BooleanField(default=False)
+    streamed = models.BooleanField(default=False)
+    json_repair = models.BooleanField(default=False)
+    success = models.BooleanField(default=True)
+    error = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        managed = True
+        db_table = 'llm_call_metric'
+        indexes = [
+            models.Index(fields=["chain", "started_at"], name="llm_metric_chain_started_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.chain} {self.model} {self.wall_ms:.0f}ms"
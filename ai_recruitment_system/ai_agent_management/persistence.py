@@ -0,0 +1,190 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from django.db import transaction
+from django.utils import timezone
+from examination_management.models import ApplicationExam, ExamQuestion
+from job_management.models import Application, ApplicationStage
+from notification_management.tasks import send_notifications_bulk
+
+
+def screening_notification(application, decision: str, reasons) -> Dict[str, Any]:
+    job_title = application.j_id.j_title if application.j_id else "the job"
+    if decision == "accepted":
+        message = f"Congratulations! Your application for '{job_title}' has been accepted. {reasons if reasons else 'Your qualifications match our requirements.'}"
+        n_type = "application_accepted"
+    else:
+        message = f"Your application for '{job_title}' was not successful at this time. {reasons if reasons else 'Thank you for your interest.'}"
+        n_type = "application_rejected"
+    return {
+        "message": message,
+        "n_type": n_type,
+        "is_read": False,
+        "user_id": application.u_id_id,
+        "c_id": application.j_id.c_id_id if application.j_id else None,
+    }
+
+
+def save_screening_decisions(decisions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Persist screening decisions with a constant number of queries.
+
+    Applications and their stages are loaded once, status changes go through
+    bulk_update and new stages through bulk_create inside one transaction.
+    Notifications are queued as one grouped task after the commit.
+    """
+    by_application = {}
+    for decision in decisions:
+        app_id = decision.get("application_id")
+        if app_id is not None:
+            by_application[app_id] = decision
+    if not by_application:
+        return {"saved": 0, "missing": []}
+
+    now = timezone.now()
+    with transaction.atomic():
+        applications = {
+            application.id: application
+            for application in Application.objects.select_for_update(of=("self",))
+            .select_related("j_id")
+            .filter(id__in=by_application)
+        }
+        stages: Dict[int, List[ApplicationStage]] = {}
+        for stage in ApplicationStage.objects.filter(a_id__in=applications):
+            stages.setdefault(stage.a_id_id, []).append(stage)
+
+        changed_stages = []
+        new_stages = []
+        notifications = []
+        for app_id, application in applications.items():
+            result = by_application[app_id]
+            decision = "accepted" if result.get("decision") == "accepted" else "rejected"
+            reasons = result.get("reasons", "")
+            notes = "".join(reasons) if isinstance(reasons, list) else reasons
+
+            application.status = decision
+
+            # Close every open stage, then reopen or create the decision stage
+            current = None
+            for stage in stages.get(app_id, []):
+                stage.s_completed = True
+                stage.s_ended_at = now
+                if stage.s_name == decision:
+                    current = stage
+                changed_stages.append(stage)
+            if current is not None:
+                current.s_completed = False
+                current.s_notes = notes
+                current.s_ended_at = None
+            else:
+                new_stages.append(
+                    ApplicationStage(
+                        a_id=application,
+                        s_name=decision,
+                        s_completed=True,
+                        s_notes=notes,
+                        s_started_at=now,
+                        s_ended_at=None,
+                    )
+                )
+            notifications.append(screening_notification(application, decision, reasons))
+
+        Application.objects.bulk_update(applications.values(), ["status"])
+        if changed_stages:
+            ApplicationStage.objects.bulk_update(
+                changed_stages, ["s_completed", "s_ended_at", "s_notes"]
+            )
+        if new_stages:
+            ApplicationStage.objects.bulk_create(new_stages)
+
+        if notifications:
+            transaction.on_commit(lambda: send_notifications_bulk.delay(notifications))
+
+    return {
+        "saved": len(applications),
+        "missing": [app_id for app_id in by_application if app_id not in applications],
+    }
+
+
+def normalise_exam_question(question: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Validate one generated question and map it to ExamQuestion fields"""
+    if not isinstance(question, dict):
+        return None
+    text = str(question.get("question") or "").strip()
+    if not text:
+        return None
+
+    choices = question.get("choices") or []
+    if not isinstance(choices, str):
+        choices = json.dumps(choices) if choices else "[]"
+
+    answer = question.get("expected_answer", question.get("correct_answer", ""))
+    if not isinstance(answer, str):
+        answer = json.dumps(answer)
+
+    return {
+        "q_text": text,
+        "q_choices": choices,
+        "q_correct_answer": answer,
+        "q_type": str(question.get("question_type") or "short-answer"),
+    }
+
+
+def save_generated_questions(
+    batch: Sequence[Tuple[int, int, List[Dict[str, Any]]]], batch_size: int = 500
+) -> Dict[str, Any]:
+    """Write generated questions for many exams in one transaction.
+
+    batch holds (application id, application exam id, questions) entries.
+    Questions are normalised and de-duplicated per exam, inserted with
+    bulk_create, and every application that received questions is moved to
+    exam_generated with a single update.
+    """
+    exam_ids = {exam_id: app_id for app_id, exam_id, _ in batch}
+    if not exam_ids:
+        return {"created": 0, "applications": 0, "skipped": []}
+
+    now = timezone.now()
+    with transaction.atomic():
+        exams = {
+            exam.id: exam
+            for exam in ApplicationExam.objects.filter(
+                id__in=exam_ids,
+                a_id__in=list(exam_ids.values()),
+                a_id__status="accepted",
+            )
+        }
+
+        rows = []
+        completed = set()
+        skipped = []
+        for app_id, exam_id, questions in batch:
+            exam = exams.get(exam_id)
+            if exam is None or exam.a_id_id != app_id:
+                skipped.append(app_id)
+                continue
+            seen = set()
+            for question in questions:
+                fields = normalise_exam_question(question)
+                if fields is None or fields["q_text"] in seen:
+                    continue
+                seen.add(fields["q_text"])
+                rows.append(
+                    ExamQuestion(
+                        e=exam,
+                        q_ai_generated=True,
+                        q_score_weight=1.0,
+                        created_at=now,
+                        updated_at=now,
+                        **fields,
+                    )
+                )
+            if seen:
+                completed.add(app_id)
+            else:
+                skipped.append(app_id)
+
+        ExamQuestion.objects.bulk_create(rows, batch_size=batch_size)
+        Application.objects.filter(id__in=completed, status="accepted").update(
+            status="exam_generated"
+        )
+
+    return {"created": len(rows), "applications": len(completed), "skipped": skipped}
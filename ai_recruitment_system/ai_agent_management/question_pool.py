@@ -0,0 +1,66 @@
+import hashlib
+import random
+from typing import Any, Dict, List
+from django.conf import settings
+from .matching import TfidfMatcher, top_k
+
+
+DEFAULT_QUESTION_POOL_SETTINGS = {
+    "MODE": "per_application",  # or "pool"
+    "POOL_SIZE": 30,  # questions generated once per (job, exam type)
+    "QUESTIONS_PER_EXAM": 5,
+    "CV_TOPUP": 0,  # CV-specific questions generated per application in pool mode
+    "RELEVANCE_SHORTLIST": 2,  # draw from the N x QUESTIONS_PER_EXAM most CV-relevant
+    "WRITE_BATCH": 100,  # exams written per bulk insert
+}
+
+
+def question_pool_settings() -> Dict[str, Any]:
+    return {**DEFAULT_QUESTION_POOL_SETTINGS, **getattr(settings, "AI_QUESTION_POOL", {})}
+
+
+def pool_inputs(application: Dict[str, Any]) -> Dict[str, Any]:
+    """Job-only prompt data, so every candidate for the job shares the pool (and its cache entry)"""
+    return {
+        "application_id": f"job-{application['job_id']}",
+        "cv_content": "Not provided: write questions suitable for any qualified candidate",
+        "job_description": application["job_description"],
+        "job_requirements": application["job_requirements"],
+    }
+
+
+def pool_key(application: Dict[str, Any]) -> str:
+    """Pools are shared per job text, so editing the job yields a new pool"""
+    payload = f"{application['job_id']}\n{application['job_description']}\n{application['job_requirements']}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def select_questions(
+    pool: List[Dict[str, Any]], application: Dict[str, Any], count: int, shortlist: int = 2
+) -> List[Dict[str, Any]]:
+    """Deterministic personalised subset of a question pool for one application.
+
+    Questions are ranked by TF-IDF similarity to the CV; `count` of them are
+    then drawn from the top `shortlist * count`, seeded by the application id
+    so neighbouring candidates do not all get the same exam.
+    """
+    pool = [q for q in pool if isinstance(q, dict) and q.get("question")]
+    if len(pool) <= count:
+        return pool
+
+    candidates = list(range(len(pool)))
+    cv_content = application.get("cv_content") or ""
+    if cv_content.strip():
+        try:
+            matcher = TfidfMatcher(ngram_range=(1, 1)).fit(
+                [f"{q['question']} {q.get('target_skill', '')}" for q in pool], [cv_content]
+            )
+            scores = matcher.scores([cv_content])[0]
+            candidates = top_k(scores, max(count, shortlist * count)).tolist()
+        except ValueError:
+            # Empty vocabulary after stop-word removal
+            pass
+
+    rng = random.Random(f"{application['application_id']}:{len(pool)}")
+    chosen = sorted(rng.sample(candidates, count))
+    return [pool[index] for index in chosen]
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from .redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# Two token buckets (requests and tokens) are refilled and debited atomically.
+# Returns 0 when the call may proceed, otherwise the number of milliseconds to
+# wait before the buckets hold enough capacity.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local wait = 0
+local levels = {}
+
+for i = 1, 2 do
+    local key = KEYS[i]
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local requested = tonumber(ARGV[(i - 1) * 3 + 3])
+    if capacity > 0 then
+        local state = redis.call('HMGET', key, 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        level = math.min(capacity, level + math.max(0, now - ts) * rate)
+        levels[i] = level
+        if requested > capacity then
+            requested = capacity
+        end
+        if level < requested then
+            wait = math.max(wait, (requested - level) / rate)
+        end
+    end
+end
+
+if wait > 0 then
+    return math.ceil(wait * 1000)
+end
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    if capacity > 0 then
+        local requested = math.min(capacity, tonumber(ARGV[(i - 1) * 3 + 3]))
+        redis.call('HSET', KEYS[i], 'level', levels[i] - requested, 'ts', now)
+        redis.call('EXPIRE', KEYS[i], 120)
+    end
+end
+return 0
+"""
+
+
+class _LocalBucket:
+    """In-process fallback used when Redis cannot be reached"""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.level = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, rate: float):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """Shared token-bucket rate limiter for LLM providers.
+
+    Every (provider, model) pair gets a requests-per-minute and a
+    tokens-per-minute bucket stored in Redis, so all Celery workers draw
+    from the same provider quota.
+    """
+
+    def __init__(self, prefix: str = "ai:rate_limit"):
+        self.prefix = prefix
+        self._script = None
+        self._local_buckets: Dict[Tuple[str, str], Tuple[_LocalBucket, _LocalBucket]] = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, provider: str, model: str):
+        base = f"{self.prefix}:{provider}:{model}"
+        return [f"{base}:requests", f"{base}:tokens"]
+
+    def try_acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int,
+        requests_per_minute: Optional[int],
+        tokens_per_minute: Optional[int],
+    ) -> float:
+        """Debit one request and `tokens` tokens; return seconds to wait (0 when granted)"""
+        rpm = requests_per_minute or 0
+        tpm = tokens_per_minute or 0
+        if not rpm and not tpm:
+            return 0.0
+
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                wait_ms = self._script(
+                    keys=self._keys(provider, model),
+                    args=[rpm, rpm / 60.0, 1, tpm, tpm / 60.0, tokens],
+                )
+                return int(wait_ms) / 1000.0
+            except Exception as e:
+                logger.warning("Redis rate limiter failed, using local buckets: %s", e)
+
+        return self._try_acquire_local(provider, model, tokens, rpm, tpm)
+
+    def _try_acquire_local(self, provider, model, tokens, rpm, tpm) -> float:
+        with self._lock:
+            buckets = self._local_buckets.get((provider, model))
+            if buckets is None:
+                buckets = (_LocalBucket(rpm), _LocalBucket(tpm))
+                self._local_buckets[(provider, model)] = buckets
+
+            wait = 0.0
+            demands = []
+            for bucket, capacity, requested in zip(buckets, (rpm, tpm), (1, tokens)):
+                if not capacity:
+                    demands.append(None)
+                    continue
+                rate = capacity / 60.0
+                bucket.refill(rate)
+                requested = min(requested, capacity)
+                demands.append(requested)
+                if bucket.level < requested:
+                    wait = max(wait, (requested - bucket.level) / rate)
+
+            if wait > 0:
+                return wait
+            for bucket, requested in zip(buckets, demands):
+                if requested is not None:
+                    bucket.level -= requested
+            return 0.0
+
+    def acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int = 0,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Block until the call fits in the provider quota; return seconds waited"""
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(
+                provider, model, tokens, requests_per_minute, tokens_per_minute
+            )
+            if wait <= 0:
+                return time.monotonic() - started
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                raise TimeoutError(
+                    f"Rate limit for {provider}:{model} not available within {timeout}s"
+                )
+            time.sleep(wait)
+
+    async def aacquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int = 0,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Async variant of acquire that yields to the event loop while waiting"""
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(
+                provider, model, tokens, requests_per_minute, tokens_per_minute
+            )
+            if wait <= 0:
+                return time.monotonic() - started
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                raise TimeoutError(
+                    f"Rate limit for {provider}:{model} not available within {timeout}s"
+                )
+            await asyncio.sleep(wait)
+
+    def acquire_for_config(self, config, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """Acquire capacity for a ModelConfig"""
+        return self.acquire(
+            config.provider,
+            config.model_name,
+            tokens,
+            config.requests_per_minute,
+            config.tokens_per_minute,
+            timeout,
+        )
+
+    async def aacquire_for_config(
+        self, config, tokens: int = 0, timeout: Optional[float] = None
+    ) -> float:
+        """Async acquire for a ModelConfig"""
+        return await self.aacquire(
+            config.provider,
+            config.model_name,
+            tokens,
+            config.requests_per_minute,
+            config.tokens_per_minute,
+            timeout,
+        )
+
+
+rate_limiter = RateLimiter()
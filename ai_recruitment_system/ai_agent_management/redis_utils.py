@@ -0,0 +1,38 @@
+import logging
+import time
+from typing import Optional
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is listed in requirements
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a Redis server that failed to answer
+RETRY_AFTER = 30
+
+_clients = {}
+
+
+def get_redis_client(url: Optional[str] = None):
+    """Return a shared Redis client for the AI agent, or None if Redis is unavailable"""
+    url = url or getattr(settings, "AI_REDIS_URL", None)
+    if not url or redis is None:
+        return None
+
+    if url in _clients:
+        client, checked_at = _clients[url]
+        if client is not None or time.monotonic() - checked_at < RETRY_AFTER:
+            return client
+
+    try:
+        client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=2)
+        client.ping()
+    except Exception as e:
+        logger.warning("AI Redis backend unavailable at %s: %s", url, e)
+        client = None
+
+    _clients[url] = (client, time.monotonic())
+    return client
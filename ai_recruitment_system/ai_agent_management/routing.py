@@ -0,0 +1,420 @@
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from django.conf import settings
+from .compression import compress_document
+from .telemetry import needs_json_repair, percentile, telemetry
+from .utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ROUTING_SETTINGS = {
+    "CIRCUIT_FAILURES": 5,  # consecutive failures that open a provider's circuit
+    "CIRCUIT_RESET": 30,  # seconds before an open circuit lets a trial call through
+    "LATENCY_WINDOW": 200,  # recent primary latencies kept per chain
+    "WORKERS": 16,  # threads shared by all routed calls in the process
+    # Per-chain SLOs keyed by chain name (see ChainBuilder.get_chain). Chains
+    # without an entry are called directly.
+    "SLO": {},
+}
+
+DEFAULT_SLO = {
+    "FALLBACK": None,  # config name of the alternate model
+    "TIMEOUT": 30,  # seconds for the whole routed call
+    "HEDGE_PERCENTILE": 0.95,  # hedge once the primary is slower than this percentile
+    "HEDGE_AFTER": 5.0,  # seconds, used until MIN_SAMPLES latencies are known
+    "MIN_SAMPLES": 20,
+}
+
+
+DEFAULT_LENGTH_ROUTING_SETTINGS = {
+    "BASE_LATENCY": 2.0,  # seconds of fixed overhead per call
+    "SECONDS_PER_1K_TOKENS": 1.5,  # prior until a config's calls have been measured
+    "HISTORY": 200,  # recent LLMCallMetric rows read per config on first use
+    # Per-chain latency budget (seconds) and candidate configs, best quality first
+    "CHAINS": {
+        "cv_parsing": {
+            "BUDGET": 45,
+            "ROUTES": [
+                {"CONFIG": "cv_parser", "MAX_INPUT_TOKENS": 6000},
+                {"CONFIG": "fast_parser", "MAX_INPUT_TOKENS": 30000},
+            ],
+        },
+    },
+}
+
+CHARS_PER_TOKEN = 4  # matches utils.estimate_tokens
+
+
+def routing_settings() -> Dict[str, Any]:
+    return {**DEFAULT_ROUTING_SETTINGS, **getattr(settings, "AI_ROUTING", {})}
+
+
+def length_routing_settings() -> Dict[str, Any]:
+    return {**DEFAULT_LENGTH_ROUTING_SETTINGS, **getattr(settings, "AI_LENGTH_ROUTING", {})}
+
+
+def is_valid_output(text: Optional[str]) -> bool:
+    """Non-empty output whose JSON (if any) parses without repair"""
+    return bool(text and text.strip()) and not needs_json_repair(text)
+
+
+class CircuitBreaker:
+    """Per-provider circuit: opens after consecutive failures, half-opens after a pause"""
+
+    def __init__(self, failures: int, reset_after: float):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._state: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            state = self._state.get(key)
+            if not state or not state["opened_at"]:
+                return True
+            if time.monotonic() - state["opened_at"] < self.reset_after:
+                return False
+            # Half-open: let this call through and hold the others for another pause
+            state["opened_at"] = time.monotonic()
+            return True
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._state.pop(key, None)
+
+    def record_failure(self, key: str):
+        with self._lock:
+            state = self._state.setdefault(key, {"failures": 0, "opened_at": 0.0})
+            state["failures"] += 1
+            if state["failures"] >= self.failures:
+                if not state["opened_at"]:
+                    logger.warning("Opening LLM circuit for %s", key)
+                state["opened_at"] = time.monotonic()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                key: {
+                    "failures": int(state["failures"]),
+                    "open": bool(state["opened_at"]) and now - state["opened_at"] < self.reset_after,
+                }
+                for key, state in self._state.items()
+            }
+
+
+class HedgedRouter:
+    """Route latency-critical chains through per-chain SLOs.
+
+    The primary config is called first; if it has not answered within the
+    chain's hedge threshold (a percentile of its recent latencies), the same
+    template is also sent to the SLO's fallback config and the first valid
+    answer wins. Providers whose circuit is open are skipped. Losing calls
+    are left to finish in the background and their output is discarded.
+    """
+
+    def __init__(self, agent, options: Optional[Dict[str, Any]] = None):
+        self.agent = agent
+        self.options = {**routing_settings(), **(options or {})}
+        self.breaker = CircuitBreaker(
+            self.options["CIRCUIT_FAILURES"], self.options["CIRCUIT_RESET"]
+        )
+        self._latencies: Dict[str, deque] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.options["WORKERS"],
+                        thread_name_prefix="llm-hedge",
+                        initializer=telemetry.defer_flushes,
+                    )
+        return self._executor
+
+    @staticmethod
+    def chain_name(chain) -> str:
+        return (chain.metadata or {}).get("chain", "")
+
+    def policy(self, chain) -> Optional[Dict[str, Any]]:
+        slo = self.options["SLO"].get(self.chain_name(chain))
+        return {**DEFAULT_SLO, **slo} if slo is not None else None
+
+    def provider_key(self, chain) -> str:
+        config = self.agent.config_manager.configs.get(
+            (chain.metadata or {}).get("config_name", "")
+        )
+        return f"{config.provider}:{config.model_name}" if config else ""
+
+    def fallback_chain(self, chain, policy: Dict[str, Any]):
+        fallback = policy["FALLBACK"]
+        metadata = chain.metadata or {}
+        if not fallback or fallback == metadata.get("config_name"):
+            return None
+        if fallback not in self.agent.config_manager.configs or "template_name" not in metadata:
+            return None
+        return self.agent.chain_builder.get_chain(fallback, metadata["template_name"])
+
+    def healthy_chain(self, chain):
+        """chain, or its SLO fallback while the primary provider's circuit is open"""
+        policy = self.policy(chain)
+        if policy is None or self.breaker.allow(self.provider_key(chain)):
+            return chain
+        return self.fallback_chain(chain, policy) or chain
+
+    def record_latency(self, name: str, seconds: float):
+        with self._lock:
+            window = self._latencies.get(name)
+            if window is None:
+                window = self._latencies[name] = deque(maxlen=self.options["LATENCY_WINDOW"])
+            window.append(seconds)
+
+    def hedge_delay(self, name: str, policy: Dict[str, Any]) -> float:
+        with self._lock:
+            samples = list(self._latencies.get(name, ()))
+        if len(samples) < policy["MIN_SAMPLES"]:
+            delay = policy["HEDGE_AFTER"]
+        else:
+            delay = percentile(samples, policy["HEDGE_PERCENTILE"])
+        return min(delay, policy["TIMEOUT"])
+
+    def run(
+        self,
+        chain,
+        call: Callable[..., str],
+        inputs: Dict[str, Any],
+        validate: Callable[[Optional[str]], bool] = is_valid_output,
+    ) -> str:
+        """Run call(chain, **inputs) under the chain's SLO and return the first valid output"""
+        policy = self.policy(chain)
+        if policy is None:
+            return call(chain, **inputs)
+
+        name = self.chain_name(chain)
+        started = time.monotonic()
+        deadline = started + policy["TIMEOUT"]
+        hedge_at = started + self.hedge_delay(name, policy)
+        pending = {}
+        errors = []
+
+        def launch(role, target):
+            key = self.provider_key(target)
+            if not self.breaker.allow(key):
+                errors.append(f"{role}: circuit open for {key}")
+                return
+            launched = time.monotonic()
+
+            def primary_done(future):
+                if future.exception() is None:
+                    self.record_latency(name, time.monotonic() - launched)
+
+            future = self.executor.submit(call, target, **inputs)
+            if role == "primary":
+                # Recorded even when the hedge wins, so slow answers keep raising the threshold
+                future.add_done_callback(primary_done)
+            pending[future] = (role, key)
+
+        launch("primary", chain)
+        hedged = False
+        while True:
+            if not hedged and (not pending or time.monotonic() >= hedge_at):
+                hedged = True
+                fallback = self.fallback_chain(chain, policy)
+                if fallback is not None:
+                    launch("fallback", fallback)
+            if not pending:
+                break
+
+            until = deadline if hedged else min(hedge_at, deadline)
+            done, _ = wait(
+                list(pending), timeout=max(0.0, until - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                if time.monotonic() >= deadline:
+                    break
+                continue
+
+            for future in done:
+                role, key = pending.pop(future)
+                try:
+                    output = future.result()
+                except Exception as e:
+                    self.breaker.record_failure(key)
+                    errors.append(f"{role}: {e}")
+                    continue
+                if validate(output):
+                    self.breaker.record_success(key)
+                    if role != "primary":
+                        logger.info("Chain %s answered by its fallback (%s)", name, key)
+                    return output
+                errors.append(f"{role}: invalid output")
+
+        if not pending:
+            raise RuntimeError(f"Chain {name} failed on every route: " + "; ".join(errors))
+        # Calls still running have blown the SLO
+        for role, key in pending.values():
+            self.breaker.record_failure(key)
+            errors.append(f"{role}: no answer within {policy['TIMEOUT']}s")
+        raise TimeoutError(f"Chain {name} missed its SLO: " + "; ".join(errors))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = {name: list(window) for name, window in self._latencies.items()}
+        return {
+            "circuits": self.breaker.status(),
+            "chains": {
+                name: {
+                    "samples": len(samples),
+                    "p50": round(percentile(samples, 0.5), 3),
+                    "p95": round(percentile(samples, 0.95), 3),
+                }
+                for name, samples in latencies.items()
+            },
+        }
+
+
+@dataclass
+class Route:
+    """Model config chosen for one document, and how its text was fitted"""
+
+    chain: str
+    config_name: str
+    input_tokens: int
+    original_tokens: int
+    predicted_seconds: float
+    compressed: bool = False
+    dropped: List[str] = field(default_factory=list)
+    trimmed: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.config_name}+compressed" if self.compressed else self.config_name
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "label": self.label}
+
+
+class LengthRouter:
+    """Pick a model config per document from its size and measured latency.
+
+    Each chain in AI_LENGTH_ROUTING lists candidate configs (best quality
+    first) with an input limit, and a latency budget. A config's latency is
+    predicted as BASE_LATENCY plus a per-1k-token rate learnt from recent
+    calls (seeded from LLMCallMetric). The first config that takes the whole
+    document within budget wins; otherwise the document is compressed by
+    section for the config that can take the most of it.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**length_routing_settings(), **(options or {})}
+        self._rates: Dict[str, float] = {}
+        self._loaded = set()
+        self._lock = threading.Lock()
+
+    def load_history(self, config_name: str):
+        from .models import LLMCallMetric
+
+        self._loaded.add(config_name)
+        try:
+            rows = list(
+                LLMCallMetric.objects.filter(
+                    config_name=config_name, success=True, cache_hit=False, streamed=False
+                )
+                .order_by("-started_at")
+                .values_list("wall_ms", "queue_wait_ms", "input_tokens")[: self.options["HISTORY"]]
+            )
+        except Exception as e:
+            logger.warning("Could not load latency history for %s: %s", config_name, e)
+            return
+        rates = [
+            self.rate_of(input_tokens, (wall_ms - queue_wait_ms) / 1000)
+            for wall_ms, queue_wait_ms, input_tokens in rows
+            if input_tokens
+        ]
+        if rates:
+            with self._lock:
+                self._rates.setdefault(config_name, statistics.median(rates))
+
+    def rate_of(self, tokens: int, seconds: float) -> float:
+        return max(0.0, seconds - self.options["BASE_LATENCY"]) / max(tokens / 1000, 0.1)
+
+    def rate(self, config_name: str) -> float:
+        if config_name not in self._loaded:
+            self.load_history(config_name)
+        return self._rates.get(config_name, self.options["SECONDS_PER_1K_TOKENS"])
+
+    def observe(self, config_name: str, tokens: int, seconds: float):
+        """Fold one measured LLM call into the config's latency rate"""
+        observed = self.rate_of(tokens, seconds)
+        with self._lock:
+            previous = self._rates.get(config_name)
+            self._rates[config_name] = (
+                observed if previous is None else 0.8 * previous + 0.2 * observed
+            )
+
+    def predict(self, config_name: str, tokens: int) -> float:
+        return self.options["BASE_LATENCY"] + tokens / 1000 * self.rate(config_name)
+
+    def affordable_tokens(self, config_name: str, budget: float) -> int:
+        rate = self.rate(config_name)
+        if rate <= 0:
+            return 10 ** 9
+        return int(max(0.0, budget - self.options["BASE_LATENCY"]) / rate * 1000)
+
+    def choose(
+        self,
+        chain: str,
+        text: str,
+        reserved_tokens: int = 0,
+        configs: Optional[Sequence[str]] = None,
+    ) -> Tuple[Route, str]:
+        """(route, text to send) for a document; reserved_tokens covers the prompt template"""
+        policy = self.options["CHAINS"].get(chain)
+        if policy is None:
+            raise ValueError(f"No length routing policy for chain: {chain}")
+        routes = [r for r in policy["ROUTES"] if configs is None or r["CONFIG"] in configs]
+        if not routes:
+            raise ValueError(f"No route for chain {chain} among {configs}")
+
+        tokens = estimate_tokens(text) + reserved_tokens
+        for candidate in routes:
+            predicted = self.predict(candidate["CONFIG"], tokens)
+            if tokens <= candidate["MAX_INPUT_TOKENS"] and predicted <= policy["BUDGET"]:
+                return Route(chain, candidate["CONFIG"], tokens, tokens, round(predicted, 2)), text
+
+        def capacity(candidate):
+            return min(
+                candidate["MAX_INPUT_TOKENS"],
+                self.affordable_tokens(candidate["CONFIG"], policy["BUDGET"]),
+            )
+
+        best = max(routes, key=capacity)
+        fitted, info = compress_document(
+            text, max(0, capacity(best) - reserved_tokens) * CHARS_PER_TOKEN
+        )
+        fitted_tokens = estimate_tokens(fitted) + reserved_tokens
+        route = Route(
+            chain,
+            best["CONFIG"],
+            fitted_tokens,
+            tokens,
+            round(self.predict(best["CONFIG"], fitted_tokens), 2),
+            compressed=True,
+            dropped=info["dropped"],
+            trimmed=info["trimmed"],
+        )
+        return route, fitted
+
+    def status(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(rate, 3) for name, rate in self._rates.items()}
@@ -0,0 +1,171 @@
+import json
+import logging
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, Optional
+from django.conf import settings
+from .redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DRAFT_SETTINGS = {
+    "ENABLED": True,
+    "MIN_WORDS": 8,  # partial transcript length before the first draft
+    "MIN_NEW_WORDS": 6,  # growth needed before drafting again
+    "MIN_INTERVAL": 3.0,  # seconds between drafts for one candidate
+    # Drafts share the provider quota with the real next-question call, so
+    # each turn gets at most this many
+    "MAX_PER_TURN": 1,
+    "COMMIT_SIMILARITY": 0.8,  # word-level similarity needed to reuse a draft
+    "TTL": 15 * 60,
+    "KEY_PREFIX": "ai:interview_draft",
+}
+
+
+def draft_settings() -> Dict[str, Any]:
+    return {**DEFAULT_DRAFT_SETTINGS, **getattr(settings, "AI_INTERVIEW_DRAFTS", {})}
+
+
+def transcript_similarity(draft: str, final: str) -> float:
+    """Word-level similarity between the transcript a draft saw and the final answer"""
+    draft_words = (draft or "").lower().split()
+    final_words = (final or "").lower().split()
+    if not draft_words and not final_words:
+        return 1.0
+    return SequenceMatcher(None, draft_words, final_words, autojunk=False).ratio()
+
+
+class SpeculativeDrafts:
+    """Next-question drafts generated while the candidate is still answering.
+
+    A draft is produced from the partial transcript and stored in Redis next
+    to the transcript it was based on. When the answer is submitted the draft
+    is committed if that transcript is close enough to the final answer,
+    otherwise the question is regenerated. Hit/miss counters are kept in a
+    shared hash so the draft hit rate can be monitored.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**draft_settings(), **(options or {})}
+        self.enabled = self.options["ENABLED"]
+        self.prefix = self.options["KEY_PREFIX"]
+        self.ttl = self.options["TTL"]
+        self.commit_similarity = self.options["COMMIT_SIMILARITY"]
+
+    def _key(self, exam_id) -> str:
+        return f"{self.prefix}:{exam_id}"
+
+    def _client(self):
+        return get_redis_client() if self.enabled else None
+
+    def record(self, field: str, amount: int = 1):
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.hincrby(f"{self.prefix}:stats", field, amount)
+        except Exception as e:
+            logger.warning("Could not record draft stat %s: %s", field, e)
+
+    def claim_turn(self, exam_id, question_id) -> bool:
+        """Count a draft against this turn's allowance; False once it is used up"""
+        client = self._client()
+        if client is None:
+            return False
+        key = f"{self.prefix}:turn:{exam_id}:{question_id}"
+        try:
+            pipe = client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, self.ttl)
+            drafts, _ = pipe.execute()
+        except Exception as e:
+            logger.warning("Could not claim a draft for exam %s: %s", exam_id, e)
+            return False
+        return drafts <= self.options["MAX_PER_TURN"]
+
+    def store(self, exam_id, question_id, transcript: str, output: str) -> bool:
+        """Keep the draft unless a draft based on a longer transcript already exists"""
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            current = client.get(self._key(exam_id))
+            if current:
+                current = json.loads(current)
+                if current["question_id"] == question_id and len(
+                    current["transcript"]
+                ) > len(transcript):
+                    return False
+            client.set(
+                self._key(exam_id),
+                json.dumps(
+                    {
+                        "question_id": question_id,
+                        "transcript": transcript,
+                        "output": output,
+                        "created_at": time.time(),
+                    }
+                ),
+                ex=self.ttl,
+            )
+            self.record("stored")
+            return True
+        except Exception as e:
+            logger.warning("Could not store interview draft for exam %s: %s", exam_id, e)
+            return False
+
+    def take(self, exam_id, question_id, final_answer: str) -> Optional[str]:
+        """Pop the draft for this turn; return its output if it can be committed"""
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            pipe = client.pipeline()
+            pipe.get(self._key(exam_id))
+            pipe.delete(self._key(exam_id))
+            raw, _ = pipe.execute()
+        except Exception as e:
+            logger.warning("Could not load interview draft for exam %s: %s", exam_id, e)
+            return None
+
+        if not raw:
+            self.record("missing")
+            return None
+        draft = json.loads(raw)
+        if draft["question_id"] != question_id:
+            self.record("stale")
+            return None
+        if transcript_similarity(draft["transcript"], final_answer) < self.commit_similarity:
+            self.record("diverged")
+            return None
+        self.record("hits")
+        return draft["output"]
+
+    def discard(self, exam_id):
+        client = self._client()
+        if client is not None:
+            try:
+                client.delete(self._key(exam_id))
+            except Exception as e:
+                logger.warning("Could not discard interview draft for exam %s: %s", exam_id, e)
+
+    def stats(self) -> Dict[str, Any]:
+        client = self._client()
+        counters: Dict[str, int] = {}
+        if client is not None:
+            try:
+                counters = {
+                    (k.decode() if isinstance(k, bytes) else k): int(v)
+                    for k, v in client.hgetall(f"{self.prefix}:stats").items()
+                }
+            except Exception as e:
+                logger.warning("Could not read draft stats: %s", e)
+        turns = sum(counters.get(k, 0) for k in ("hits", "diverged", "stale", "missing"))
+        return {
+            **counters,
+            "hit_rate": counters.get("hits", 0) / turns if turns else 0.0,
+        }
+
+
+speculative_drafts = SpeculativeDrafts()
@@ -0,0 +1,177 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalJSONParser:
+    """Single-pass incremental parser for LLM JSON output.
+
+    Text is fed in chunks as the model produces it. Every object that closes
+    inside the array stored under `array_key` (or inside a top-level array)
+    is decoded and returned from feed() immediately. Anything before the
+    first bracket, such as a ```json fence, is ignored.
+
+    When the output is cut off, result() closes the open containers after
+    the last complete value, so the valid prefix of a truncated document is
+    recovered without re-scanning the text. Containers left empty by the cut
+    are dropped from the recovered value rather than returned as `{}`/`[]`.
+    """
+
+    def __init__(self, array_key: Optional[str] = "questions"):
+        self.array_key = array_key
+        self.items: List[Dict[str, Any]] = []
+
+        self._parts: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []  # "{" or "["
+        self._keys: List[Optional[str]] = []  # last key seen in each dict
+        self._targets: List[bool] = []  # is the container a target array
+        self._expect_key = False
+        self._in_string = False
+        self._escape = False
+        self._key_chars: Optional[List[str]] = None
+        self._capture: Optional[List[str]] = None
+        self._capture_depth = 0
+        self._start: Optional[int] = None
+        self._finished = False
+
+        # Position just after the last complete value, where the document
+        # can be closed validly
+        self._safe_length = 0
+        self._safe_stack: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the objects completed by it"""
+        if not chunk or self._finished:
+            return []
+
+        completed = []
+        offset = self._length
+        capture_from = 0
+        stack = self._stack
+
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._key_chars is not None and not (char == '"' and not self._escape):
+                    self._key_chars.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._keys[-1] = json.loads('"' + "".join(self._key_chars) + '"')
+                        self._key_chars = None
+                    else:
+                        self._mark_safe(offset + index + 1)
+                continue
+
+            if self._start is None:
+                if char not in "{[":
+                    continue
+                self._start = offset + index
+
+            if char == '"':
+                self._in_string = True
+                if stack and stack[-1] == "{" and self._expect_key:
+                    self._key_chars = []
+            elif char in "{[":
+                parent_is_target = bool(self._targets) and self._targets[-1]
+                is_target = char == "[" and (
+                    not stack
+                    or (
+                        stack[-1] == "{"
+                        and self.array_key is not None
+                        and self._keys[-1] == self.array_key
+                    )
+                )
+                if char == "{" and parent_is_target and self._capture is None:
+                    self._capture = []
+                    self._capture_depth = len(stack) + 1
+                    capture_from = index
+                stack.append(char)
+                self._keys.append(None)
+                self._targets.append(is_target)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                if not stack:
+                    continue
+                closing_depth = len(stack)
+                stack.pop()
+                self._keys.pop()
+                self._targets.pop()
+                self._expect_key = False
+                self._mark_safe(offset + index + 1)
+                if self._capture is not None and closing_depth == self._capture_depth:
+                    self._capture.append(chunk[capture_from:index + 1])
+                    item = self._decode("".join(self._capture))
+                    self._capture = None
+                    if isinstance(item, dict):
+                        completed.append(item)
+                if not stack:
+                    self._finished = True
+                    self._parts.append(chunk[: index + 1])
+                    self._length += index + 1
+                    self.items.extend(completed)
+                    return completed
+            elif char == ",":
+                self._mark_safe(offset + index)
+                if stack and stack[-1] == "{":
+                    self._expect_key = True
+            elif char == ":":
+                self._expect_key = False
+
+        if self._capture is not None:
+            self._capture.append(chunk[capture_from:])
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        self.items.extend(completed)
+        return completed
+
+    def _mark_safe(self, position: int):
+        self._safe_length = position
+        self._safe_stack = list(self._stack)
+
+    @staticmethod
+    def _decode(text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level JSON value has been closed"""
+        return self._finished
+
+    def result(self) -> Any:
+        """The parsed document, or its recovered valid prefix when truncated"""
+        if self._start is None:
+            return None
+        text = "".join(self._parts)
+        if self._finished:
+            return self._decode(text[self._start:])
+
+        if self._safe_length <= self._start:
+            return None
+        closers = "".join("}" if c == "{" else "]" for c in reversed(self._safe_stack))
+        return _drop_empty(self._decode(text[self._start:self._safe_length] + closers))
+
+
+def _drop_empty(value: Any) -> Any:
+    """Remove empty objects and arrays from a recovered value"""
+    if isinstance(value, dict):
+        pruned = {key: _drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in ({}, [])}
+    if isinstance(value, list):
+        pruned = [_drop_empty(item) for item in value]
+        return [item for item in pruned if item not in ({}, [])]
+    return value
+
+
+def parse_json_output(text: str, array_key: Optional[str] = None) -> Any:
+    """Parse complete or truncated JSON model output in one pass"""
+    parser = IncrementalJSONParser(array_key)
+    parser.feed(text or "")
+    return parser.result()
+
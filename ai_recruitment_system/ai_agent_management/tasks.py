@@ -1,20 +1,70 @@
 from celery import shared_task
+from . import fair_share, idempotency, telemetry  # noqa: F401 - connect their task_postrun handlers in workers
 from .agent import AIAgent
+from .batching import TokenBudgetBatcher, fit_application_to_budget
+from .matching import shortlist_applications, shortlist_settings
+from .memory import InterviewMemory, cv_profile
+from .persistence import save_generated_questions, save_screening_decisions
+from .question_pool import pool_inputs, pool_key, question_pool_settings, select_questions
+from .speculation import speculative_drafts
+from .streaming_json import IncrementalJSONParser, parse_json_output
+from .utils import ChainBuilder, estimate_tokens, load_llm_json
 from user_management.models import Cv, User
 import json
-from job_management.models import Application, ApplicationStage
-import json
-from django.utils import timezone
-import time
-from examination_management.models import ExamQuestion, ApplicationExam, InterviewObservation
-import re
-from company_management.models import Company
+from typing import Optional
+from job_management.models import Application
+from django.conf import settings
+from examination_management.models import ApplicationExam, InterviewObservation
 from examination_management.models import InterviewQuestion, InterviewResponse
-from websocket_management.utils import process_ai_response
-from notification_management.tasks import send_notification
+from websocket_management.utils import process_ai_response, start_answer_turn
 
 agent = AIAgent()
 
+# Upper bound on simultaneous LLM calls per batch task; the provider quota
+# enforced by the rate limiter is the real throttle.
+AI_BATCH_CONCURRENCY = getattr(settings, "AI_BATCH_CONCURRENCY", 8)
+
+SCREENING_BATCH = {
+    "MAX_INPUT_TOKENS": 30000,
+    "OUTPUT_TOKENS_PER_APPLICATION": 300,
+    **getattr(settings, "AI_SCREENING_BATCH", {}),
+}
+
+
+def screening_batcher(use_fast_model: bool = False) -> TokenBudgetBatcher:
+    """Batcher sized to the screening model's input and output budgets"""
+    config = agent.config_manager.configs["fast_parser" if use_fast_model else "cv_parser"]
+    template = ChainBuilder.get_template("get_candidate_screening_template").template
+    return TokenBudgetBatcher(
+        max_tokens=SCREENING_BATCH["MAX_INPUT_TOKENS"],
+        max_items=max(
+            1,
+            (config.max_tokens or 8192) // SCREENING_BATCH["OUTPUT_TOKENS_PER_APPLICATION"],
+        ),
+        reserved_tokens=estimate_tokens(template),
+    )
+
+
+def extract_screening_decisions(output):
+    """Return the list of decisions from one screening response, or None"""
+    try:
+        data = load_llm_json(output)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if isinstance(data, dict):
+        for key in ("decisions", "applications", "results", "candidates"):
+            if isinstance(data.get(key), list):
+                return data[key]
+        return [data] if "application_id" in data else None
+    return data if isinstance(data, list) else None
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
 @shared_task
 def parse_cv_task(user_id, cv_text: str, use_fast_model: bool = False) -> dict:
@@ -24,10 +74,14 @@ def parse_cv_task(user_id, cv_text: str, use_fast_model: bool = False) -> dict:
         result = agent.parse_cv(cv_text, use_fast_model)
         print(f"Parsing CV for user {user_id}: {result}")
 
-        if result["success"]:
-            Cv.objects.update(
-                user_id=user, parsed_data=json.dumps(result["parsed_data"])
-            )
+        if not result["success"]:
+            # Reported as a failure so the idempotency key is freed for a retry
+            return {"success": False, "error": result.get("error", "CV parsing failed")}
+
+        Cv.objects.filter(user_id=user).update(
+            parsed_data=json.dumps(result["parsed_data"])
+        )
+        return {"success": True, "user_id": user_id, "model_used": result.get("model_used")}
 
     except Exception as e:
         print(f"Error parsing CV for user {user_id}: {str(e)}")
@@ -35,14 +89,16 @@ def parse_cv_task(user_id, cv_text: str, use_fast_model: bool = False) -> dict:
 
 @shared_task
 def screen_candidates_applications(
-    application_ids, use_fast_model: bool = False
+    application_ids, use_fast_model: bool = False, shortlist: Optional[bool] = None
 ) -> dict:
     """Celery task to parse CV text"""
     try:
         applications_data = []
-        applications = Application.objects.filter(
-            id__in=application_ids
-        ).select_related("u_id", "j_id")
+        applications = (
+            Application.objects.filter(id__in=application_ids)
+            .select_related("u_id", "j_id")
+            .order_by("j_id", "id")
+        )
         for app in applications:
             user = app.u_id
             cv_content = Cv.objects.filter(user_id=user).first()
@@ -67,91 +123,81 @@ def screen_candidates_applications(
             )
         print(f"Applications data for screening: {applications_data}")
 
-        result = agent.screen_applications(applications_data, use_fast_model)
-        print(f"Screening result: {result}")
-
-        if result["success"]:
-            print(f"Screening result: {result}")
-            json_str = result["parsed_data"].strip("```json\n").strip("```")
-            parsed_list = json.loads(json_str)
-            print(f"Parsed screening result: {parsed_list}")
-            
-            for res in parsed_list:
-                app_id = res.get("application_id")
-                decision = res.get("decision")
-                reasons = res.get("reasons", "")
-                
-                try:
-                    application = Application.objects.get(id=app_id)
-                    user = application.u_id
-                    job_title = application.j_id.j_title if application.j_id else "the job"
-                    
-                    application.status = (
-                        "accepted" if decision == "accepted" else "rejected"
-                    )
-                    application.save()
-
-                    existing_stages = ApplicationStage.objects.filter(
-                        a_id=application.id
-                    )
-                    if existing_stages.exists():
-                        existing_stages.update(
-                            s_completed=True, s_ended_at=timezone.now()
-                        )
-
-                    if ApplicationStage.objects.filter(
-                        a_id=application.id, s_name=decision
-                    ).exists():
-                        ApplicationStage.objects.filter(
-                            a_id=application.id, s_name=decision
-                        ).update(
-                            s_completed=False,
-                            s_notes=(
-                                "".join(reasons)
-                                if isinstance(reasons, list)
-                                else reasons
-                            ),
-                            s_ended_at=None,
-                        )
-                    else:
-                        ApplicationStage.objects.create(
-                            a_id=application,
-                            s_name="accepted" if decision == "accepted" else "rejected",
-                            s_completed=True,
-                            s_notes=(
-                                "".join(reasons)
-                                if isinstance(reasons, list)
-                                else reasons
-                            ),
-                            s_started_at=timezone.now(),
-                            s_ended_at=None,
-                        )
-
-                    if decision == "accepted":
-                        message = f"Congratulations! Your application for '{job_title}' has been accepted. {reasons if reasons else 'Your qualifications match our requirements.'}"
-                        n_type = "application_accepted"
-                    else:
-                        message = f"Your application for '{job_title}' was not successful at this time. {reasons if reasons else 'Thank you for your interest.'}"
-                        n_type = "application_rejected"
-
-                    send_notification.delay(
-                        message=message,
-                        n_type=n_type,
-                        is_read=False,
-                        user_id=user.id,
-                        c_id=application.j_id.c_id.id if application.j_id and application.j_id.c_id else None,
-                        broadcast=False,   
-                    )
-                    
-                    print(f"Sent {decision} notification to user {user.id} for application {app_id}")
-
-                except Application.DoesNotExist:
-                    print(f"Application with id {app_id} does not exist.")
-                except Exception as e:
-                    print(f"Error updating application {app_id}: {str(e)}")
- 
-
-        return {"success": True, "processed_applications": len(parsed_list)}
+        if not applications_data:
+            return {"success": True, "processed_applications": 0}
+
+        # Shortlist first: only the closest CV/job matches per job go to the LLM
+        options = shortlist_settings()
+        shortlist = options["ENABLED"] if shortlist is None else shortlist
+        not_shortlisted = []
+        if shortlist:
+            applications_data, not_shortlisted = shortlist_applications(applications_data)
+            print(
+                f"Shortlisted {len(applications_data)} applications, "
+                f"{len(not_shortlisted)} below the cut"
+            )
+
+        # Pack applications into prompt-sized groups (ordered by job so a group
+        # usually shares one job description) and screen the groups in parallel.
+        batcher = screening_batcher(use_fast_model)
+        groups = batcher.pack(
+            [fit_application_to_budget(a, batcher.budget) for a in applications_data]
+        )
+        calls = [
+            agent.screening_call(index, group, use_fast_model)
+            for index, group in enumerate(groups)
+        ]
+        print(f"Screening {len(applications_data)} applications in {len(groups)} groups")
+
+        parsed_list = []
+        failed_ids = []
+        for dispatched in agent.run_batch(calls, concurrency=AI_BATCH_CONCURRENCY):
+            group_ids = {a["application_id"] for a in groups[dispatched.key]}
+            decisions = (
+                extract_screening_decisions(dispatched.output)
+                if dispatched.success
+                else None
+            )
+            if decisions is None:
+                print(f"Screening group {dispatched.key} failed: {dispatched.error}")
+                failed_ids.extend(group_ids)
+                continue
+
+            # Merge, ignoring any decision for an application outside the group
+            for decision in decisions:
+                if not isinstance(decision, dict):
+                    continue
+                app_id = _as_int(decision.get("application_id"))
+                if app_id in group_ids:
+                    parsed_list.append({**decision, "application_id": app_id})
+                    group_ids.discard(app_id)
+            failed_ids.extend(group_ids)
+
+        if options["REJECT_NOT_SHORTLISTED"]:
+            parsed_list.extend(
+                {
+                    "application_id": a["application_id"],
+                    "decision": "rejected",
+                    "reasons": "Your profile did not closely match the job requirements.",
+                }
+                for a in not_shortlisted
+            )
+
+        print(f"Parsed screening result: {parsed_list}")
+
+        if parsed_list:
+            saved = save_screening_decisions(parsed_list)
+            for app_id in saved["missing"]:
+                print(f"Application with id {app_id} does not exist.")
+            print(f"Saved {saved['saved']} screening decisions")
+
+        return {
+            "success": True,
+            "processed_applications": len(parsed_list),
+            "unscreened_applications": failed_ids,
+            "groups": len(groups),
+            "not_shortlisted": [a["application_id"] for a in not_shortlisted],
+        }
 
     except Exception as e:
         print(f"Error screening applications {application_ids}: {str(e)}")
@@ -159,15 +205,22 @@ def screen_candidates_applications(
 
 
 @shared_task
-def generate_exam_questions(application_exam_mapping, exam_type) -> dict:
-    """Celery task to generate exam questions based on application data"""
+def generate_exam_questions(
+    application_exam_mapping, exam_type, question_mode: Optional[str] = None
+) -> dict:
+    """Celery task to generate exam questions based on application data
+
+    question_mode "per_application" generates every exam separately; "pool"
+    generates one shared pool per job and hands each exam a subset of it.
+    """
     try:
         applications_data = []
+        job_ids = {}
         applications = Application.objects.filter(
             id__in=[mapping[0] for mapping in application_exam_mapping],
             status="accepted"
 
-        ).select_related("u_id")
+        ).select_related("u_id", "j_id")
 
         for app in applications:
             user = app.u_id
@@ -184,82 +237,42 @@ def generate_exam_questions(application_exam_mapping, exam_type) -> dict:
                     "job_requirements": job_requirements,
                 }
             )
+            job_ids[app.id] = app.j_id_id
 
-        for application_data in applications_data:
-            app_id = application_data.get("application_id")
-            print(f"Processing application ID: {app_id}")
-
-            if exam_type.lower() == "interview":
-                continue
-
-            result = agent.generate_questions(exam_type, application_data, 5)
-            print(f"Screening result: {result}")
+        if exam_type.lower() == "interview":
+            return {"success": True, "message": "Exam questions generation completed"}
 
-            if not result.get("success") or not result.get("questions"):
-                print(f"No questions generated for application {app_id}")
-                continue
-
-            try:
-                # Extract and clean JSON string
-                json_str = result["questions"].strip()
-
-                # Remove code block markers if present
-                if json_str.startswith("```json"):
-                    json_str = json_str[7:].strip()
-                if json_str.endswith("```"):
-                    json_str = json_str[:-3].strip()
-
-                print(f"Cleaned JSON string length: {len(json_str)}")
-                print(f"First 500 chars: {json_str[:500]}...")
-
-                # Validate JSON structure before parsing
-                if not is_valid_json_structure(json_str):
-                    print(f"Invalid JSON structure for application {app_id}")
-                    # Try to get at least the first complete question
-                    fixed_json = extract_complete_questions(json_str)
-                    if fixed_json:
-                        parsed_data = json.loads(fixed_json)
-                        app_exam_tuple = next(
-                            (t for t in application_exam_mapping if t[0] == app_id),
-                            None,
-                        )
-                        if app_exam_tuple:
-                            process_questions_for_application(
-                                parsed_data, app_exam_tuple
-                            )
-                    else:
-                        print(
-                            f"Could not extract valid questions from truncated JSON for application {app_id}"
-                        )
-                        continue
-                else:
-                    # Parse the complete JSON
-                    parsed_data = json.loads(json_str)
-                    app_exam_tuple = next(
-                        (t for t in application_exam_mapping if t[0] == app_id), None
-                    )
-                    if app_exam_tuple:
-                        process_questions_for_application(parsed_data, app_exam_tuple)
-
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error for application {app_id}: {e}")
-                # Try to extract what we can from the truncated response
-                extracted_data = extract_questions_from_truncated_json(json_str, app_id)
-                if extracted_data and extracted_data.get("questions"):
-                    app_exam_tuple = next(
-                        (t for t in application_exam_mapping if t[0] == app_id), None
-                    )
-                    if app_exam_tuple:
-                        process_questions_for_application(parsed_data, app_exam_tuple)
-                else:
-                    print(
-                        f"Could not extract any questions from JSON for application {app_id}"
-                    )
-
-            except Exception as e:
-                print(f"Error processing questions for application {app_id}: {str(e)}")
-
-            time.sleep(60)
+        options = question_pool_settings()
+        question_mode = question_mode or options["MODE"]
+        if question_mode == "pool":
+            generate_pooled_exam_questions(
+                applications_data, job_ids, application_exam_mapping, exam_type, options
+            )
+            return {"success": True, "message": "Exam questions generation completed"}
+
+        # All calls are dispatched concurrently on one worker; the shared rate
+        # limiter keeps the batch inside the provider quota.
+        calls = [
+            agent.question_generation_call(
+                application_data.get("application_id"),
+                exam_type,
+                application_data,
+                options["QUESTIONS_PER_EXAM"],
+            )
+            for application_data in applications_data
+        ]
+        exam_ids = {mapping[0]: mapping[1] for mapping in application_exam_mapping}
+        writer = QuestionWriter(exam_ids, options["WRITE_BATCH"])
+        for dispatched in agent.run_batch(calls, concurrency=AI_BATCH_CONCURRENCY):
+            app_id = dispatched.key
+            print(f"Processing application ID: {app_id}")
+            result = (
+                {"success": True, "questions": dispatched.output}
+                if dispatched.success
+                else {"success": False, "error": dispatched.error}
+            )
+            writer.add(app_id, parse_generated_questions(result, app_id))
+        writer.flush()
 
     except Exception as e:
         print(f"Error screening applications {application_exam_mapping}: {str(e)}")
@@ -268,308 +281,296 @@ def generate_exam_questions(application_exam_mapping, exam_type) -> dict:
     return {"success": True, "message": "Exam questions generation completed"}
 
 
-def is_valid_json_structure(json_str):
-    """Check if JSON has complete structure"""
-    try:
-        # Quick validation without full parsing
-        return (
-            json_str.strip().startswith("{")
-            and '"questions"' in json_str
-            and '"application_id"' in json_str
-        )
-    except:
-        return False
-
-
-def extract_complete_questions(json_str):
-    """Extract complete questions from potentially truncated JSON"""
-    try:
-        # Find the questions array and extract complete question objects
-        questions_match = re.search(r'"questions":\s*\[(.*?)\]', json_str, re.DOTALL)
-        if not questions_match:
-            return None
-
-        questions_content = questions_match.group(1)
-
-        # Extract complete question objects (those that have both { and })
-        complete_questions = []
-        brace_count = 0
-        current_question = ""
-
-        for char in questions_content:
-            current_question += char
-            if char == "{":
-                brace_count += 1
-            elif char == "}":
-                brace_count -= 1
-                if brace_count == 0:
-                    # Found a complete question object
-                    complete_questions.append(current_question.strip())
-                    current_question = ""
-
-        if complete_questions:
-            # Reconstruct valid JSON with complete questions only
-            fixed_json = f'{{"application_id": 17, "questions": [{",".join(complete_questions)}]}}'
-            return fixed_json
+def generate_pooled_exam_questions(
+    applications_data, job_ids, application_exam_mapping, exam_type, options
+):
+    """Generate one question pool per job and give each exam a personalised subset.
 
-        return None
-    except Exception as e:
-        print(f"Error extracting complete questions: {e}")
-        return None
+    Pool prompts only contain the job text, so the response cache serves the
+    same pool until the job description or requirements change.
+    """
+    pools = {}
+    pool_calls = {}
+    for application_data in applications_data:
+        application_data["job_id"] = job_ids[application_data["application_id"]]
+        key = pool_key(application_data)
+        if key not in pool_calls:
+            pool_calls[key] = agent.question_generation_call(
+                key, exam_type, pool_inputs(application_data), options["POOL_SIZE"]
+            )
 
+    # CV-specific top-up questions are generated alongside the pools
+    topup = options["CV_TOPUP"]
+    topup_calls = [
+        agent.question_generation_call(
+            ("topup", application_data["application_id"]),
+            exam_type,
+            application_data,
+            topup,
+        )
+        for application_data in applications_data
+        if topup > 0
+    ]
+    print(
+        f"Generating {len(pool_calls)} question pools and {len(topup_calls)} top-ups "
+        f"for {len(applications_data)} applications"
+    )
+
+    topups = {}
+    calls = list(pool_calls.values()) + topup_calls
+    for dispatched in agent.run_batch(calls, concurrency=AI_BATCH_CONCURRENCY):
+        if not dispatched.success:
+            print(f"Question generation {dispatched.key} failed: {dispatched.error}")
+            continue
+        parser = IncrementalJSONParser("questions")
+        parser.feed(dispatched.output)
+        questions = [q for q in parser.items if q.get("question")]
+        if isinstance(dispatched.key, tuple):
+            topups[dispatched.key[1]] = questions
+        else:
+            pools[dispatched.key] = questions
+
+    exam_ids = {mapping[0]: mapping[1] for mapping in application_exam_mapping}
+    writer = QuestionWriter(exam_ids, options["WRITE_BATCH"])
+    for application_data in applications_data:
+        app_id = application_data["application_id"]
+        pool = pools.get(pool_key(application_data), [])
+        count = max(0, options["QUESTIONS_PER_EXAM"] - len(topups.get(app_id, [])))
+        questions = select_questions(
+            pool, application_data, count, options["RELEVANCE_SHORTLIST"]
+        ) + topups.get(app_id, [])
+        writer.add(app_id, questions)
+    writer.flush()
+
+
+class QuestionWriter:
+    """Buffer generated questions and write them in bulk every `batch_size` exams"""
+
+    def __init__(self, exam_ids, batch_size=100):
+        self.exam_ids = exam_ids
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, app_id, questions):
+        if not questions:
+            print(f"No questions generated for application {app_id}")
+            return
+        exam_id = self.exam_ids.get(app_id)
+        if exam_id is None:
+            return
+        self.pending.append((app_id, exam_id, questions))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
 
-def extract_questions_from_truncated_json(json_str, app_id):
-    """Extract questions from truncated JSON response"""
-    try:
-        # Extract application_id if present
-        app_id_match = re.search(r'"application_id":\s*(\d+)', json_str)
-        extracted_app_id = app_id_match.group(1) if app_id_match else app_id
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            saved = save_generated_questions(self.pending)
+            print(
+                f"Created {saved['created']} questions for {saved['applications']} applications"
+            )
+            for app_id in saved["skipped"]:
+                print(f"No questions stored for application {app_id}")
+        except Exception as e:
+            print(f"Error storing questions for {len(self.pending)} applications: {str(e)}")
+        self.pending = []
 
-        # Find the questions array start
-        questions_start = json_str.find('"questions": [')
-        if questions_start == -1:
-            return None
 
-        # Extract from questions array start to end of string
-        questions_section = json_str[questions_start + 13 :]  # Skip '"questions": ['
+def parse_generated_questions(result, app_id):
+    """Parse one generation result into its list of questions"""
+    print(f"Screening result: {result}")
 
-        # Find complete question objects
-        question_objects = []
-        current_obj = ""
-        brace_count = 0
-        in_string = False
-        escape_next = False
+    if not result.get("success") or not result.get("questions"):
+        return []
 
-        for char in questions_section:
-            if escape_next:
-                current_obj += char
-                escape_next = False
-                continue
+    # One pass over the output; a truncated response still yields every
+    # question object that was closed before the cut.
+    parser = IncrementalJSONParser("questions")
+    parser.feed(result["questions"])
+    if not parser.complete:
+        print(
+            f"Truncated JSON for application {app_id}, "
+            f"recovered {len(parser.items)} questions"
+        )
+    return [q for q in parser.items if q.get("question")]
 
-            if char == "\\":
-                current_obj += char
-                escape_next = True
-                continue
 
-            if char == '"' and not escape_next:
-                in_string = not in_string
-
-            if not in_string:
-                if char == "{":
-                    brace_count += 1
-                elif char == "}":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        current_obj += char
-                        question_objects.append(current_obj.strip())
-                        current_obj = ""
-                        continue
-                elif brace_count == 0 and char == "]":
-                    break
-
-            current_obj += char
-
-            # Safety break if we've gone too far without finding complete objects
-            if len(current_obj) > 10000:
-                break
-
-        if question_objects:
-            # Create valid JSON with extracted questions
-            valid_questions = []
-            for q_obj in question_objects:
-                try:
-                    # Validate this is a complete question object
-                    question_data = json.loads(q_obj)
-                    if question_data.get("question"):
-                        valid_questions.append(q_obj)
-                except:
-                    continue
+def load_interview_exam(applicationExamId):
+    return ApplicationExam.objects.select_related(
+        "e_id", "a_id__j_id__c_id"
+    ).get(id=applicationExamId, a_id__status="accepted")
 
-            if valid_questions:
-                return {
-                    "application_id": int(extracted_app_id),
-                    "questions": [json.loads(q) for q in valid_questions],
-                }
 
-        return None
+def build_interview_inputs(applicationExam, user, answer_override=None):
+    """Prompt inputs for the next interview question and the conversation memory.
 
-    except Exception as e:
-        print(f"Error extracting from truncated JSON: {e}")
-        return None
+    answer_override replaces the answer to the latest question, which lets a
+    draft be generated from a transcript that has not been saved yet.
+    """
+    examObservation,_= InterviewObservation.objects.get_or_create(e=applicationExam)
+    exam_duration = applicationExam.e_id.e_duration
+    app = applicationExam.a_id
+    company = app.j_id.c_id
+    cv = Cv.objects.filter(user_id=user).first()
+    job_requirements = app.j_id.j_requirements if app.j_id else ""
+    job_description = app.j_id.j_description if app.j_id else ""
+
+    # Recent turns verbatim plus a rolling summary keep the prompt size flat
+    memory = InterviewMemory.load(applicationExam)
+    memory.refresh(applicationExam)
+    if answer_override is not None and memory.recent:
+        memory.recent[-1]["answer"]["text"] = answer_override
+
+    user_physical_appearance= {
+        "clothing": examObservation.o_clothing,
+        "emotions": examObservation.o_face_expressions
+    }
+    inputs = {
+        "company_info": company.c_description,
+        "job_description": job_description + job_requirements,
+        "cv_content": cv_profile(cv),
+        "application_letter": app.a_cover_letter_content,
+        "previous_questions": memory.prompt_context(),
+        "exam_duration": exam_duration,
+        "current_time": applicationExam.current_time,
+        "physical_appearance": json.dumps(user_physical_appearance),
+    }
+    return inputs, memory
 
 
-def process_questions_for_application(parsed_data, app_exam_tuple):
-    """Process questions for a specific application"""
+@shared_task
+def generate_next_interview_question(applicationExamId, user_id) -> dict:
+    """Celery task to generate exam questions based on application data"""
     try:
-        application = Application.objects.get(id=app_exam_tuple[0], status="accepted")
-        application.status = "exam_generated"
-        application.save()
-
-        # Get the questions array from parsed data
-        questions = parsed_data.get("questions", [])
-
-        if not questions:
-            print(
-                f"No questions found in parsed data for application {app_exam_tuple[0]}"
-            )
-            return
 
-        # Get or create the exam for this application
-        exam = ApplicationExam.objects.get(
-            a_id=application,
-            id=app_exam_tuple[1],
-        )
-
-        created_count = 0
-        for q in questions:
-            question_text = q.get("question", "").strip()
-            if not question_text:  # Skip empty questions
-                continue
-
-            choices = q.get("choices", [])
-            correct_answer = q.get("expected_answer", "")
-            question_type = q.get("question_type", "short-answer")
-
-            exam_question = ExamQuestion.objects.create(
-                e=exam,
-                q_text=question_text,
-                q_choices=json.dumps(choices) if choices else "[]",
-                q_correct_answer=correct_answer,
-                q_ai_generated=True,
-                q_score_weight=1.0,
-                q_type=question_type,
-            )
-            created_count += 1
-            print(
-                f"Created ExamQuestion {exam_question.id} for Application {app_exam_tuple[0]}"
+        applicationExam = load_interview_exam(applicationExamId)
+        user = User.objects.get(id=user_id)
+        inputs, memory = build_interview_inputs(applicationExam, user)
+        memory.save(applicationExam)
+
+        # Commit the draft generated while the candidate was speaking if it was
+        # based on (nearly) the same answer; otherwise generate it now.
+        draft = None
+        if memory.latest_question is not None and memory.recent:
+            draft = speculative_drafts.take(
+                applicationExam.id,
+                memory.latest_question.id,
+                memory.recent[-1]["answer"]["text"],
             )
+        if draft is not None:
+            result = {"success": True, "questions": draft}
+        else:
+            result = agent.generate_next_interview_question(**inputs)
 
-        print(
-            f"Successfully created {created_count} questions for application {app_exam_tuple[0]}"
-        )
+        commit_next_interview_question(applicationExam, user, memory, result)
 
-    except Application.DoesNotExist:
-        print(f"Application with id {app_exam_tuple[0]} does not exist.")
     except Exception as e:
-        print(f"Error updating application {app_exam_tuple[0]}: {str(e)}")
+        print(f"Error screening applications  {str(e)}")
+        return {"success": False, "error": str(e)}
+
+    return {"success": True, "message": "Exam questions generation completed"}
 
 
 @shared_task
-def generate_next_interview_question(applicationExamId, user_id) -> dict:
-    """Celery task to generate exam questions based on application data"""
+def draft_next_interview_question(applicationExamId, user_id, transcript) -> dict:
+    """Draft the next interview question from a partial answer transcript"""
+    if not speculative_drafts.enabled:
+        return {"success": False, "error": "Interview drafts are disabled"}
     try:
-
-        applicationExam = ApplicationExam.objects.get(id=applicationExamId, a_id__status="accepted")
-        examObservation,_= InterviewObservation.objects.get_or_create(e=applicationExam)
-        exam_duration = applicationExam.e_id.e_duration
-        app = applicationExam.a_id
+        applicationExam = load_interview_exam(applicationExamId)
+        if applicationExam.exam_ended:
+            return {"success": False, "error": "Interview has ended"}
+        if applicationExam.a_id.u_id_id != user_id:
+            return {"success": False, "error": "Interview belongs to another candidate"}
         user = User.objects.get(id=user_id)
-        company = Company.objects.get(id=app.j_id.c_id.id)
-        cv_content = Cv.objects.filter(user_id=user).first()
-        job_requirements = app.j_id.j_requirements if app.j_id else ""
-        job_description = app.j_id.j_description if app.j_id else ""
-        conversation = []
-        company_info = company.c_description
-        application_letter_content = app.a_cover_letter_content
-        questions = InterviewQuestion.objects.filter(e=applicationExam).order_by(
-            "created_at"
+        inputs, memory = build_interview_inputs(
+            applicationExam, user, answer_override=transcript
         )
-        for q in questions:
-            answer = InterviewResponse.objects.filter(q=q).first()
-            print(q.q_text, answer.r_text, sep=" ")
-            convo = {
-                "question": {"text": q.q_text, "asked_at": f"{q.current_time}secs ago"},
-                "answer": {
-                    "text": answer.r_text,
-                    "answered_at": f"{answer.current_time} secs ago",
-                },
-            }
-            conversation.append(convo)
-        user_physical_appearance= {
-            "clothing": examObservation.o_clothing,
-            "emotions": examObservation.o_face_expressions
-        }
-     
-        result = agent.generate_next_interview_question(
-            company_info=company_info,
-            job_description=job_description + job_requirements,
-            cv_content=cv_content,
-            application_letter=application_letter_content,
-            previous_questions=json.dumps(conversation),
-            exam_duration=exam_duration,
-            current_time=applicationExam.current_time,
-            physical_appearance= json.dumps(user_physical_appearance)
+        if memory.latest_question is None:
+            return {"success": False, "error": "No question to answer yet"}
+        if not speculative_drafts.claim_turn(applicationExam.id, memory.latest_question.id):
+            return {"success": False, "error": "Draft allowance for this turn is used up"}
+
+        speculative_drafts.record("started")
+        result = agent.generate_next_interview_question(**inputs)
+        if not result["success"]:
+            return {"success": False, "error": result.get("error")}
+        speculative_drafts.store(
+            applicationExam.id, memory.latest_question.id, transcript, result["questions"]
         )
-        if result["success"] == True:
-            parsed_data = parse_questions_data(result)
-            if parsed_data:
-
-                next_question = parsed_data["questions"]["next_question"]
-                print(next_question)
-                expectedAnswer = ""
-                session_ended= next_question["session_ended"]
-                if session_ended=="yes":
-                    applicationExam.exam_ended=True
-                    applicationExam.save()
-                for element in next_question["expected_answer_elements"]:
-                    expectedAnswer += f"  - {element}"
-                new_question = InterviewQuestion.objects.create(
-                    e=applicationExam,
-                    q_text=next_question["question"],
-                    q_ai_generated=True,
-                    q_score_weight=1,
-                    q_type=next_question["question_type"],
-                    q_correct_answer=expectedAnswer,
-                )
-                new_answer = InterviewResponse.objects.create(
-                    q=new_question,
-                    r_text="",
-                )
-                p_question = None
-                if len(questions)>0:
-                    p_question= questions[0]
-                else:
-                    p_question=new_question
-                p_answer = answer = InterviewResponse.objects.filter(
-                    q=p_question
-                ).first()
-                ai_response = {
-                    "user_id": user.id,
-                    "p_question": {
-                        "q_id": p_question.id,
-                        "q_text": p_question.q_text,
-                        "a_id": p_answer.id,
-                        "a_text": p_answer.r_text,
-                    },
-                    "n_question": {
-                        "q_id": new_question.id,
-                        "q_text": new_question.q_text,
-                        "a_id": new_answer.id,
-                        "a_text": new_answer.r_text,
-                    },
-                    "hangup":True if session_ended=="yes" else False
-                }
-                ai_response_str = json.dumps(ai_response)
-                process_ai_response(ai_response_str, user.id)
-                for element in next_question["expected_answer_elements"]:
-                    print(f"  - {element}")
-
-                print("\nPotential Follow-up Paths:")
-                for path in next_question["potential_follow_up_paths"]:
-                    print(f"  - {path}")
-
-                # You can also access individual fields directly:
-                print(
-                    f"\nDirect access example - Question: {parsed_data['questions']['next_question']['question']}"
-                )
-            else:
-                print("Failed to parse data")
 
     except Exception as e:
-        print(f"Error screening applications  {str(e)}")
+        print(f"Error drafting next interview question {str(e)}")
         return {"success": False, "error": str(e)}
 
-    return {"success": True, "message": "Exam questions generation completed"}
+    return {"success": True, "message": "Interview question drafted"}
+
+
+def commit_next_interview_question(applicationExam, user, memory, result):
+    """Persist a generated interview question and push it to the candidate"""
+    if result["success"] == True:
+        parsed_data = parse_questions_data(result)
+        next_question = None
+        if parsed_data and isinstance(parsed_data["questions"], dict):
+            next_question = parsed_data["questions"].get("next_question")
+        # A truncated response can recover a next_question without its text
+        if isinstance(next_question, dict) and next_question.get("question"):
+
+            print(next_question)
+            expectedAnswer = ""
+            session_ended= next_question.get("session_ended", "no")
+            if session_ended=="yes":
+                applicationExam.exam_ended=True
+                applicationExam.save()
+            for element in next_question.get("expected_answer_elements", []):
+                expectedAnswer += f"  - {element}"
+            new_question = InterviewQuestion.objects.create(
+                e=applicationExam,
+                q_text=next_question["question"],
+                q_ai_generated=True,
+                q_score_weight=1,
+                q_type=next_question.get("question_type", ""),
+                q_correct_answer=expectedAnswer,
+            )
+            new_answer = InterviewResponse.objects.create(
+                q=new_question,
+                r_text="",
+            )
+            p_question = memory.latest_question or new_question
+            p_answer = InterviewResponse.objects.filter(
+                q=p_question
+            ).first()
+            ai_response = {
+                "user_id": user.id,
+                "p_question": {
+                    "q_id": p_question.id,
+                    "q_text": p_question.q_text,
+                    "a_id": p_answer.id,
+                    "a_text": p_answer.r_text,
+                },
+                "n_question": {
+                    "q_id": new_question.id,
+                    "q_text": new_question.q_text,
+                    "a_id": new_answer.id,
+                    "a_text": new_answer.r_text,
+                },
+                "hangup":True if session_ended=="yes" else False
+            }
+            ai_response_str = json.dumps(ai_response)
+            process_ai_response(ai_response_str, user.id)
+            start_answer_turn(user.id)
+            for element in next_question.get("expected_answer_elements", []):
+                print(f"  - {element}")
+
+            print("\nPotential Follow-up Paths:")
+            for path in next_question.get("potential_follow_up_paths", []):
+                print(f"  - {path}")
+
+            # You can also access individual fields directly:
+            print(f"\nDirect access example - Question: {next_question['question']}")
+        else:
+            print("Failed to parse data")
 
 
 def parse_questions_data(data):
@@ -577,23 +578,13 @@ def parse_questions_data(data):
     Parse the nested JSON structure from the questions field
     """
     try:
-        # Extract the JSON string from the markdown code block
-        questions_str = data["questions"]
-
-        # Remove the markdown code block markers (```json and ```)
-        if questions_str.startswith("```json"):
-            questions_str = questions_str[7:]  # Remove '```json'
-        if questions_str.endswith("```"):
-            questions_str = questions_str[:-3]  # Remove '```'
-
-        # Parse the JSON string
-        questions_data = json.loads(questions_str.strip())
+        questions_data = parse_json_output(data["questions"])
+        if questions_data is None:
+            print("Error parsing JSON: no JSON value in model output")
+            return None
 
         return {"success": data["success"], "questions": questions_data}
 
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON: {e}")
-        return None
     except KeyError as e:
         print(f"Missing key in data: {e}")
         return None
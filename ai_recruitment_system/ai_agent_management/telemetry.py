@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from celery.signals import task_postrun
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TELEMETRY_SETTINGS = {
+    "ENABLED": True,
+    "FLUSH_SIZE": 50,  # buffered calls written per bulk insert
+    "FLUSH_INTERVAL": 10,  # seconds before a partial buffer is written
+    "RETENTION_DAYS": 14,
+    "PRUNE_INTERVAL": 60 * 60,  # seconds between retention sweeps per process
+    "PRICES": {},  # model name -> {"input": $, "output": $} per million tokens
+}
+
+# Route label (see routing.LengthRouter) attached to the calls made under it
+_current_route = contextvars.ContextVar("llm_route", default="")
+
+JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def telemetry_settings() -> Dict[str, Any]:
+    return {**DEFAULT_TELEMETRY_SETTINGS, **getattr(settings, "AI_TELEMETRY", {})}
+
+
+def needs_json_repair(text: Optional[str]) -> bool:
+    """True when JSON-looking output will only parse through the repair fallbacks"""
+    if not text:
+        return False
+    body = JSON_FENCE.sub("", text.strip())
+    if not body.startswith(("{", "[")):
+        return False
+    try:
+        json.loads(body)
+    except ValueError:
+        return True
+    return False
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class LLMTelemetry:
+    """Buffered recorder for LLMCallMetric rows.
+
+    record() only appends to an in-process buffer, so it is safe to call from
+    the dispatcher's event loop. The buffer is written with one bulk_create
+    from a synchronous thread once it is full or old enough, and whatever is
+    left when a Celery task finishes is written by flush_task_telemetry, so
+    the last calls of an idle worker are not held back until its next task.
+    Rows older than RETENTION_DAYS are pruned at most once per PRUNE_INTERVAL.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**telemetry_settings(), **(options or {})}
+        self.enabled = self.options["ENABLED"]
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+        self._local = threading.local()
+
+    def record(self, **fields):
+        if not self.enabled:
+            return
+        fields.setdefault("started_at", timezone.now())
+        fields.setdefault("route", _current_route.get())
+        fields["error"] = (fields.get("error") or "")[:255]
+        with self._lock:
+            self._buffer.append(fields)
+        self.maybe_flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of recorded calls not yet written"""
+        return len(self._buffer)
+
+    @contextmanager
+    def route(self, label: str):
+        """Tag the calls recorded inside the block with a route label"""
+        token = _current_route.set(label)
+        try:
+            yield
+        finally:
+            _current_route.reset(token)
+
+    def defer_flushes(self):
+        """Leave writes from the current (worker) thread to the threads that own a DB connection"""
+        self._local.deferred = True
+
+    def maybe_flush(self):
+        """Flush when due, unless called from inside an event loop or a deferred thread"""
+        if getattr(self._local, "deferred", False):
+            return
+        try:
+            asyncio.get_running_loop()
+            return
+        except RuntimeError:
+            pass
+        due = (
+            len(self._buffer) >= self.options["FLUSH_SIZE"]
+            or time.monotonic() - self._last_flush >= self.options["FLUSH_INTERVAL"]
+        )
+        if due and self._buffer:
+            self.flush()
+
+    def flush(self) -> int:
+        from .models import LLMCallMetric
+
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        try:
+            LLMCallMetric.objects.bulk_create([LLMCallMetric(**row) for row in rows])
+        except Exception as e:
+            # Telemetry must never fail the LLM call it describes
+            logger.warning("Dropping %s LLM call metrics: %s", len(rows), e)
+            return 0
+        if time.monotonic() - self._last_prune >= self.options["PRUNE_INTERVAL"]:
+            self.prune()
+        return len(rows)
+
+    def prune(self) -> int:
+        from .models import LLMCallMetric
+
+        self._last_prune = time.monotonic()
+        cutoff = timezone.now() - timedelta(days=self.options["RETENTION_DAYS"])
+        try:
+            deleted, _ = LLMCallMetric.objects.filter(started_at__lt=cutoff).delete()
+        except Exception as e:
+            logger.warning("LLM call metric pruning failed: %s", e)
+            return 0
+        return deleted
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        price = self.options["PRICES"].get(model)
+        if not price:
+            return 0.0
+        return (
+            input_tokens * price.get("input", 0.0) + output_tokens * price.get("output", 0.0)
+        ) / 1_000_000
+
+
+def summarize_calls(rows: Iterable[Dict[str, Any]], key: str = "chain") -> List[Dict[str, Any]]:
+    """Per-key call counts, latency percentiles, token totals, cost and rates"""
+    groups: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[row[key]].append(row)
+
+    summary = []
+    for name, calls in groups.items():
+        # Cache hits would drag the percentiles to zero, so latency covers LLM calls only
+        live = [c for c in calls if not c["cache_hit"]]
+        wall = [c["wall_ms"] for c in live]
+        waits = [c["queue_wait_ms"] for c in live]
+        input_tokens = sum(c["input_tokens"] for c in live)
+        output_tokens = sum(c["output_tokens"] for c in live)
+        summary.append(
+            {
+                key: name,
+                "calls": len(calls),
+                "llm_calls": len(live),
+                "cache_hit_rate": round(1 - len(live) / len(calls), 4),
+                "error_rate": round(sum(1 for c in calls if not c["success"]) / len(calls), 4),
+                "json_repair_rate": round(sum(1 for c in calls if c["json_repair"]) / len(calls), 4),
+                "retries": sum(c["retries"] for c in calls),
+                "wall_ms": {
+                    "p50": round(percentile(wall, 0.5), 1),
+                    "p95": round(percentile(wall, 0.95), 1),
+                    "p99": round(percentile(wall, 0.99), 1),
+                },
+                "queue_wait_ms": {
+                    "p50": round(percentile(waits, 0.5), 1),
+                    "p95": round(percentile(waits, 0.95), 1),
+                },
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost": round(
+                    sum(telemetry.cost(c["model"], c["input_tokens"], c["output_tokens"]) for c in live),
+                    6,
+                ),
+            }
+        )
+    summary.sort(key=lambda item: item["wall_ms"]["p95"] * item["llm_calls"], reverse=True)
+    return summary
+
+
+telemetry = LLMTelemetry()
+
+
+@task_postrun.connect
+def flush_task_telemetry(sender=None, **extra):
+    """Write the calls a finished task recorded before the worker goes idle"""
+    if sender is None or not sender.name.startswith("ai_agent_management."):
+        return
+    if telemetry.enabled and telemetry.pending:
+        telemetry.flush()
@@ -1,3 +1,304 @@
-from django.test import TestCase
+import time
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from .batching import TokenBudgetBatcher, fit_application_to_budget
+from .cache import LLMResponseCache
+from .compression import compress_document, normalise_lines
+from .idempotency import settle_task_key, task_key
+from .matching import shortlist_applications, top_k
+from .streaming_json import IncrementalJSONParser, parse_json_output
+from .tasks import parse_cv_task
+from .utils import TextExtractor
 
-# Create your tests here.
+
+class LLMResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("ai_agent_management.cache.get_redis_client", return_value=None)
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = LLMResponseCache({"ENABLED": True, "LOCAL_MAX_ENTRIES": 2, "MAX_VALUE_BYTES": 16})
+
+    def test_key_ignores_input_order_and_tracks_every_part(self):
+        key = LLMResponseCache.make_key("cfg", "model", 0.2, "tpl", {"a": 1, "b": 2})
+        self.assertEqual(key, LLMResponseCache.make_key("cfg", "model", 0.2, "tpl", {"b": 2, "a": 1}))
+        self.assertNotEqual(key, LLMResponseCache.make_key("cfg", "model", 0.3, "tpl", {"a": 1, "b": 2}))
+        self.assertNotEqual(key, LLMResponseCache.make_key("cfg", "model", 0.2, "tpl2", {"a": 1, "b": 2}))
+
+    def test_local_hit_and_miss(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.set("k", "value")
+        self.assertEqual(self.cache.get("k"), "value")
+        stats = self.cache.stats()["process"]
+        self.assertEqual((stats["hits"], stats["local_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_local_entries_are_evicted_least_recently_used_first(self):
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        self.cache.get("a")
+        self.cache.set("c", "3")
+        self.assertEqual(self.cache.get("a"), "1")
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_expired_entries_are_misses(self):
+        self.cache.set("k", "value", ttl=1)
+        with mock.patch("ai_agent_management.cache.time.time", return_value=time.time() + 5):
+            self.assertIsNone(self.cache.get("k"))
+
+    def test_oversized_and_non_text_values_are_not_stored(self):
+        self.cache.set("big", "x" * 17)
+        self.cache.set("obj", {"a": 1})
+        self.assertIsNone(self.cache.get("big"))
+        self.assertIsNone(self.cache.get("obj"))
+
+    def test_counters_reach_redis_in_one_batch(self):
+        client = mock.MagicMock()
+        client.pipeline.return_value.execute.return_value = [True, 1, 1]
+        self.redis.return_value = client
+        self.cache.set("k", "value")
+        for _ in range(5):
+            self.cache.get("k")
+        client.pipeline.return_value.hincrby.assert_not_called()
+
+        self.cache.flush_stats()
+        pipe = client.pipeline.return_value
+        self.assertEqual(pipe.execute.call_count, 2)  # set() write plus one stats flush
+        flushed = {c.args[1]: c.args[2] for c in pipe.hincrby.call_args_list}
+        self.assertEqual(flushed, {"sets": 1, "hits": 5, "local_hits": 5})
+
+        pipe.hincrby.reset_mock()
+        self.cache.flush_stats()
+        pipe.hincrby.assert_not_called()
+
+    def test_counters_flush_once_the_interval_has_passed(self):
+        client = mock.MagicMock()
+        client.get.return_value = None
+        self.redis.return_value = client
+        self.cache.stats_flush_interval = 0
+        self.cache.get("missing")
+        client.pipeline.return_value.hincrby.assert_called_once_with("ai:llm_cache:stats", "misses", 1)
+
+
+class BatchingTests(SimpleTestCase):
+    def test_groups_stay_within_the_token_budget(self):
+        batcher = TokenBudgetBatcher(max_tokens=10, reserved_tokens=2, estimator=len)
+        groups = batcher.pack(["aaa", "bbb", "cc", "dddd", "eeeeeeeeeeee"])
+        self.assertEqual(groups, [["aaa", "bbb", "cc"], ["dddd"], ["eeeeeeeeeeee"]])
+
+    def test_groups_respect_max_items(self):
+        batcher = TokenBudgetBatcher(max_tokens=100, max_items=2, estimator=len)
+        self.assertEqual(batcher.pack(list("abcde")), [["a", "b"], ["c", "d"], ["e"]])
+
+    def test_oversized_application_is_shortened_to_fit(self):
+        application = {"application_id": 1, "cv_content": "word " * 400}
+        fitted = fit_application_to_budget(application, 200)
+        self.assertLess(len(fitted["cv_content"]), len(application["cv_content"]))
+        self.assertEqual(fitted["application_id"], 1)
+        self.assertIs(fit_application_to_budget(application, 10000), application)
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    def test_objects_are_returned_as_they_close(self):
+        parser = IncrementalJSONParser("questions")
+        self.assertEqual(parser.feed('```json\n{"questions": [{"question": "A'), [])
+        self.assertEqual(parser.feed('"}, {"question": "B"'), [{"question": "A"}])
+        self.assertEqual(parser.feed('}]}\n```'), [{"question": "B"}])
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.result(), {"questions": [{"question": "A"}, {"question": "B"}]})
+
+    def test_nested_objects_and_braces_in_strings(self):
+        parser = IncrementalJSONParser("questions")
+        parser.feed('{"questions": [{"q": "use {x} and [y]", "meta": {"n": 1}}]}')
+        self.assertEqual(parser.items, [{"q": "use {x} and [y]", "meta": {"n": 1}}])
+
+    def test_truncated_output_keeps_the_complete_prefix(self):
+        text = '{"questions": [{"question": "A"}, {"question": "B", "options": ["x", "y'
+        self.assertEqual(
+            parse_json_output(text),
+            {"questions": [{"question": "A"}, {"question": "B", "options": ["x"]}]},
+        )
+
+    def test_truncation_inside_an_object_does_not_leave_it_empty(self):
+        self.assertIsNone(parse_json_output('{"questions": {"next_question": {'))
+        self.assertEqual(
+            parse_json_output('{"questions": {"next_question": {"question": "Why?", "session_en'),
+            {"questions": {"next_question": {"question": "Why?"}}},
+        )
+        self.assertEqual(parse_json_output('{"a": 1, "b": {"c": ['), {"a": 1})
+
+    def test_unfinished_values_are_dropped(self):
+        self.assertIsNone(parse_json_output('{"a": "unterminated'))
+        self.assertEqual(parse_json_output('{"a": "done", "b": 12'), {"a": "done"})
+
+    def test_empty_containers_survive_in_complete_documents(self):
+        self.assertEqual(parse_json_output('{"a": [], "b": {}}'), {"a": [], "b": {}})
+
+    def test_no_json(self):
+        self.assertIsNone(parse_json_output("I cannot help with that."))
+
+
+class MatchingTests(SimpleTestCase):
+    def applications(self, cvs):
+        job = {"job_title": "Python developer", "job_requirements": "Django REST APIs PostgreSQL"}
+        return [{**job, "application_id": i, "cv_content": cv} for i, cv in enumerate(cvs)]
+
+    def test_top_k_orders_best_first(self):
+        scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+        self.assertEqual(top_k(scores, 2).tolist(), [1, 3])
+        self.assertEqual(top_k(scores, 10).tolist(), [1, 3, 2, 0])
+        self.assertEqual(top_k(scores, 0).tolist(), [])
+
+    def test_closest_cvs_are_shortlisted(self):
+        applications = self.applications([
+            "Chef with pastry experience",
+            "Python developer building Django REST APIs on PostgreSQL",
+            "Truck driver",
+            "Django and Python web developer",
+        ])
+        shortlisted, rest = shortlist_applications(applications, fraction=0.5, min_keep=1, backend="tfidf")
+        self.assertEqual({a["application_id"] for a in shortlisted}, {1, 3})
+        self.assertEqual({a["application_id"] for a in rest}, {0, 2})
+        self.assertTrue(all("match_score" in a for a in rest))
+
+    def test_min_keep_shortlists_small_jobs_whole(self):
+        applications = self.applications(["Chef", "Python developer", "Driver"])
+        shortlisted, rest = shortlist_applications(applications, fraction=0.1, min_keep=5, backend="tfidf")
+        self.assertEqual(len(shortlisted), 3)
+        self.assertEqual(rest, [])
+
+    def test_texts_without_usable_words_skip_shortlisting(self):
+        applications = [{"application_id": i, "cv_content": "", "job_title": "1 2"} for i in range(3)]
+        shortlisted, rest = shortlist_applications(applications, fraction=0.1, min_keep=1, backend="tfidf")
+        self.assertEqual(shortlisted, applications)
+        self.assertEqual(rest, [])
+
+
+class CompressionTests(SimpleTestCase):
+    def test_text_that_fits_is_returned_unchanged(self):
+        text = "Jane Doe\n\n\nPage 1 of 2\n  Experience  \n"
+        compressed, info = compress_document(text, 1000)
+        self.assertEqual(compressed, text)
+        self.assertFalse(info["compressed"])
+
+    def test_page_markers_and_running_footers_are_removed(self):
+        text = (
+            "Jane Doe - CV\nExperience\nEngineer at Acme\n09/2019 - 03/2021\nPage 1 of 2\f"
+            "Jane Doe - CV\nSkills\nPython\n2 of 2"
+        )
+        self.assertEqual(
+            normalise_lines(text),
+            ["Jane Doe - CV", "Experience", "Engineer at Acme", "09/2019 - 03/2021", "Skills", "Python"],
+        )
+
+    def test_repeated_lines_inside_pages_are_kept(self):
+        text = "Experience\nSoftware Engineer\nAcme\n2019\nSoftware Engineer\nGlobex\n2021"
+        self.assertEqual(normalise_lines(text).count("Software Engineer"), 2)
+
+    def test_boilerplate_goes_before_core_sections(self):
+        text = "\n".join(
+            ["Jane Doe", "jane@example.com", "Experience"]
+            + [f"Built system {i} handling payments" for i in range(20)]
+            + ["Skills", "Python, Django, Redis", "References"]
+            + [f"Referee {i}, available on request" for i in range(20)]
+        )
+        compressed, info = compress_document(text, 900)
+        self.assertLessEqual(len(compressed), 900)
+        self.assertIn("references", info["dropped"])
+        self.assertIn("Python, Django, Redis", compressed)
+        self.assertIn("Built system 0 handling payments", compressed)
+        self.assertNotIn("Referee 0", compressed)
+
+
+class CleanTextTests(SimpleTestCase):
+    def test_short_text_only_has_its_whitespace_collapsed(self):
+        self.assertEqual(TextExtractor.clean_text("  Jane   Doe\n\n Python\tdeveloper  "), "Jane Doe Python developer")
+
+    def test_long_text_is_compressed_by_section_then_collapsed(self):
+        text = "\n".join(
+            ["Jane Doe", "Experience"]
+            + [f"Built   system {i} handling payments" for i in range(20)]
+            + ["References"]
+            + [f"Referee {i}, available on request" for i in range(20)]
+        )
+        cleaned = TextExtractor.clean_text(text, max_length=500)
+        self.assertLessEqual(len(cleaned), 500)
+        self.assertNotIn("\n", cleaned)
+        self.assertIn("Built system 0 handling payments", cleaned)
+        self.assertNotIn("Referee", cleaned)
+
+    def test_keep_lines_collapses_whitespace_within_lines(self):
+        cleaned = TextExtractor.clean_text(" Jane   Doe\r\n\n Python\tdeveloper ", max_length=None, keep_lines=True)
+        self.assertEqual(cleaned, "Jane Doe\nPython developer")
+
+
+class IdempotencyTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("ai_agent_management.idempotency.get_redis_client")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def task(self, name="ai_agent_management.tasks.screen"):
+        task = mock.Mock()
+        task.name = name
+        return task
+
+    def test_key_depends_on_task_and_inputs_only(self):
+        key = task_key("t", (1, 2), {"a": 1, "b": 2})
+        self.assertEqual(key, task_key("t", [1, 2], {"b": 2, "a": 1}))
+        self.assertNotEqual(key, task_key("t", (1, 3), {"a": 1, "b": 2}))
+        self.assertNotEqual(key, task_key("u", (1, 2), {"a": 1, "b": 2}))
+        self.assertTrue(key.startswith("ai:task:t:"))
+
+    def test_success_keeps_the_key_for_the_result_window(self):
+        overrides = {"AI_IDEMPOTENCY": {"RESULT_TTL": {"ai_agent_management.tasks.screen": 300}}}
+        with self.settings(**overrides):
+            settle_task_key(self.task(), "id-1", (7,), {}, {"success": True}, "SUCCESS")
+        args = self.client.eval.call_args.args
+        self.assertEqual(args[2:], (task_key("ai_agent_management.tasks.screen", (7,), {}), "id-1", 300))
+
+    def test_reported_failure_releases_the_key(self):
+        overrides = {"AI_IDEMPOTENCY": {"RESULT_TTL": {"ai_agent_management.tasks.screen": 300}}}
+        with self.settings(**overrides):
+            settle_task_key(self.task(), "id-1", (7,), {}, {"success": False}, "SUCCESS")
+            settle_task_key(self.task(), "id-2", (7,), {}, None, "FAILURE")
+        self.assertEqual([c.args[-1] for c in self.client.eval.call_args_list], [0, 0])
+
+    def test_other_apps_tasks_are_left_alone(self):
+        settle_task_key(self.task("file_management.tasks.upload"), "id-1", (), {}, None, "SUCCESS")
+        self.client.eval.assert_not_called()
+
+    def test_a_task_that_returned_nothing_releases_the_key(self):
+        overrides = {"AI_IDEMPOTENCY": {"RESULT_TTL": {"ai_agent_management.tasks.screen": 300}}}
+        with self.settings(**overrides):
+            settle_task_key(self.task(), "id-1", (7,), {}, None, "SUCCESS")
+        self.assertEqual(self.client.eval.call_args.args[-1], 0)
+
+
+@mock.patch("ai_agent_management.tasks.Cv.objects.filter")
+@mock.patch("ai_agent_management.tasks.User.objects.get")
+class ParseCvTaskTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("ai_agent_management.idempotency.get_redis_client")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        overrides = self.settings(AI_IDEMPOTENCY={"RESULT_TTL": {parse_cv_task.name: 60 * 60 * 24}})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def run_and_settle(self, parsed):
+        with mock.patch("ai_agent_management.tasks.agent.parse_cv", return_value=parsed):
+            retval = parse_cv_task(1, "Jane Doe, Python developer")
+        settle_task_key(parse_cv_task, "task-1", (1, "Jane Doe, Python developer"), {}, retval, "SUCCESS")
+        return retval, self.client.eval.call_args.args[-1]
+
+    def test_failed_parse_can_be_retried(self, get_user, filter_cvs):
+        retval, result_ttl = self.run_and_settle({"success": False, "error": "model timeout", "parsed_data": {}})
+        self.assertEqual(retval, {"success": False, "error": "model timeout"})
+        self.assertEqual(result_ttl, 0)
+        filter_cvs.return_value.update.assert_not_called()
+
+    def test_successful_parse_is_reused(self, get_user, filter_cvs):
+        retval, result_ttl = self.run_and_settle({"success": True, "parsed_data": "# Jane Doe", "model_used": "fast"})
+        self.assertTrue(retval["success"])
+        self.assertEqual(result_ttl, 60 * 60 * 24)
+        filter_cvs.return_value.update.assert_called_once_with(parsed_data='"# Jane Doe"')
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import LLMMetricsViewSet
+
+router = DefaultRouter()
+router.register(r'metrics', LLMMetricsViewSet, basename='llm-metrics')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,11 +1,37 @@
 import re
 import json
-import pdfplumber
-import docx2txt
 from typing import Dict, List, Any, Optional
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from langchain.schema import BaseOutputParser
+from file_management.extraction import DOCX, PDF, TXT, extract_text
+from .compression import compress_document
+
+
+def estimate_tokens(text) -> int:
+    """Rough token estimate (about four characters per token)"""
+    if not text:
+        return 0
+    if not isinstance(text, str):
+        text = json.dumps(text, default=str)
+    return len(text) // 4 + 1
+
+
+def load_llm_json(text: str):
+    """Load JSON from raw model output, tolerating markdown code fences"""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"[\[{].*[\]}]", text, re.DOTALL)
+        if not match:
+            raise
+        return json.loads(match.group())
 
 
 class JSONOutputParser(BaseOutputParser):
@@ -29,12 +55,8 @@ class TextExtractor:
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> str:
         """Extract text from PDF file"""
-        text = ""
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-            return text.strip()
+            return extract_text(file_path, PDF).strip()
         except Exception as e:
             raise Exception(f"PDF extraction error: {str(e)}")
 
@@ -42,7 +64,7 @@ class TextExtractor:
     def extract_text_from_docx(file_path: str) -> str:
         """Extract text from DOCX file"""
         try:
-            return docx2txt.process(file_path)
+            return extract_text(file_path, DOCX)
         except Exception as e:
             raise Exception(f"DOCX extraction error: {str(e)}")
 
@@ -50,20 +72,29 @@ class TextExtractor:
     def extract_text_from_txt(file_path: str) -> str:
         """Extract text from TXT file"""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                return file.read()
+            return extract_text(file_path, TXT, use_cache=False)
         except Exception as e:
             raise Exception(f"Text file reading error: {str(e)}")
 
     @staticmethod
-    def clean_text(text: str, max_length: int = 10000) -> str:
-        """Clean and truncate text for LLM processing"""
-        # Remove extra whitespace
-        text = re.sub(r"\s+", " ", text)
-        # Truncate if too long
-        if len(text) > max_length:
-            text = text[:max_length] + "... [truncated]"
-        return text.strip()
+    def clean_text(text: str, max_length: Optional[int] = 10000, keep_lines: bool = False) -> str:
+        """Collapse whitespace for LLM processing, compressing by section when too long.
+
+        keep_lines collapses whitespace within lines only, for callers that
+        compress the text themselves (see routing.LengthRouter).
+        """
+        if keep_lines:
+            cleaned = re.sub(r"[^\S\n\f]+", " ", text)
+            cleaned = re.sub(r" ?([\n\f]) ?", r"\1", cleaned)
+            cleaned = re.sub(r"\n{2,}", "\n", cleaned).strip()
+        else:
+            cleaned = re.sub(r"\s+", " ", text).strip()
+        if max_length is None or len(cleaned) <= max_length:
+            return cleaned
+
+        # Section detection needs the original lines
+        compressed, _ = compress_document(text, max_length)
+        return compressed.strip() if keep_lines else re.sub(r"\s+", " ", compressed).strip()
 
 
 class PromptTemplates:
@@ -422,39 +453,67 @@ class PromptTemplates:
 class ChainBuilder:
     """Helper to build LLM chains with different configurations"""
 
+    # Question type -> PromptTemplates getter, resolved only when requested
+    question_templates = {
+        "written": "get_technical_questions_template",
+        "coding": "get_Coding_questions_template",
+        "aptitude": "get_aptitude_questions_template",
+        "Interview": "get_interview_questions_template",
+    }
+
+    _templates: Dict[str, PromptTemplate] = {}
+
     def __init__(self, config_manager):
         self.config_manager = config_manager
 
+    @classmethod
+    def get_template(cls, name: str) -> PromptTemplate:
+        """Build a PromptTemplates template once per process"""
+        template = cls._templates.get(name)
+        if template is None:
+            template = getattr(PromptTemplates, name)()
+            cls._templates[name] = template
+        return template
+
     def create_chain(self, task_type: str, prompt_template: PromptTemplate, **kwargs):
         """Create LLM chain for specific task"""
         llm = self.config_manager.get_model(task_type, **kwargs)
-        return LLMChain(llm=llm, prompt=prompt_template)
+        return LLMChain(
+            llm=llm, prompt=prompt_template, metadata={"config_name": task_type}
+        )
+
+    def get_chain(self, task_type: str, template_name: str):
+        """Pooled chain for a config and template, rebuilt when the config changes"""
+        key = ("chain", self.config_manager.fingerprint(task_type), template_name)
+
+        def build():
+            chain = self.create_chain(task_type, self.get_template(template_name))
+            # Name used by the call telemetry and routing SLOs, e.g. "candidate_screening"
+            chain.metadata["chain"] = template_name.removeprefix("get_").removesuffix("_template")
+            chain.metadata["template_name"] = template_name
+            # Outputs of JSON chains are only cached once they parse
+            chain.metadata["json_output"] = "JSON" in chain.prompt.template
+            return chain
+
+        return self.config_manager.pooled(key, build)
 
     def create_cv_parsing_chain(self, use_fast_model: bool = False):
         """Create CV parsing chain"""
         task_type = "fast_parser" if use_fast_model else "cv_parser"
-        template = PromptTemplates.get_cv_parsing_template()
-        return self.create_chain(task_type, template)
+        return self.get_chain(task_type, "get_cv_parsing_template")
 
     def create_candidates_screening_chain(self, use_fast_model: bool = False):
         """Create candidates screening chain"""
         task_type = "fast_parser" if use_fast_model else "cv_parser"
-        template = PromptTemplates.get_candidate_screening_template()
-        return self.create_chain(task_type, template)
+        return self.get_chain(task_type, "get_candidate_screening_template")
 
     def create_question_generation_chain(self, question_type: str):
         """Create question generation chain"""
-        template_mapping = {
-            "written": PromptTemplates.get_technical_questions_template(),
-            "coding": PromptTemplates.get_Coding_questions_template(),
-            "aptitude": PromptTemplates.get_aptitude_questions_template(),
-            "Interview": PromptTemplates.get_interview_questions_template(),
-        }
-        template = template_mapping.get(question_type)
-        if not template:
+        template_name = self.question_templates.get(question_type)
+        if not template_name:
             raise ValueError(f"Unsupported question type: {question_type}")
 
-        return self.create_chain("question_generator", template)
+        return self.get_chain("question_generator", template_name)
 
     def create_interview_question_chain(
         self,
@@ -469,6 +528,6 @@ class ChainBuilder:
     ):
         """Create question generation chain"""
 
-        template = PromptTemplates.get_hr_behavioral_questions_template()
-
-        return self.create_chain("interview_question_generator", template)
+        return self.get_chain(
+            "interview_question_generator", "get_hr_behavioral_questions_template"
+        )
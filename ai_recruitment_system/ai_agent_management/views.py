@@ -1,3 +1,103 @@
-from django.shortcuts import render
+from datetime import timedelta
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from user_management.permissions import IsAdmin
+from .fair_share import fair_share
+from .models import LLMCallMetric
+from .telemetry import summarize_calls, telemetry
 
-# Create your views here.
+METRIC_FIELDS = (
+    "chain", "model", "route", "wall_ms", "queue_wait_ms", "input_tokens", "output_tokens",
+    "retries", "cache_hit", "json_repair", "success",
+)
+
+
+class LLMMetricsViewSet(viewsets.ViewSet):
+    """Latency, token and cost aggregations over the recorded LLM calls"""
+
+    permission_classes = [IsAdmin]
+
+    def get_window(self, request):
+        hours = request.query_params.get('hours', '24')
+        hours = int(hours) if hours.isdigit() else 24
+        calls = LLMCallMetric.objects.filter(
+            started_at__gte=timezone.now() - timedelta(hours=hours)
+        )
+        for field in ('chain', 'model'):
+            value = request.query_params.get(field)
+            if value:
+                calls = calls.filter(**{field: value})
+        return hours, calls
+
+    def list(self, request):
+        """
+        Per-chain p50/p95/p99 latency, queue wait, tokens and cost.
+        Query params: hours (default 24), chain, model, group_by (chain, model or route)
+        """
+        try:
+            telemetry.flush()
+            hours, calls = self.get_window(request)
+            group_by = request.query_params.get('group_by', 'chain')
+            if group_by not in ('chain', 'model', 'route'):
+                group_by = 'chain'
+            data = summarize_calls(calls.values(*METRIC_FIELDS).iterator(), key=group_by)
+            return Response({
+                'success': True,
+                'hours': hours,
+                'data': data,
+                'message': 'LLM call metrics fetched successfully'
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': f'Error fetching LLM call metrics: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['GET'], url_path='timeseries')
+    def timeseries(self, request):
+        """
+        Hourly per-chain aggregations, oldest bucket first.
+        Query params: hours (default 24), chain, model
+        """
+        try:
+            telemetry.flush()
+            hours, calls = self.get_window(request)
+            rows = calls.annotate(hour=TruncHour('started_at')).values('hour', *METRIC_FIELDS)
+            buckets = {}
+            for row in rows.iterator():
+                buckets.setdefault(row['hour'], []).append(row)
+            data = [
+                {'hour': hour, 'chains': summarize_calls(bucket)}
+                for hour, bucket in sorted(buckets.items())
+            ]
+            return Response({
+                'success': True,
+                'hours': hours,
+                'data': data,
+                'message': 'LLM call time series fetched successfully'
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': f'Error fetching LLM call time series: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['GET'], url_path='fair-share')
+    def fair_share_stats(self, request):
+        """
+        Per-company queued/running batch jobs and queue wait percentiles
+        """
+        try:
+            return Response({
+                'success': True,
+                'data': fair_share.stats(),
+                'message': 'Fair-share queue stats fetched successfully'
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': f'Error fetching fair-share queue stats: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
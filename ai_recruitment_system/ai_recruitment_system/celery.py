@@ -1,9 +1,143 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from kombu import Exchange, Queue
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_recruitment_system.settings')  
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_recruitment_system.settings')
 
 app = Celery('ai_recruitment_system')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+
+# Queues by class of work. Live interview turns get their own queue (and the
+# highest priority) so a long screening or exam generation run can never sit
+# in front of a candidate's next question.
+REALTIME_QUEUE = 'realtime'
+BATCH_QUEUE = 'batch'
+VISION_QUEUE = 'vision'
+FILES_QUEUE = 'files'
+INGEST_QUEUE = 'ingest'
+DEFAULT_QUEUE = 'default'
+
+# Redis broker priorities: 0 is served first
+REALTIME_PRIORITY = 0
+DEFAULT_PRIORITY = 5
+BATCH_PRIORITY = 8
+
+TASK_ROUTES = {
+    'ai_agent_management.tasks.generate_next_interview_question': {
+        'queue': REALTIME_QUEUE, 'priority': REALTIME_PRIORITY,
+    },
+    'ai_agent_management.tasks.draft_next_interview_question': {
+        'queue': REALTIME_QUEUE, 'priority': REALTIME_PRIORITY + 1,
+    },
+    'websocket_management.tasks.process_web_audio_pcm': {
+        'queue': REALTIME_QUEUE, 'priority': REALTIME_PRIORITY,
+    },
+    'websocket_management.tasks.process_image_data': {'queue': VISION_QUEUE},
+    'ai_agent_management.tasks.parse_cv_task': {'queue': BATCH_QUEUE, 'priority': BATCH_PRIORITY},
+    'ai_agent_management.tasks.screen_candidates_applications': {
+        'queue': BATCH_QUEUE, 'priority': BATCH_PRIORITY,
+    },
+    'ai_agent_management.tasks.generate_exam_questions': {
+        'queue': BATCH_QUEUE, 'priority': BATCH_PRIORITY,
+    },
+    # Tasks that extract document text run on the ingestion workers, whose
+    # sandboxed extractors (file_management.ingestion) need a non-daemonic parent
+    'file_management.tasks.save_cv_file': {'queue': INGEST_QUEUE},
+    'file_management.tasks.update_file': {'queue': INGEST_QUEUE},
+    'file_management.tasks.save_job_application_attachment': {'queue': INGEST_QUEUE},
+    'file_management.tasks.*': {'queue': FILES_QUEUE},
+}
+
+app.conf.update(
+    task_queues=[
+        Queue(name, Exchange(name), routing_key=name)
+        for name in (REALTIME_QUEUE, BATCH_QUEUE, VISION_QUEUE, FILES_QUEUE, INGEST_QUEUE, DEFAULT_QUEUE)
+    ],
+    task_default_queue=DEFAULT_QUEUE,
+    task_default_exchange=DEFAULT_QUEUE,
+    task_default_routing_key=DEFAULT_QUEUE,
+    task_default_priority=DEFAULT_PRIORITY,
+    task_routes=TASK_ROUTES,
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+)
+
+
+# Worker roles started by `manage.py run_worker <role>`. Each class of work
+# scales on its own: concurrency can be overridden per role with
+# CELERY_<ROLE>_CONCURRENCY. Long and real-time tasks prefetch one message
+# per process so a busy process never holds work another could start.
+WORKER_ROLES = {
+    'realtime': {
+        'queues': [REALTIME_QUEUE],
+        'concurrency': 4,
+        'prefetch_multiplier': 1,
+        'max_tasks_per_child': 200,
+    },
+    'batch': {
+        'queues': [BATCH_QUEUE],
+        'concurrency': 2,
+        'prefetch_multiplier': 1,
+        'max_tasks_per_child': 20,
+    },
+    'vision': {
+        'queues': [VISION_QUEUE],
+        'concurrency': 2,
+        'prefetch_multiplier': 1,
+        'max_tasks_per_child': 50,
+    },
+    'files': {
+        'queues': [FILES_QUEUE],
+        'concurrency': 4,
+        'prefetch_multiplier': 4,
+        'max_tasks_per_child': 100,
+    },
+    # Threads, not prefork: each task thread starts its own sandbox process,
+    # and the sandboxes do the CPU work
+    'ingest': {
+        'queues': [INGEST_QUEUE],
+        'concurrency': 4,
+        'prefetch_multiplier': 1,
+        'max_tasks_per_child': 100,
+        'pool': 'threads',
+    },
+    'default': {
+        'queues': [DEFAULT_QUEUE],
+        'concurrency': 2,
+        'prefetch_multiplier': 4,
+        'max_tasks_per_child': 500,
+    },
+    # Single worker for development: every queue but ingest, real-time first.
+    # Its prefork children cannot start sandboxes, so run an ingest worker too.
+    'all': {
+        'queues': [REALTIME_QUEUE, VISION_QUEUE, DEFAULT_QUEUE, FILES_QUEUE, BATCH_QUEUE],
+        'concurrency': 4,
+        'prefetch_multiplier': 1,
+        'max_tasks_per_child': 100,
+    },
+}
+
+
+def worker_argv(role, **overrides):
+    """celery worker arguments for a role; overrides beat CELERY_<ROLE>_CONCURRENCY"""
+    options = dict(WORKER_ROLES[role])
+    options['concurrency'] = os.getenv(f'CELERY_{role.upper()}_CONCURRENCY', options['concurrency'])
+    options.update({k: v for k, v in overrides.items() if v is not None})
+    argv = [
+        'worker',
+        f'--queues={",".join(options["queues"])}',
+        f'--concurrency={options["concurrency"]}',
+        f'--prefetch-multiplier={options["prefetch_multiplier"]}',
+        f'--max-tasks-per-child={options["max_tasks_per_child"]}',
+        f'--hostname={role}@%h',
+        '-O', 'fair',
+    ]
+    if options.get('pool'):
+        argv.append(f'--pool={options["pool"]}')
+    return argv
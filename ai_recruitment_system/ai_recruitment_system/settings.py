@@ -224,6 +224,197 @@ CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/1"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "purge-staged-uploads": {
+        "task": "file_management.tasks.purge_staged_uploads",
+        "schedule": 60 * 60,
+    },
+}
+
+
+# Redis database used by the AI agent for caching and coordination
+AI_REDIS_URL = os.getenv("AI_REDIS_URL", default="redis://127.0.0.1:6379/2")
+
+# Content-addressed LLM response cache (ai_agent_management.cache)
+AI_LLM_CACHE = {
+    "ENABLED": os.getenv("AI_LLM_CACHE_ENABLED", default="true").lower() == "true",
+    "TTL": 60 * 60 * 24 * 7,
+    "MAX_ENTRIES": 20000,
+    "LOCAL_MAX_ENTRIES": 512,
+}
+
+# Provider quotas enforced by ai_agent_management.rate_limit, keyed by
+# "<provider>:<model>" and shared by every config that uses the model.
+AI_PROVIDER_QUOTAS = {
+    "google:gemini-2.5-flash": {
+        "requests_per_minute": int(os.getenv("GEMINI_RPM", default="10")),
+        "tokens_per_minute": int(os.getenv("GEMINI_TPM", default="250000")),
+    },
+}
+
+# Maximum concurrent LLM calls issued by a single batch task
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", default="8"))
+
+# Token budgets used to split screen_candidates_applications into groups
+AI_SCREENING_BATCH = {
+    "MAX_INPUT_TOKENS": 30000,
+    "OUTPUT_TOKENS_PER_APPLICATION": 300,
+}
+
+# Interview conversation memory (ai_agent_management.memory)
+AI_INTERVIEW_MEMORY = {
+    "RECENT_TURNS": 4,
+    "SUMMARY_MAX_CHARS": 2000,
+    "CV_MAX_CHARS": 4000,
+}
+
+# Speculative next-question drafts from partial transcripts
+# (ai_agent_management.speculation)
+AI_INTERVIEW_DRAFTS = {
+    "ENABLED": os.environ.get("AI_INTERVIEW_DRAFTS", "1") == "1",
+    # One draft per turn, so wait until most of a typical answer is in
+    "MIN_WORDS": 25,
+    "MIN_NEW_WORDS": 6,
+    "MIN_INTERVAL": 3.0,
+    "MAX_PER_TURN": 1,
+    "COMMIT_SIMILARITY": 0.8,
+}
+
+# Pre-screening shortlist before LLM screening (ai_agent_management.matching)
+AI_SHORTLIST = {
+    "ENABLED": os.environ.get("AI_SHORTLIST", "0") == "1",
+    "BACKEND": "tfidf",
+    "FRACTION": 0.3,
+    "MIN_KEEP": 5,
+    "REJECT_NOT_SHORTLISTED": False,
+}
+
+# Exam question generation: one call per application, or a shared pool per
+# job (ai_agent_management.question_pool)
+AI_QUESTION_POOL = {
+    "MODE": os.environ.get("AI_QUESTION_MODE", "per_application"),
+    "POOL_SIZE": 30,
+    "QUESTIONS_PER_EXAM": 5,
+    "CV_TOPUP": 0,
+}
+
+# Run every model config on another provider, e.g. "local_fake" for offline
+# load tests (ai_agent_management.fake_llm)
+AI_PROVIDER_OVERRIDE = os.environ.get("AI_PROVIDER_OVERRIDE", "")
+AI_LOCAL_FAKE = {
+    "latency": float(os.environ.get("AI_FAKE_LATENCY", 0.05)),
+    "jitter": float(os.environ.get("AI_FAKE_JITTER", 0.0)),
+    "truncate_rate": float(os.environ.get("AI_FAKE_TRUNCATE_RATE", 0.0)),
+    "failure_rate": float(os.environ.get("AI_FAKE_FAILURE_RATE", 0.0)),
+}
+
+# Per-call LLM telemetry (ai_agent_management.telemetry), served at /api/ai/metrics/
+AI_TELEMETRY = {
+    "ENABLED": os.getenv("AI_TELEMETRY_ENABLED", default="true").lower() == "true",
+    "FLUSH_SIZE": 50,
+    "FLUSH_INTERVAL": 10,
+    "RETENTION_DAYS": 14,
+    # USD per million tokens, used for the cost column
+    "PRICES": {
+        "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    },
+}
+
+# Hedged requests, provider fallback and circuit breaking per chain
+# (ai_agent_management.routing). SLOs are keyed by chain name.
+AI_ROUTING = {
+    "CIRCUIT_FAILURES": 5,
+    "CIRCUIT_RESET": 30,
+    "SLO": {
+        "hr_behavioral_questions": {
+            "FALLBACK": "interview_fallback",
+            "TIMEOUT": 20,
+            "HEDGE_PERCENTILE": 0.95,
+            "HEDGE_AFTER": 6.0,
+            "MIN_SAMPLES": 20,
+        },
+    },
+}
+
+# Length-aware model routing (ai_agent_management.routing.LengthRouter):
+# per-chain latency budget in seconds and candidate configs, best first
+AI_LENGTH_ROUTING = {
+    "BASE_LATENCY": 2.0,
+    "SECONDS_PER_1K_TOKENS": 1.5,
+    "CHAINS": {
+        "cv_parsing": {
+            "BUDGET": 45,
+            "ROUTES": [
+                {"CONFIG": "cv_parser", "MAX_INPUT_TOKENS": 6000},
+                {"CONFIG": "fast_parser", "MAX_INPUT_TOKENS": 30000},
+            ],
+        },
+    },
+}
+
+# Deduplicated AI task submission (ai_agent_management.idempotency). RESULT_TTL
+# is how long (seconds) a successful result is reused for identical inputs;
+# interview tasks take the same arguments every turn, so they only dedupe in flight.
+AI_IDEMPOTENCY = {
+    "ENABLED": True,
+    "IN_FLIGHT_TTL": 60 * 60,
+    "RESULT_TTL": {
+        "ai_agent_management.tasks.parse_cv_task": 60 * 60 * 24,
+        "ai_agent_management.tasks.screen_candidates_applications": 60 * 10,
+        "ai_agent_management.tasks.generate_exam_questions": 60 * 10,
+    },
+}
+
+# Per-company fair share for batch AI tasks (ai_agent_management.fair_share).
+# MAX_IN_FLIGHT should match the batch worker concurrency; TENANTS overrides
+# weight/cap per company id. Queue waits are served at /api/ai/metrics/fair-share/
+AI_FAIR_SHARE = {
+    "ENABLED": True,
+    "MAX_IN_FLIGHT": int(os.getenv("AI_FAIR_SHARE_MAX_IN_FLIGHT", default="4")),
+    "TENANT_CAP": 2,
+    "WEIGHT": 1,
+    "TENANTS": {},
+}
+
+# Uploads are spooled here by the web process and opened by the file workers,
+# which receive only a handle and checksum (file_management.staging). ROOT must
+# be on storage shared by both.
+FILE_STAGING = {
+    "ROOT": os.getenv("FILE_STAGING_ROOT", default=os.path.join(PRIVATE_MEDIA_ROOT, "staging")),
+    "CHUNK_SIZE": 256 * 1024,
+    "MAX_AGE": 60 * 60 * 24,
+}
+
+# Document text extraction (file_management.extraction). Extracted text is
+# cached by content hash; compare backends with `manage.py benchmark_extraction`.
+FILE_EXTRACTION = {
+    "BACKENDS": {
+        "application/pdf": os.getenv("FILE_PDF_BACKEND", default="pymupdf"),
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "python-docx",
+    },
+    "CACHE_TTL": 60 * 60 * 24 * 30,
+    "PARALLEL_MIN_PAGES": 16,
+    "PAGES_PER_TASK": 8,
+}
+
+# Sandboxed document ingestion (file_management.ingestion). Each document is
+# extracted in a child process under these limits; documents that exceed them
+# are killed and quarantined by content hash. Run with `manage.py run_worker ingest`.
+FILE_INGESTION = {
+    "MAX_WORKERS": int(os.getenv("FILE_INGESTION_WORKERS", default="2")),
+    "TIMEOUT": 30,
+    "CPU_SECONDS": 20,
+    "MAX_RSS_MB": 512,
+    "MAX_ADDRESS_SPACE_MB": 2048,
+}
+
+# Async LLM dispatch engine (ai_agent_management.dispatch)
+AI_DISPATCH = {
+    "CONCURRENCY": AI_BATCH_CONCURRENCY,
+    "TIMEOUT": 120,
+    "RETRIES": 2,
+    "BACKOFF": 2.0,
+}
 
 
 CHANNEL_LAYERS = {
@@ -9,7 +9,8 @@ urlpatterns = [
     path('api/files/', include('file_management.urls')),
     path('api/jobs/', include('job_management.urls')),
     path('api/examination/', include("examination_management.urls")),
-    path('api/notifications/', include("notification_management.urls"))
+    path('api/notifications/', include("notification_management.urls")),
+    path('api/ai/', include("ai_agent_management.urls"))
    
    
 ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2025-10-20 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("examination_management", "0021_alter_interviewobservation_e"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="applicationexam",
+            name="conversation_memory",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
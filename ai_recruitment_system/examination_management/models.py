@@ -32,6 +32,7 @@ class ApplicationExam(models.Model):
     exam_ended=models.BooleanField(default=False)
     current_time= models.IntegerField(default=0)
     last_question=models.IntegerField(default=0)
+    conversation_memory = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
 
@@ -1,3 +1,28 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ai_agent_management.tasks import generate_exam_questions
+from .models import Exam
 
-# Create your tests here.
+
+class ExamCreateTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "recruiter@example.com",
+            "secret",
+            u_role="recruiter",
+            u_dob=datetime.date(1990, 1, 1),
+            has_company=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    @mock.patch("examination_management.views.fair_share.submit")
+    def test_exam_without_a_job_queues_questions_in_the_default_bucket(self, submit):
+        response = self.client.post("/api/examination/exams/", {"e_title": "General aptitude"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        exam = Exam.objects.get(e_title="General aptitude")
+        self.assertIsNone(exam.j_id)
+        submit.assert_called_once_with(generate_exam_questions, None, [], "written")
@@ -29,6 +29,8 @@ from rest_framework import serializers
 import json
 from .models import ApplicationExam
 from ai_agent_management.tasks import generate_exam_questions, generate_next_interview_question
+from ai_agent_management.fair_share import fair_share
+from ai_agent_management.idempotency import submit_once
 
 User = get_user_model()
 
@@ -69,7 +71,11 @@ class ExamViewSet(viewsets.ModelViewSet):
                     app_exam_ids_mapping.append((application.id, appexam.id))
                 except Application.DoesNotExist:
                     continue
-        generate_exam_questions.delay(app_exam_ids_mapping, exam.e_type)
+        # Exams without a job have no company; they share the default bucket
+        company_id = exam.j_id.c_id_id if exam.j_id else None
+        fair_share.submit(
+            generate_exam_questions, company_id, app_exam_ids_mapping, exam.e_type
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return super().create(request, *args, **kwargs)
@@ -283,7 +289,7 @@ class InterviewQuestionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"])
     def next_question(self, request):
         examId= request.GET.get("examId")
-        generate_next_interview_question.delay(examId, request.user.id)
+        submit_once(generate_next_interview_question, examId, request.user.id)
 
         return Response({
             "success":True,
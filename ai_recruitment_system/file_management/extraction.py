@@ -0,0 +1,313 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional
+from django.conf import settings
+from ai_agent_management.redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT = "text/plain"
+
+DEFAULT_EXTRACTION_SETTINGS = {
+    # Backend used per content type; see BACKENDS and `manage.py benchmark_extraction`
+    "BACKENDS": {PDF: "pymupdf", DOCX: "python-docx", TXT: "text"},
+    "CACHE_ENABLED": True,
+    "CACHE_PREFIX": "file:text",
+    "CACHE_TTL": 60 * 60 * 24 * 30,
+    # PDFs with at least this many pages are split across the process pool
+    "PARALLEL_MIN_PAGES": 16,
+    "PAGES_PER_TASK": 8,
+    "WORKERS": min(4, os.cpu_count() or 1),
+}
+
+# Bump when extraction output changes so stale cached text is not reused
+CACHE_VERSION = 1
+
+
+def extraction_settings() -> Dict[str, Any]:
+    options = {**DEFAULT_EXTRACTION_SETTINGS, **getattr(settings, "FILE_EXTRACTION", {})}
+    options["BACKENDS"] = {**DEFAULT_EXTRACTION_SETTINGS["BACKENDS"], **options["BACKENDS"]}
+    return options
+
+
+class ExtractionBackend:
+    """Extracts text page by page from one kind of document"""
+
+    name = ""
+    content_type = ""
+
+    def page_count(self, path: str) -> int:
+        return 1
+
+    def extract_pages(self, path: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        raise NotImplementedError
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        """Pages one at a time, for callers that stream them (see ingestion)"""
+        yield from self.extract_pages(path)
+
+
+class PyMuPDFBackend(ExtractionBackend):
+    name = "pymupdf"
+    content_type = PDF
+
+    def page_count(self, path):
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+
+    def extract_pages(self, path, start=0, stop=None):
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            stop = doc.page_count if stop is None else min(stop, doc.page_count)
+            return [doc[index].get_text() for index in range(start, stop)]
+
+    def iter_pages(self, path):
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            for page in doc:
+                yield page.get_text()
+
+
+class PdfPlumberBackend(ExtractionBackend):
+    name = "pdfplumber"
+    content_type = PDF
+
+    def page_count(self, path):
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+    def extract_pages(self, path, start=0, stop=None):
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+    def iter_pages(self, path):
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                page.flush_cache()
+
+
+class PdfiumBackend(ExtractionBackend):
+    name = "pdfium"
+    content_type = PDF
+
+    def page_count(self, path):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract_pages(self, path, start=0, stop=None):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            stop = len(pdf) if stop is None else min(stop, len(pdf))
+            return [pdf[index].get_textpage().get_text_range() for index in range(start, stop)]
+        finally:
+            pdf.close()
+
+    def iter_pages(self, path):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            for index in range(len(pdf)):
+                yield pdf[index].get_textpage().get_text_range()
+        finally:
+            pdf.close()
+
+
+class PythonDocxBackend(ExtractionBackend):
+    name = "python-docx"
+    content_type = DOCX
+
+    def extract_pages(self, path, start=0, stop=None):
+        from docx import Document
+
+        doc = Document(path)
+        return ["\n".join(p.text for p in doc.paragraphs if p.text.strip())]
+
+
+class Docx2TxtBackend(ExtractionBackend):
+    name = "docx2txt"
+    content_type = DOCX
+
+    def extract_pages(self, path, start=0, stop=None):
+        import docx2txt
+
+        return [docx2txt.process(path)]
+
+
+class PlainTextBackend(ExtractionBackend):
+    name = "text"
+    content_type = TXT
+
+    def extract_pages(self, path, start=0, stop=None):
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            return [file.read()]
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (
+        PyMuPDFBackend(),
+        PdfPlumberBackend(),
+        PdfiumBackend(),
+        PythonDocxBackend(),
+        Docx2TxtBackend(),
+        PlainTextBackend(),
+    )
+}
+
+
+def backends_for(content_type: str) -> List[ExtractionBackend]:
+    return [backend for backend in BACKENDS.values() if backend.content_type == content_type]
+
+
+def content_type_for(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return {".pdf": PDF, ".docx": DOCX, ".txt": TXT}.get(extension, PDF)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(256 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _extract_range(backend_name: str, path: str, start: int, stop: int) -> List[str]:
+    # Runs in the process pool, so it must stay a picklable module-level function
+    return BACKENDS[backend_name].extract_pages(path, start, stop)
+
+
+_pool = None
+
+
+def _get_pool(workers: int):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+class TextExtractionService:
+    """One entry point for document text extraction.
+
+    Text is cached in Redis under the file's SHA-256 and the backend name,
+    so re-uploads, updates and re-parses of the same content skip extraction
+    entirely (File.f_hash can be passed to avoid re-hashing). Long PDFs are
+    extracted in page ranges on a process pool; where a pool cannot be
+    started (e.g. inside a daemonic Celery prefork child) extraction runs
+    serially.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**extraction_settings(), **(options or {})}
+
+    def backend(self, content_type: str, name: Optional[str] = None) -> ExtractionBackend:
+        name = name or self.options["BACKENDS"].get(content_type)
+        if name not in BACKENDS:
+            raise ValueError(f"No text extraction backend for {content_type} ({name})")
+        return BACKENDS[name]
+
+    def cache_key(self, backend: ExtractionBackend, content_hash: str) -> str:
+        return f"{self.options['CACHE_PREFIX']}:v{CACHE_VERSION}:{backend.name}:{content_hash}"
+
+    def extract(
+        self,
+        path: str,
+        content_type: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        backend: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Text of the document at path"""
+        extractor = self.backend(content_type or content_type_for(path), backend)
+        if use_cache:
+            content_hash = content_hash or file_hash(path)
+            cached = self.cached_text(extractor, content_hash)
+            if cached is not None:
+                return cached
+
+        text = "\n".join(self.extract_pages(extractor, path))
+
+        if use_cache:
+            self.store_text(extractor, content_hash, text)
+        return text
+
+    def cached_text(self, backend: ExtractionBackend, content_hash: str) -> Optional[str]:
+        client = get_redis_client() if self.options["CACHE_ENABLED"] else None
+        if client is None:
+            return None
+        try:
+            cached = client.get(self.cache_key(backend, content_hash))
+        except Exception as e:
+            logger.warning("Extraction cache unavailable: %s", e)
+            return None
+        return cached.decode("utf-8") if cached is not None else None
+
+    def store_text(self, backend: ExtractionBackend, content_hash: str, text: str):
+        client = get_redis_client() if self.options["CACHE_ENABLED"] else None
+        if client is None:
+            return
+        try:
+            client.set(self.cache_key(backend, content_hash), text.encode("utf-8"), ex=self.options["CACHE_TTL"])
+        except Exception as e:
+            logger.warning("Could not cache extracted text: %s", e)
+
+    def extract_file(self, file, **kwargs) -> str:
+        """Text of a file_management File stored locally"""
+        return self.extract(file.f_path.path, file.f_type, content_hash=file.f_hash, **kwargs)
+
+    def extract_pages(self, backend: ExtractionBackend, path: str) -> List[str]:
+        pages = backend.page_count(path)
+        step = self.options["PAGES_PER_TASK"]
+        if pages < self.options["PARALLEL_MIN_PAGES"] or self.options["WORKERS"] < 2:
+            return backend.extract_pages(path)
+
+        ranges = [(start, min(start + step, pages)) for start in range(0, pages, step)]
+        try:
+            pool = _get_pool(self.options["WORKERS"])
+            futures = [pool.submit(_extract_range, backend.name, path, a, b) for a, b in ranges]
+            return [text for future in futures for text in future.result()]
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            # AssertionError: daemonic processes are not allowed to have children
+            logger.info("Page-parallel extraction unavailable, extracting serially: %s", e)
+            _reset_pool()
+            return backend.extract_pages(path)
+
+
+extractor = TextExtractionService()
+
+
+def extract_text(path: str, content_type: Optional[str] = None, **kwargs) -> str:
+    return extractor.extract(path, content_type, **kwargs)
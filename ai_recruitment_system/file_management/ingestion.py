@@ -0,0 +1,247 @@
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+from django.conf import settings
+from ai_agent_management.redis_utils import get_redis_client
+from .extraction import BACKENDS, content_type_for, extractor, file_hash
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INGESTION_SETTINGS = {
+    "ENABLED": True,
+    "MAX_WORKERS": 2,  # sandboxed extractions running at once per worker process
+    "TIMEOUT": 30,  # wall-clock seconds per document
+    "CPU_SECONDS": 20,  # RLIMIT_CPU per document
+    "MAX_RSS_MB": 512,  # resident memory before the sandbox is killed
+    "MAX_ADDRESS_SPACE_MB": 2048,  # RLIMIT_AS, the hard backstop for runaway allocations
+    "CHECK_INTERVAL": 0.25,  # seconds between memory checks
+    # forkserver keeps sandbox start-up cheap and safe from a threaded parent
+    "START_METHOD": "forkserver",
+    "PRELOAD": ["file_management.extraction", "pymupdf", "docx"],
+    "QUARANTINE_KEY": "file:quarantine",
+}
+
+PAGE = "page"
+DONE = "done"
+LIMIT = "limit"
+ERROR = "error"
+
+
+def ingestion_settings() -> Dict[str, Any]:
+    return {**DEFAULT_INGESTION_SETTINGS, **getattr(settings, "FILE_INGESTION", {})}
+
+
+class IngestionError(Exception):
+    pass
+
+
+class IngestionLimitExceeded(IngestionError):
+    """The document hit a time or memory limit; it is quarantined"""
+
+
+@dataclass
+class IngestionResult:
+    status: str  # "ok", "failed" or "quarantined"
+    text: str = ""
+    pages: int = 0
+    error: str = ""
+    elapsed_ms: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _sandboxed_extract(conn, backend_name, path, cpu_seconds, address_space):
+    """Runs in the sandbox process: set limits, stream pages back over conn"""
+    try:
+        if address_space:
+            resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+        if cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        for page in BACKENDS[backend_name].iter_pages(path):
+            conn.send((PAGE, page))
+        conn.send((DONE, None))
+    except MemoryError:
+        conn.send((LIMIT, "memory limit exceeded"))
+    except Exception as e:
+        conn.send((ERROR, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _describe_exit(exitcode) -> str:
+    if exitcode == -signal.SIGXCPU:
+        return "CPU time limit exceeded"
+    if exitcode is not None and exitcode < 0:
+        return f"extractor killed by {signal.Signals(-exitcode).name}"
+    return f"extractor exited with code {exitcode}"
+
+
+class DocumentIngestor:
+    """Runs document text extraction in bounded, resource-limited sandboxes.
+
+    Each document is extracted in its own child process with a CPU-time
+    rlimit, an address-space rlimit and an RSS watchdog, under a wall-clock
+    timeout. At most MAX_WORKERS sandboxes run at once. Pages stream back
+    as they are extracted. A document that hits a limit is killed and its
+    content hash quarantined, so retries and re-uploads of the same file
+    fail fast instead of stalling the queue again. Successful text goes
+    into the extraction cache.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = {**ingestion_settings(), **(options or {})}
+        self.slots = threading.BoundedSemaphore(self.options["MAX_WORKERS"])
+        self._context = None
+
+    @property
+    def context(self):
+        if self._context is None:
+            self._context = multiprocessing.get_context(self.options["START_METHOD"])
+            if self.options["START_METHOD"] == "forkserver":
+                self._context.set_forkserver_preload(self.options["PRELOAD"])
+        return self._context
+
+    def ingest(
+        self, path: str, content_type: Optional[str] = None, content_hash: Optional[str] = None
+    ) -> IngestionResult:
+        """Extract the text of the document at path"""
+        started = time.monotonic()
+        backend = extractor.backend(content_type or content_type_for(path))
+        content_hash = content_hash or file_hash(path)
+
+        quarantined = self.quarantined(content_hash)
+        if quarantined:
+            return IngestionResult("quarantined", error=quarantined["reason"])
+        cached = extractor.cached_text(backend, content_hash)
+        if cached is not None:
+            return IngestionResult("ok", text=cached, cached=True)
+
+        pages = []
+        try:
+            for page in self.stream(path, backend.name):
+                pages.append(page)
+        except IngestionLimitExceeded as e:
+            self.quarantine(content_hash, str(e), path)
+            return IngestionResult("quarantined", error=str(e), elapsed_ms=(time.monotonic() - started) * 1000)
+        except IngestionError as e:
+            return IngestionResult("failed", error=str(e), elapsed_ms=(time.monotonic() - started) * 1000)
+
+        text = "\n".join(pages)
+        extractor.store_text(backend, content_hash, text)
+        return IngestionResult("ok", text=text, pages=len(pages), elapsed_ms=(time.monotonic() - started) * 1000)
+
+    def stream(self, path: str, backend_name: str) -> Iterator[str]:
+        """Yield the document's pages from a sandbox as they are extracted"""
+        if not self.options["ENABLED"]:
+            yield from BACKENDS[backend_name].iter_pages(path)
+            return
+
+        with self.slots:
+            receiver, sender = self.context.Pipe(duplex=False)
+            process = self.context.Process(
+                target=_sandboxed_extract,
+                args=(
+                    sender,
+                    backend_name,
+                    path,
+                    self.options["CPU_SECONDS"],
+                    self.options["MAX_ADDRESS_SPACE_MB"] * 1024 * 1024,
+                ),
+                daemon=True,
+            )
+            try:
+                process.start()
+            except AssertionError:
+                # Daemonic processes (Celery prefork children) cannot start a sandbox.
+                # Refuse rather than parse untrusted files without limits; set
+                # ENABLED to False to extract in-process on purpose.
+                logger.error("Sandboxed extraction unavailable in a daemonic process; refusing %s", path)
+                receiver.close()
+                sender.close()
+                raise IngestionError("sandboxed extraction is unavailable in this worker")
+            sender.close()
+
+            try:
+                yield from self._receive(receiver, process)
+            finally:
+                receiver.close()
+                if process.is_alive():
+                    process.kill()
+                process.join(5)
+
+    def _receive(self, receiver, process) -> Iterator[str]:
+        deadline = time.monotonic() + self.options["TIMEOUT"]
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IngestionLimitExceeded(f"timed out after {self.options['TIMEOUT']}s")
+            if not receiver.poll(min(remaining, self.options["CHECK_INTERVAL"])):
+                rss = _rss_mb(process.pid)
+                if rss is not None and rss > self.options["MAX_RSS_MB"]:
+                    raise IngestionLimitExceeded(f"resident memory {rss:.0f}MB over {self.options['MAX_RSS_MB']}MB")
+                continue
+            try:
+                kind, payload = receiver.recv()
+            except EOFError:
+                process.join(1)
+                raise IngestionLimitExceeded(_describe_exit(process.exitcode))
+
+            if kind == PAGE:
+                yield payload
+            elif kind == DONE:
+                return
+            elif kind == LIMIT:
+                raise IngestionLimitExceeded(payload)
+            else:
+                raise IngestionError(payload)
+
+    def quarantined(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        client = get_redis_client()
+        if client is None:
+            return None
+        try:
+            entry = client.hget(self.options["QUARANTINE_KEY"], content_hash)
+        except Exception as e:
+            logger.warning("Quarantine lookup failed: %s", e)
+            return None
+        return json.loads(entry) if entry else None
+
+    def quarantine(self, content_hash: str, reason: str, path: str = ""):
+        logger.warning("Quarantined document %s (%s): %s", content_hash, os.path.basename(path), reason)
+        client = get_redis_client()
+        if client is None:
+            return
+        entry = {"reason": reason, "name": os.path.basename(path), "at": time.time()}
+        try:
+            client.hset(self.options["QUARANTINE_KEY"], content_hash, json.dumps(entry))
+        except Exception as e:
+            logger.warning("Could not record quarantined document %s: %s", content_hash, e)
+
+    def release(self, content_hash: str) -> bool:
+        """Let a quarantined document be extracted again"""
+        client = get_redis_client()
+        if client is None:
+            return False
+        return bool(client.hdel(self.options["QUARANTINE_KEY"], content_hash))
+
+
+ingestor = DocumentIngestor()
@@ -0,0 +1,83 @@
+import statistics
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ai_agent_management.redis_utils import get_redis_client
+from file_management.extraction import TextExtractionService, backends_for, content_type_for
+
+
+def words(text):
+    return set(text.lower().split())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare text extraction backends on sample documents (by default the CVs and "
+        "letters in the project root): time per file, text length and agreement"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", help="Documents to extract (default: *.pdf, *.docx in BASE_DIR)")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--parallel", action="store_true", help="Also time page-parallel extraction for every PDF"
+        )
+
+    def handle(self, *args, **options):
+        paths = [Path(p) for p in options["paths"]] or sorted(
+            p for pattern in ("*.pdf", "*.docx") for p in Path(settings.BASE_DIR).glob(pattern)
+        )
+        if not paths:
+            raise CommandError("No documents to benchmark")
+
+        service = TextExtractionService()
+        totals = {}
+        self.stdout.write(f"{'file':<32} {'backend':<12} {'mean ms':>9} {'min ms':>8} {'chars':>7} {'agree':>6}")
+        for path in paths:
+            backends = backends_for(content_type_for(str(path)))
+            reference = None
+            for backend in backends:
+                try:
+                    timings, text = self.time(lambda: "\n".join(backend.extract_pages(str(path))), options["repeat"])
+                except Exception as e:
+                    self.stdout.write(f"{path.name[:32]:<32} {backend.name:<12} failed: {e}")
+                    continue
+                # Word-set overlap with the first backend that succeeded
+                reference = reference if reference is not None else words(text)
+                agree = len(words(text) & reference) / max(len(words(text) | reference), 1)
+                totals.setdefault(backend.name, []).extend(timings)
+                self.stdout.write(
+                    f"{path.name[:32]:<32} {backend.name:<12} {statistics.mean(timings):>9.1f} "
+                    f"{min(timings):>8.1f} {len(text):>7} {agree:>6.2f}"
+                )
+                if options["parallel"] and backend.content_type == "application/pdf":
+                    forced = TextExtractionService({"PARALLEL_MIN_PAGES": 1, "PAGES_PER_TASK": 1})
+                    timings, _ = self.time(
+                        lambda: forced.extract(str(path), backend=backend.name, use_cache=False),
+                        options["repeat"],
+                    )
+                    self.stdout.write(
+                        f"{path.name[:32]:<32} {backend.name + '/pp':<12} "
+                        f"{statistics.mean(timings):>9.1f} {min(timings):>8.1f}"
+                    )
+
+            if get_redis_client() is None:
+                continue
+            cached, _ = self.time(lambda: service.extract(str(path)), options["repeat"] + 1)
+            self.stdout.write(
+                f"{path.name[:32]:<32} {'cached':<12} {statistics.mean(cached[1:]):>9.1f} {min(cached[1:]):>8.1f}"
+            )
+
+        self.stdout.write("")
+        for name, timings in sorted(totals.items(), key=lambda item: statistics.mean(item[1])):
+            self.stdout.write(f"{name:<12} mean {statistics.mean(timings):.1f} ms over {len(timings)} runs")
+
+    @staticmethod
+    def time(func, repeat):
+        timings, result = [], None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, result
@@ -0,0 +1,382 @@
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from django.core.files import File as DjangoFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from ai_agent_management.idempotency import submit_once
+from ai_agent_management.tasks import parse_cv_task
+from file_management.extraction import content_type_for, extractor, file_hash
+from file_management.models import File
+from file_management.storage import blob_name
+from file_management.tasks import clean_text
+from user_management.models import Cv, User
+
+DOCUMENT_EXTENSIONS = {".pdf", ".docx"}
+LETTER_WORDS = {"letter", "cover", "coverletter", "motivation"}
+SUFFIX_WORDS = LETTER_WORDS | {"cv", "resume", "curriculum", "vitae"}
+EMAIL = re.compile(r"[\w.+-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)+", re.IGNORECASE)
+
+
+def document_kind(name):
+    """("cv" or "application_letter", name key) from a file name like Alice_Uwase_CV.pdf"""
+    words = [w for w in re.split(r"[\s_\-.]+", Path(name).stem.lower()) if w]
+    kind = "cv"
+    while words and words[-1] in SUFFIX_WORDS:
+        if words.pop() in LETTER_WORDS:
+            kind = "application_letter"
+    return kind, " ".join(words)
+
+
+def extract_document(job):
+    """Pool worker: hash, extract and clean one document"""
+    result = {"key": job["key"], "path": job["path"], "error": None}
+    try:
+        if job["member"]:
+            # Archive members are unpacked next to the other temporary files
+            info = job["member"]
+            with zipfile.ZipFile(job["archive"]) as archive:
+                if archive.getinfo(info).file_size > job["max_bytes"]:
+                    raise ValueError("file too large")
+                path = os.path.join(job["tmpdir"], uuid.uuid4().hex + Path(info).suffix.lower())
+                with archive.open(info) as source, open(path, "wb") as target:
+                    shutil.copyfileobj(source, target)
+            result["path"] = path
+        size = os.path.getsize(result["path"])
+        if size > job["max_bytes"]:
+            raise ValueError("file too large")
+
+        content_type = content_type_for(result["path"])
+        raw = "\n".join(extractor.backend(content_type).extract_pages(result["path"]))
+        result.update(
+            hash=file_hash(result["path"]),
+            size=size,
+            content_type=content_type,
+            raw=raw,
+            cleaned=clean_text(raw).strip(),
+        )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+class ImportState:
+    """Append-only record of imported and queued documents, for resuming"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.imported = {}
+        self.queued = set()
+        if os.path.exists(path):
+            with open(path) as state:
+                for line in state:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by an interruption
+                    if entry["event"] == "imported":
+                        self.imported[entry["key"]] = entry
+                    elif entry["event"] == "queued":
+                        self.queued.add(entry["key"])
+
+    def record(self, event, **entry):
+        with self.lock, open(self.path, "a") as state:
+            state.write(json.dumps({"event": event, **entry}) + "\n")
+        if event == "imported":
+            self.imported[entry["key"]] = entry
+        elif event == "queued":
+            self.queued.add(entry["key"])
+
+
+class ParseQueue(threading.Thread):
+    """Enqueues parse_cv_task in batches, at most rate per minute, off the import thread"""
+
+    def __init__(self, state, rate, batch_size):
+        super().__init__(daemon=True)
+        self.state = state
+        self.interval = 60.0 * batch_size / rate
+        self.batch_size = batch_size
+        self.pending = queue.Queue()
+        self.sent = 0
+
+    def add(self, key, user_id, text):
+        self.pending.put((key, user_id, text))
+
+    def run(self):
+        next_batch_at = time.monotonic()
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get(timeout=1))
+                except queue.Empty:
+                    break
+            if batch[0][0] is None:
+                return
+            time.sleep(max(0.0, next_batch_at - time.monotonic()))
+            next_batch_at = time.monotonic() + self.interval
+            for key, user_id, text in batch:
+                if key is None:
+                    return
+                submit_once(parse_cv_task, user_id, text)
+                self.state.record("queued", key=key)
+                self.sent += 1
+
+    def close(self):
+        self.pending.put((None, None, None))
+
+
+class Command(BaseCommand):
+    help = (
+        "Import CVs and cover letters from a directory or zip archive: extract text with a "
+        "process pool, bulk-create File/Cv rows and optionally queue CV parsing. Resumable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Directory or .zip archive of PDF/DOCX documents")
+        parser.add_argument(
+            "--manifest", help="CSV with 'file' and 'email' columns; by default files are matched "
+            "to users by name (Alice_Uwase_CV.pdf) or by an email address in the file name",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-size", type=int, default=20, help="Largest document to import, in MB")
+        parser.add_argument("--state", help="Resume file (default: <source>.import-state)")
+        parser.add_argument("--parse", action="store_true", help="Queue parse_cv_task for imported CVs")
+        parser.add_argument("--parse-rate", type=int, default=60, help="Parse tasks queued per minute")
+        parser.add_argument("--parse-batch", type=int, default=10)
+
+    def handle(self, *args, **options):
+        source = Path(options["source"])
+        if not source.exists():
+            raise CommandError(f"{source} does not exist")
+        if options["parse_rate"] <= 0 or options["batch_size"] <= 0:
+            raise CommandError("--parse-rate and --batch-size must be positive")
+
+        state = ImportState(options["state"] or f"{source}.import-state")
+        users = self.user_matcher(options["manifest"])
+        tmpdir = tempfile.mkdtemp(prefix="import_cvs_")
+        jobs, unmatched = [], []
+        for key, path, archive, member in self.documents(source):
+            if key in state.imported:
+                continue
+            kind, name_key = document_kind(member or path)
+            user_id = users(Path(member or path).name, name_key)
+            if user_id is None:
+                unmatched.append(key)
+                continue
+            jobs.append(
+                {
+                    "key": key,
+                    "path": path,
+                    "archive": archive,
+                    "member": member,
+                    "name": Path(member or path).name,
+                    "kind": kind,
+                    "user_id": user_id,
+                    "tmpdir": tmpdir,
+                    "max_bytes": options["max_size"] * 1024 * 1024,
+                }
+            )
+
+        skipped = len(state.imported)
+        self.stdout.write(
+            f"{len(jobs)} documents to import, {skipped} already imported, {len(unmatched)} without a matching user"
+        )
+        for key in unmatched[:20]:
+            self.stdout.write(f"  no user for {key}")
+
+        parser = None
+        if options["parse"]:
+            parser = ParseQueue(state, options["parse_rate"], options["parse_batch"])
+            parser.start()
+            self.requeue_unparsed(state, parser)
+
+        started = time.monotonic()
+        counts = {"imported": 0, "duplicate": 0, "failed": 0}
+        batch_size = options["batch_size"]
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        try:
+            # fork: workers inherit the configured Django settings and loaded stopwords
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=options["workers"], mp_context=context) as pool:
+
+                def submit(batch):
+                    return [pool.submit(extract_document, job) for job in batch]
+
+                # The next batch is extracted while the current one is written
+                upcoming = submit(batches[0]) if batches else []
+                for index, batch in enumerate(batches):
+                    current, upcoming = upcoming, (submit(batches[index + 1]) if index + 1 < len(batches) else [])
+                    results = [future.result() for future in current]
+                    for job, result in zip(batch, results):
+                        result.update(name=job["name"], kind=job["kind"], user_id=job["user_id"])
+                        if result["error"]:
+                            counts["failed"] += 1
+                            self.stderr.write(f"  failed {job['key']}: {result['error']}")
+                    self.write_batch([r for r in results if not r["error"]], state, parser, counts)
+                    for job, result in zip(batch, results):
+                        if job["member"] and result["path"] and os.path.exists(result["path"]):
+                            os.remove(result["path"])
+
+                    done = sum(counts.values())
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"{done}/{len(jobs)} documents, {done / elapsed if elapsed else 0:.1f} docs/s"
+                    )
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {counts['imported']} documents ({counts['duplicate']} already stored for their "
+                f"user, {counts['failed']} failed) in {elapsed:.1f}s, "
+                f"{sum(counts.values()) / elapsed if elapsed else 0:.1f} docs/s"
+            )
+        )
+
+        if parser is not None:
+            parser.close()
+            while parser.is_alive():
+                self.stdout.write(f"Queued {parser.sent} parse tasks, waiting for the rest...")
+                parser.join(30)
+            self.stdout.write(f"Queued {parser.sent} parse tasks")
+
+    def documents(self, source):
+        """(key, path, archive, member) for every document under source"""
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.endswith("/") or "__MACOSX" in member:
+                        continue
+                    if Path(member).suffix.lower() in DOCUMENT_EXTENSIONS:
+                        yield f"{source.name}:{member}", "", str(source), member
+            return
+        if source.is_file():
+            yield source.name, str(source), None, None
+            return
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and path.suffix.lower() in DOCUMENT_EXTENSIONS:
+                yield str(path.relative_to(source)), str(path), None, None
+
+    def user_matcher(self, manifest):
+        """A function (file name, name key) -> user id or None"""
+        emails = {
+            email.lower(): user_id for user_id, email in User.objects.values_list("id", "u_email")
+        }
+        if manifest:
+            with open(manifest, newline="") as handle:
+                by_file = {
+                    row["file"].strip(): emails.get(row["email"].strip().lower())
+                    for row in csv.DictReader(handle)
+                }
+            return lambda file_name, name_key: by_file.get(file_name)
+
+        names = {}
+        for user_id, first, last in User.objects.values_list("id", "u_first_name", "u_last_name"):
+            key = " ".join(w for w in re.split(r"[\s_\-.]+", f"{first} {last}".lower()) if w)
+            # Ambiguous names are left unmatched rather than guessed
+            names[key] = None if key in names else user_id
+
+        def match(file_name, name_key):
+            email = EMAIL.search(Path(file_name).stem)
+            if email:
+                return emails.get(email.group().lower())
+            return names.get(name_key)
+
+        return match
+
+    @staticmethod
+    def restore_blob(storage, path, name):
+        # A blob released while this batch was uncommitted is written again
+        if storage.exists(name):
+            return
+        with open(path, "rb") as handle:
+            storage.restore(DjangoFile(handle))
+
+    def write_batch(self, results, state, parser, counts):
+        if not results:
+            return
+        storage = File._meta.get_field("f_path").storage
+        existing = set(
+            File.objects.filter(
+                f_hash__in={r["hash"] for r in results}, u_id_id__in={r["user_id"] for r in results}
+            ).values_list("u_id_id", "f_hash", "f_category")
+        )
+
+        new_files = []
+        with transaction.atomic():
+            for result in results:
+                if (result["user_id"], result["hash"], result["kind"]) in existing:
+                    result["duplicate"] = True
+                    continue
+                existing.add((result["user_id"], result["hash"], result["kind"]))
+                name = blob_name(result["hash"])
+                if not storage.exists(name):
+                    with open(result["path"], "rb") as handle:
+                        name = storage.save(result["name"], DjangoFile(handle))
+                transaction.on_commit(lambda path=result["path"], name=name: self.restore_blob(storage, path, name))
+                result["file"] = File(
+                    u_id_id=result["user_id"],
+                    f_name=result["name"],
+                    f_url="",
+                    f_path=name,
+                    f_hash=result["hash"],
+                    f_type=result["content_type"],
+                    f_size=result["size"],
+                    f_category=result["kind"],
+                    f_public_id=result["name"],
+                )
+                new_files.append(result["file"])
+            File.objects.bulk_create(new_files)
+
+            # One CV per user: the last CV in the batch wins
+            cvs = {r["user_id"]: r for r in results if r["kind"] == "cv" and "file" in r}
+            current = {cv.user_id_id: cv for cv in Cv.objects.filter(user_id__in=cvs)}
+            now = timezone.now()
+            for cv in current.values():
+                cv.c_f_id = cvs[cv.user_id_id]["file"]
+                cv.c_content = cvs[cv.user_id_id]["cleaned"]
+                cv.updated_at = now
+            Cv.objects.bulk_update(current.values(), ["c_f_id", "c_content", "updated_at"])
+            Cv.objects.bulk_create(
+                Cv(user_id_id=user_id, c_f_id=r["file"], c_content=r["cleaned"])
+                for user_id, r in cvs.items()
+                if user_id not in current
+            )
+
+        for result in results:
+            extractor.store_text(extractor.backend(result["content_type"]), result["hash"], result["raw"])
+            state.record(
+                "imported", key=result["key"], user_id=result["user_id"], kind=result["kind"],
+                hash=result["hash"], content_type=result["content_type"], duplicate=bool(result.get("duplicate")),
+            )
+            counts["duplicate" if result.get("duplicate") else "imported"] += 1
+            if parser is not None and result["kind"] == "cv" and not result.get("duplicate"):
+                parser.add(result["key"], result["user_id"], result["raw"] or result["cleaned"])
+
+    def requeue_unparsed(self, state, parser):
+        """Queue parsing for CVs imported by an interrupted run that never got queued"""
+        for key, entry in state.imported.items():
+            if entry["kind"] != "cv" or entry.get("duplicate") or key in state.queued:
+                continue
+            text = extractor.cached_text(extractor.backend(entry["content_type"]), entry["hash"])
+            if text is None:
+                cv = Cv.objects.filter(user_id=entry["user_id"]).first()
+                text = cv.c_content if cv else None
+            if text:
+                parser.add(key, entry["user_id"], text)
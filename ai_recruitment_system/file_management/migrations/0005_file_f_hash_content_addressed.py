@@ -0,0 +1,42 @@
+import hashlib
+import file_management.storage
+from django.db import migrations, models
+
+
+def hash_stored_files(apps, schema_editor):
+    # Existing files stay where they are; they only get their content hash
+    File = apps.get_model("file_management", "File")
+    for file in File.objects.exclude(f_path="").exclude(f_path__isnull=True).iterator():
+        try:
+            with file.f_path.open("rb") as stored:
+                digest = hashlib.sha256()
+                for chunk in stored.chunks():
+                    digest.update(chunk)
+        except (FileNotFoundError, ValueError):
+            continue
+        File.objects.filter(pk=file.pk).update(f_hash=digest.hexdigest())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("file_management", "0004_file_f_path_alter_file_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="f_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name="file",
+            name="f_path",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=file_management.storage.ContentAddressedStorage,
+                upload_to="cv/",
+            ),
+        ),
+        migrations.RunPython(hash_stored_files, migrations.RunPython.noop),
+    ]
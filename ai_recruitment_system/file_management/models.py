@@ -1,17 +1,23 @@
-from django.db import models
+import logging
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from cloudinary.models import CloudinaryField
 from company_management.models import Company
-from file_management.storage import LocalMediaStorage
+from file_management.storage import ContentAddressedStorage, blob_hash
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
 
-local_storage =  LocalMediaStorage
+
+local_storage =  ContentAddressedStorage
 class File(models.Model):
     u_id = models.ForeignKey('user_management.User', on_delete=models.CASCADE, blank=True, null=True)
     c_id = models.ForeignKey(Company, on_delete=models.CASCADE, blank=True, null=True)
     f_name = models.CharField(max_length=255)
     f_url =  CloudinaryField('f_url', blank=True, null=True)  
     f_path =  models.FileField(storage=local_storage, upload_to='cv/', blank=True, null=True)
+    f_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     f_type = models.CharField(max_length=255)
     f_size = models.CharField(max_length=255)
     f_public_id= models.CharField(max_length=255, blank=True, null=True)
@@ -24,4 +30,46 @@ class File(models.Model):
 
     class Meta:
         managed = True
-        db_table = 'file'
\ No newline at end of file
+        db_table = 'file'
+
+    def save(self, *args, **kwargs):
+        if self.f_path and not self.f_path._committed:
+            # Store the content now so the row is saved with its content hash
+            content = self.f_path.file
+            self.f_path.save(self.f_path.name, content, save=False)
+            # The blob may be an existing one that release_blob collects before
+            # this row commits; write it again if so
+            storage, name = self.f_path.storage, self.f_path.name
+            transaction.on_commit(lambda: restore_blob(storage, content, name))
+        if self.f_path:
+            self.f_hash = blob_hash(self.f_path.name) or self.f_hash
+        super().save(*args, **kwargs)
+
+
+def restore_blob(storage, content, name=None):
+    try:
+        storage.restore(content, name)
+    except (OSError, ValueError) as e:
+        logger.error("Could not restore stored content %s: %s", getattr(content, 'name', ''), e)
+
+
+def release_blob(name):
+    """Delete stored content once no File row references it"""
+    if not name:
+        return False
+    storage = File._meta.get_field('f_path').storage
+    # Under the blob's lock, so an upload of the same content either sees the
+    # blob gone and writes it again, or is committed before the check
+    with storage.blob_lock(name):
+        if File.objects.filter(f_path=name).exists():
+            return False
+        storage.delete(name)
+    return True
+
+
+@receiver(post_delete, sender=File)
+def collect_file_blob(sender, instance, **kwargs):
+    # Covers cascades from users/companies too; runs once the delete is committed
+    if instance.f_path:
+        name = instance.f_path.name
+        transaction.on_commit(lambda: release_blob(name))
@@ -11,6 +11,7 @@ class FileSerializer(serializers.ModelSerializer):
             'f_name',
             'f_url',
             'f_path',
+            'f_hash',
             'f_type',
             'f_size',
             'f_public_id',
@@ -25,6 +26,7 @@ class FileSerializer(serializers.ModelSerializer):
             'id',
             'f_url',
             'f_path',
+            'f_hash',
             'f_uploaded_at',
             'created_at',
             'updated_at',
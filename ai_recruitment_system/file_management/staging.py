@@ -0,0 +1,107 @@
+import hashlib
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+from django.conf import settings
+from django.core.files import File as DjangoFile
+
+
+DEFAULT_STAGING_SETTINGS = {
+    "ROOT": None,  # defaults to <PRIVATE_MEDIA_ROOT>/staging, shared by web and workers
+    "CHUNK_SIZE": 256 * 1024,
+    "MAX_AGE": 60 * 60 * 24,  # seconds before an unclaimed upload is purged
+}
+
+HANDLE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class StagedUploadError(Exception):
+    pass
+
+
+def staging_settings() -> Dict[str, Any]:
+    options = {**DEFAULT_STAGING_SETTINGS, **getattr(settings, "FILE_STAGING", {})}
+    options["ROOT"] = options["ROOT"] or os.path.join(settings.PRIVATE_MEDIA_ROOT, "staging")
+    return options
+
+
+def staged_path(upload: Dict[str, Any]) -> str:
+    handle = str(upload.get("handle", ""))
+    if not HANDLE.match(handle):
+        raise StagedUploadError(f"Invalid staged upload handle: {handle!r}")
+    return os.path.join(staging_settings()["ROOT"], handle)
+
+
+def stage_upload(uploaded_file) -> Dict[str, Any]:
+    """Spool an uploaded file to the staging directory in chunks.
+
+    Returns the small handle passed to Celery tasks in place of the file
+    bytes: {"handle", "sha256", "size"}.
+    """
+    options = staging_settings()
+    os.makedirs(options["ROOT"], exist_ok=True)
+    handle = uuid.uuid4().hex
+    path = os.path.join(options["ROOT"], handle)
+    partial = f"{path}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial, "wb") as spool:
+            for chunk in uploaded_file.chunks(options["CHUNK_SIZE"]):
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return {"handle": handle, "sha256": digest.hexdigest(), "size": size}
+
+
+@contextmanager
+def open_staged(upload: Dict[str, Any], name: str) -> Iterator[DjangoFile]:
+    """Open a staged upload as a Django File named name, after checking its checksum"""
+    path = staged_path(upload)
+    if not os.path.isfile(path):
+        raise StagedUploadError(f"Staged upload {upload.get('handle')} no longer exists")
+
+    chunk_size = staging_settings()["CHUNK_SIZE"]
+    with open(path, "rb") as handle:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+        if digest.hexdigest() != upload.get("sha256"):
+            raise StagedUploadError(f"Checksum mismatch for staged upload {upload.get('handle')}")
+        handle.seek(0)
+        yield DjangoFile(handle, name=name)
+
+
+def discard_staged(upload: Dict[str, Any]):
+    try:
+        os.remove(staged_path(upload))
+    except (FileNotFoundError, StagedUploadError):
+        pass
+
+
+def purge_stale_uploads(max_age=None) -> int:
+    """Delete staged uploads no task claimed within max_age seconds"""
+    options = staging_settings()
+    max_age = options["MAX_AGE"] if max_age is None else max_age
+    if not os.path.isdir(options["ROOT"]):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    with os.scandir(options["ROOT"]) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
@@ -1,8 +1,76 @@
+import fcntl
+import hashlib
+import os
+import re
+from contextlib import contextmanager
 from django.core.files.storage import FileSystemStorage
 from django.conf import settings
 
+BLOB_PREFIX = 'blobs'
+BLOB_NAME = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+
+
 class LocalMediaStorage(FileSystemStorage):
     def __init__(self, *args, **kwargs):
         kwargs['location'] = settings.PRIVATE_MEDIA_ROOT
         kwargs['base_url'] = settings.PRIVATE_MEDIA_URL
         super().__init__(*args, **kwargs)
+
+
+def blob_name(digest):
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest}'
+
+
+def blob_hash(name):
+    """SHA-256 of a content-addressed file name, None for anything else"""
+    match = BLOB_NAME.match(name or '')
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(LocalMediaStorage):
+    """Stores each distinct content once, named by its SHA-256.
+
+    Saving bytes that are already stored returns the existing name without
+    writing, so File rows with identical content share one blob. Blobs are
+    removed by file_management.models.release_blob once no row references them.
+    Writes and releases of one blob are serialised by blob_lock; restore()
+    puts back a blob that was released before the row using it committed.
+    """
+
+    @contextmanager
+    def blob_lock(self, name):
+        """Exclusive per-blob lock shared by every process using this storage"""
+        path = self.path(f'{BLOB_PREFIX}/.locks/{os.path.basename(name)}.lock')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        name = blob_name(digest.hexdigest())
+        with self.blob_lock(name):
+            if self.exists(name):
+                return name
+
+            saved = super()._save(name, content)
+            if saved != name:
+                # An identical upload was written between exists() and _save()
+                self.delete(saved)
+        return name
+
+    def restore(self, content, name=None):
+        """Write content again if its blob is missing; returns the blob name.
+
+        Call once the referencing row is committed: a blob that still exists
+        then can no longer be released under it, so it is not re-hashed.
+        """
+        if name and self.exists(name):
+            return name
+        return self._save(None, content)
+
@@ -1,36 +1,39 @@
 import cloudinary.uploader
 from celery import shared_task
-from .models import File
-from io import BytesIO
+from .models import File, release_blob
 from user_management.models import Profile,   Cv
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
-import os
-import pymupdf
+from django.utils import timezone
 import re
 import nltk
 nltk.download('stopwords')
 from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-from docx import Document
 from job_management.models import Job, Application
 from ai_agent_management.tasks import parse_cv_task
+from ai_agent_management.idempotency import submit_once
+from .extraction import DOCX, PDF
+from .ingestion import ingestor
+from .staging import discard_staged, open_staged, purge_stale_uploads
 User = get_user_model()
 
 
-def get_docx_content(file_path):
+def get_docx_content(file_path, content_hash=None):
     try:
-        doc = Document(file_path)
-        return "\n".join(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
+        result = ingestor.ingest(file_path, DOCX, content_hash=content_hash)
+        if not result.ok:
+            return f"Error extracting DOCX content: {result.error}"
+        return result.text
 
     except Exception as e:
         return f"Error extracting DOCX content: {str(e)}"
-def get_pdf_content(file_path):
+def get_pdf_content(file_path, content_hash=None):
     try:
-         
-
-        doc = pymupdf.open(file_path)
-        return "\n".join(page.get_text() for page in doc)
+        # Sandboxed: a pathological PDF is killed and quarantined instead of hanging the worker
+        result = ingestor.ingest(file_path, PDF, content_hash=content_hash)
+        if not result.ok:
+            return f"Error extracting PDF content: {result.error}"
+        return result.text
 
     except Exception as e:
         return f"Error extracting PDF content: {str(e)}"
@@ -50,12 +53,10 @@ def clean_text(text):
     return ' '.join(words)
 
 @shared_task
-def upload_file_and_save(file_data_bytes, file_name, file_type, file_size, user_id=None, company_id=None, category='p_picture'):
+def upload_file_and_save(upload, file_name, file_type, file_size, user_id=None, company_id=None, category='p_picture'):
     try:
-        file_obj = BytesIO(file_data_bytes)
-        file_obj.name = file_name
-
-        upload_result = cloudinary.uploader.upload(file_obj)
+        with open_staged(upload, file_name) as file_obj:
+            upload_result = cloudinary.uploader.upload(file_obj)
 
         file = File.objects.create(
             u_id_id=user_id,
@@ -88,6 +89,8 @@ def upload_file_and_save(file_data_bytes, file_name, file_type, file_size, user_
 
     except Exception as e:
         return f"Failed to upload: {str(e)}"
+    finally:
+        discard_staged(upload)
     
 
 @shared_task
@@ -96,8 +99,7 @@ def delete_file(file_id):
         file = File.objects.get(id=file_id)
         if file.f_url and file.f_public_id:
             cloudinary.uploader.destroy(file.f_public_id)
-        if file.f_path and file.f_path.path and os.path.isfile(file.f_path.path):
-            os.remove(file.f_path.path)
+        # Stored content is released once no other File row references it
         file.delete()
         return f"File with ID {file_id} deleted successfully."
     except File.DoesNotExist:
@@ -108,111 +110,116 @@ def delete_file(file_id):
 
 
 @shared_task
-def update_file(file_id, new_file_data_bytes, new_file_name, new_file_type, new_file_size, category="cv"):
+def update_file(file_id, new_upload, new_file_name, new_file_type, new_file_size, category="cv"):
     try:
         file = File.objects.get(id=file_id)
-        new_file_obj = BytesIO(new_file_data_bytes)
-        new_file_obj.name = new_file_name
-
-
-        if file.f_url:
-             cloudinary.uploader.upload(new_file_obj, public_id=file.f_public_id, overwrite=True)
-
-        if file.f_path and file.f_path.path and category == "cv":
-            
-            content_file = ContentFile(new_file_data_bytes, name=new_file_name)
-            user_id=file.u_id.id
-            os.remove(file.f_path.path)
-            file.delete()
-            
-            cv_file= File.objects.create(
-                        u_id_id=user_id,
-                        c_id_id=None,
-                        f_name=new_file_name,
-                        f_url='',
-                        f_path=content_file,
-                        f_type=new_file_type,
-                        f_size=new_file_size,
-                        f_category=category,
-                        f_public_id=new_file_name,
-                        f_format=None,
-                        f_resource_type=None
-                )
-            cv= Cv.objects.filter(user_id=user_id).first()
-            if cv:
-                cv.c_f_id = cv_file
-               
-
-            if new_file_type == "application/pdf":
-                pdf_content = clean_text(get_pdf_content(cv_file.f_path.path))
-                cv.c_content = pdf_content.strip()
-            if new_file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                docx_content = get_docx_content(cv_file.f_path.path)
-                cv.c_content = clean_text(docx_content).strip()
-            
-            cv.save()
+        with open_staged(new_upload, new_file_name) as new_file_obj:
+
+            if file.f_url:
+                 cloudinary.uploader.upload(new_file_obj, public_id=file.f_public_id, overwrite=True)
+                 new_file_obj.seek(0)
+
+            if file.f_path and file.f_path.path and category == "cv":
+
+                user_id=file.u_id.id
+                old_name = file.f_path.name
+                # Re-uploading the same CV points the row back at the same stored blob
+                file.f_name = new_file_name
+                file.f_path = new_file_obj
+                file.f_type = new_file_type
+                file.f_size = new_file_size
+                file.f_public_id = new_file_name
+                file.updated_at = timezone.now()
+                file.save()
+                release_blob(old_name)
+
+                cv_file = file
+                cv= Cv.objects.filter(user_id=user_id).first()
+                if cv:
+                    cv.c_f_id = cv_file
+
+
+                if new_file_type == "application/pdf":
+                    pdf_content = clean_text(get_pdf_content(cv_file.f_path.path, cv_file.f_hash))
+                    cv.c_content = pdf_content.strip()
+                if new_file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+                    docx_content = get_docx_content(cv_file.f_path.path, cv_file.f_hash)
+                    cv.c_content = clean_text(docx_content).strip()
+
+                cv.save()
         return f"File with ID {file_id} updated successfully."
     except File.DoesNotExist:
         return f"File with ID {file_id} does not exist."
     except Exception as e:
         return f"Failed to update file: {str(e)}"
+    finally:
+        discard_staged(new_upload)
     
 @shared_task
-def save_cv_file(file_data_bytes, file_name, file_type, file_size, user_id=None, company_id=None, category='p_picture'):
+def save_cv_file(upload, file_name, file_type, file_size, user_id=None, company_id=None, category='p_picture'):
     try:
-        content_file = ContentFile(file_data_bytes, name=file_name)
-        cv_file= File.objects.create(
-                u_id_id=user_id,
-                c_id_id=company_id,
-                f_name=file_name,
-                f_url='',
-                f_path=content_file,
-                f_type=file_type,
-                f_size=file_size,
-                f_category=category,
-                f_public_id=file_name,
-                f_format=None,
-                f_resource_type=None
-            )
+        with open_staged(upload, file_name) as content_file:
+            cv_file= File.objects.create(
+                    u_id_id=user_id,
+                    c_id_id=company_id,
+                    f_name=file_name,
+                    f_url='',
+                    f_path=content_file,
+                    f_type=file_type,
+                    f_size=file_size,
+                    f_category=category,
+                    f_public_id=file_name,
+                    f_format=None,
+                    f_resource_type=None
+                )
         cv= Cv.objects.filter(user_id=user_id).first()
         if cv:
             cv.c_f_id = cv_file
+        raw_content = ""
         if file_type == "application/pdf":
-            pdf_content = clean_text(get_pdf_content(cv_file.f_path.path))
+            raw_content = get_pdf_content(cv_file.f_path.path, cv_file.f_hash)
+            pdf_content = clean_text(raw_content)
             cv.c_content = pdf_content.strip()
         if file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            docx_content = get_docx_content(cv_file.f_path.path)
-            cv.c_content = clean_text(docx_content).strip()
+            raw_content = get_docx_content(cv_file.f_path.path, cv_file.f_hash)
+            cv.c_content = clean_text(raw_content).strip()
         cv.save()
-        parse_cv_task.delay(user_id, cv.c_content)
+        # The parser gets the original lines so long CVs can be compressed by section
+        submit_once(parse_cv_task, user_id, raw_content or cv.c_content)
         
         return f"File '{file_name}' saved successfully"
     except Exception as e:
         return f"Failed to save CV file: {str(e)}"
+    finally:
+        discard_staged(upload)
 
 
 
 
 
 @shared_task
-def save_job_attachment(file_data_bytes, file_name, file_type, file_size, user_id=None, company_id=None, job_id=None, category='job_attachment'):
+def save_job_attachment(upload, file_name, file_type, file_size, user_id=None, company_id=None, job_id=None, category='job_attachment'):
     if not job_id and not user_id:
+        discard_staged(upload)
         return "Job ID and User ID are required to save job attachments."
-    content_file=ContentFile(file_data_bytes, name=file_name)
-    file = File.objects.create(
-          u_id_id=user_id,
-            c_id_id=None,
-            f_name=file_name,
-            f_url='',
-            f_path=content_file,
-            f_type=file_type,
-            f_size=file_size,
-            f_category=category,
-            f_public_id=file_name,
-            f_format=None,
-            f_resource_type=None
-        
-    )
+    try:
+        with open_staged(upload, file_name) as content_file:
+            file = File.objects.create(
+                  u_id_id=user_id,
+                    c_id_id=None,
+                    f_name=file_name,
+                    f_url='',
+                    f_path=content_file,
+                    f_type=file_type,
+                    f_size=file_size,
+                    f_category=category,
+                    f_public_id=file_name,
+                    f_format=None,
+                    f_resource_type=None
+
+            )
+    finally:
+        discard_staged(upload)
     job= Job.objects.filter(id=job_id).first()
     if job:
         job.j_attachments.add(file)
@@ -224,34 +231,38 @@ def save_job_attachment(file_data_bytes, file_name, file_type, file_size, user_i
 
 
 @shared_task
-def save_job_application_attachment(file_data_bytes, file_name, file_type, file_size, user_id=None, application_id=None, job_id=None, category='job_attachment'):
+def save_job_application_attachment(upload, file_name, file_type, file_size, user_id=None, application_id=None, job_id=None, category='job_attachment'):
     if not job_id and not user_id:
+        discard_staged(upload)
         return "Job ID and User ID are required to save job attachments."
-    content_file=ContentFile(file_data_bytes, name=file_name)
-    file = File.objects.create(
-          u_id_id=user_id,
-            c_id_id=None,
-            f_name=file_name,
-            f_url='',
-            f_path=content_file,
-            f_type=file_type,
-            f_size=file_size,
-            f_category=category,
-            f_public_id=file_name,
-            f_format=None,
-            f_resource_type=None
-        
-    )
+    try:
+        with open_staged(upload, file_name) as content_file:
+            file = File.objects.create(
+                  u_id_id=user_id,
+                    c_id_id=None,
+                    f_name=file_name,
+                    f_url='',
+                    f_path=content_file,
+                    f_type=file_type,
+                    f_size=file_size,
+                    f_category=category,
+                    f_public_id=file_name,
+                    f_format=None,
+                    f_resource_type=None
+
+            )
+    finally:
+        discard_staged(upload)
     application= Application.objects.filter(id=application_id).first()
     if application:
         application.a_cover_letter=file
     else:
         return f"Job application with ID {job_id} does not exist."
     if file_type == "application/pdf":
-        pdf_content = clean_text(get_pdf_content(file.f_path.path))
+        pdf_content = clean_text(get_pdf_content(file.f_path.path, file.f_hash))
         application.a_cover_letter_content = pdf_content.strip()
     if file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        docx_content = get_docx_content(file.f_path.path)
+        docx_content = get_docx_content(file.f_path.path, file.f_hash)
         application.a_cover_letter_content = clean_text(docx_content).strip()
     application.save()
    
@@ -275,38 +286,24 @@ def delete_job_attachment(file_id, job_id):
     except Exception as e:
         return f"Failed to delete file: {str(e)}"
 @shared_task 
-def update_job_attachment(file_id, new_file_data_bytes, new_file_name, new_file_type, new_file_size, job_id):
+def update_job_attachment(file_id, new_upload, new_file_name, new_file_type, new_file_size, job_id):
     try:
         file = File.objects.get(id=file_id)
-        new_file_obj = BytesIO(new_file_data_bytes)
-        new_file_obj.name = new_file_name
         job= Job.objects.get(id=job_id)
  
 
         if file.f_path and file.f_path.path and file in job.j_attachments.all():
-            
-            content_file = ContentFile(new_file_data_bytes, name=new_file_name)
-            user_id=file.u_id.id
-            os.remove(file.f_path.path)
-            job.j_attachments.remove(file)
-            file.delete()
-            
-            new_file= File.objects.create(
-                        u_id_id=user_id,
-                        c_id_id=None,
-                        f_name=new_file_name,
-                        f_url='',
-                        f_path=content_file,
-                        f_type=new_file_type,
-                        f_size=new_file_size,
-                        f_category="job_attachment",
-                        f_public_id=new_file_name,
-                        f_format=None,
-                        f_resource_type=None
-                )
- 
-            
-            job.j_attachments.add(new_file)
+
+            with open_staged(new_upload, new_file_name) as content_file:
+                old_name = file.f_path.name
+                file.f_name = new_file_name
+                file.f_path = content_file
+                file.f_type = new_file_type
+                file.f_size = new_file_size
+                file.f_public_id = new_file_name
+                file.updated_at = timezone.now()
+                file.save()
+                release_blob(old_name)
             job.save()
 
         return f"File with ID {file_id} updated successfully."
@@ -314,4 +311,12 @@ def update_job_attachment(file_id, new_file_data_bytes, new_file_name, new_file_
         return f"File with ID {file_id} does not exist."
     except Exception as e:
         return f"Failed to update file: {str(e)}"
+    finally:
+        discard_staged(new_upload)
+
+
+@shared_task
+def purge_staged_uploads():
+    """Remove staged uploads that no task picked up"""
+    return purge_stale_uploads()
 
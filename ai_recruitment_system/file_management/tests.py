@@ -1,3 +1,254 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from .extraction import BACKENDS, ExtractionBackend, TXT
+from .ingestion import DocumentIngestor, _rss_mb
+from .models import File, release_blob
+from .staging import StagedUploadError, discard_staged, open_staged, purge_stale_uploads, stage_upload
+from .storage import ContentAddressedStorage, blob_hash, blob_name
 
-# Create your tests here.
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        overrides = override_settings(PRIVATE_MEDIA_ROOT=self.root, PRIVATE_MEDIA_URL="/private/", FILE_STAGING={})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+
+class StagingTests(TemporaryMediaMixin, SimpleTestCase):
+    def test_staged_upload_round_trip(self):
+        upload = stage_upload(SimpleUploadedFile("cv.pdf", b"%PDF-1.4 content"))
+        self.assertEqual(upload["size"], 16)
+        self.assertEqual(upload["sha256"], hashlib.sha256(b"%PDF-1.4 content").hexdigest())
+        with open_staged(upload, "cv.pdf") as staged:
+            self.assertEqual(staged.name, "cv.pdf")
+            self.assertEqual(staged.read(), b"%PDF-1.4 content")
+
+        discard_staged(upload)
+        with self.assertRaises(StagedUploadError):
+            with open_staged(upload, "cv.pdf"):
+                pass
+
+    def test_changed_content_fails_the_checksum(self):
+        upload = stage_upload(SimpleUploadedFile("cv.pdf", b"original"))
+        with open(os.path.join(self.root, "staging", upload["handle"]), "wb") as staged:
+            staged.write(b"tampered")
+        with self.assertRaises(StagedUploadError):
+            with open_staged(upload, "cv.pdf"):
+                pass
+
+    def test_handles_cannot_leave_the_staging_directory(self):
+        with self.assertRaises(StagedUploadError):
+            with open_staged({"handle": "../settings.py", "sha256": ""}, "x"):
+                pass
+
+    def test_only_stale_uploads_are_purged(self):
+        old = stage_upload(SimpleUploadedFile("old.pdf", b"old"))
+        new = stage_upload(SimpleUploadedFile("new.pdf", b"new"))
+        old_path = os.path.join(self.root, "staging", old["handle"])
+        os.utime(old_path, (time.time() - 7200, time.time() - 7200))
+
+        self.assertEqual(purge_stale_uploads(max_age=3600), 1)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "staging", new["handle"])))
+
+
+class ContentAddressedStorageTests(TemporaryMediaMixin, SimpleTestCase):
+    def test_identical_content_is_stored_once(self):
+        storage = ContentAddressedStorage()
+        first = storage.save("a.pdf", ContentFile(b"same bytes"))
+        second = storage.save("b.pdf", ContentFile(b"same bytes"))
+        other = storage.save("a.pdf", ContentFile(b"other bytes"))
+
+        digest = hashlib.sha256(b"same bytes").hexdigest()
+        self.assertEqual(first, blob_name(digest))
+        self.assertEqual(second, first)
+        self.assertNotEqual(other, first)
+        self.assertEqual(os.listdir(os.path.join(self.root, "blobs", digest[:2])), [digest])
+        with storage.open(first) as blob:
+            self.assertEqual(blob.read(), b"same bytes")
+
+    def test_blob_hash_only_reads_content_addressed_names(self):
+        digest = "ab" + "0" * 62
+        self.assertEqual(blob_hash(blob_name(digest)), digest)
+        self.assertIsNone(blob_hash("uploads/cv.pdf"))
+        self.assertIsNone(blob_hash(None))
+
+
+class BlobReleaseTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # The field's storage was built at import time; point it at the temporary root
+        patcher = mock.patch.object(File._meta.get_field("f_path"), "storage", ContentAddressedStorage())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, content):
+        return File.objects.create(
+            f_name="cv.pdf",
+            f_path=ContentFile(content, name="cv.pdf"),
+            f_type="application/pdf",
+            f_size=str(len(content)),
+            f_category="cv",
+        )
+
+    def test_blob_is_released_with_its_last_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.upload(b"cv bytes")
+            second = self.upload(b"cv bytes")
+        path = first.f_path.path
+        self.assertEqual(second.f_path.name, first.f_path.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_upload_survives_a_release_before_it_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.upload(b"cv bytes")
+        original = ContentAddressedStorage._save
+        released = []
+
+        def save_then_release(storage, name, content):
+            saved = original(storage, name, content)
+            if not released:
+                # The only other row goes away and its blob is collected while
+                # this upload is stored but not yet committed
+                File.objects.filter(pk=first.pk).delete()
+                released.append(release_blob(saved))
+            return saved
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(ContentAddressedStorage, "_save", save_then_release):
+                second = self.upload(b"cv bytes")
+
+        self.assertEqual(released, [True])
+        self.assertEqual(second.f_path.name, first.f_path.name)
+        with open(second.f_path.path, "rb") as blob:
+            self.assertEqual(blob.read(), b"cv bytes")
+
+
+class SlowBackend(ExtractionBackend):
+    name = "test-slow"
+
+    def extract_pages(self, path, start=0, stop=None):
+        time.sleep(10)
+        return [""]
+
+
+class SpinBackend(ExtractionBackend):
+    name = "test-spin"
+
+    def extract_pages(self, path, start=0, stop=None):
+        while True:
+            pass
+
+
+class GreedyBackend(ExtractionBackend):
+    name = "test-greedy"
+
+    def extract_pages(self, path, start=0, stop=None):
+        held = []
+        for _ in range(32):
+            held.append(b"x" * (32 * 1024 * 1024))
+            time.sleep(0.05)
+        return [str(len(held))]
+
+
+class BrokenBackend(ExtractionBackend):
+    name = "test-broken"
+
+    def extract_pages(self, path, start=0, stop=None):
+        raise ValueError("not a PDF")
+
+
+class PagedBackend(ExtractionBackend):
+    name = "test-paged"
+
+    def iter_pages(self, path):
+        yield "first page"
+        yield "second page"
+
+
+@mock.patch("file_management.extraction.get_redis_client", return_value=None)
+@mock.patch("file_management.ingestion.get_redis_client", return_value=None)
+@mock.patch.dict(BACKENDS, {b.name: b for b in (SlowBackend(), SpinBackend(), GreedyBackend(), BrokenBackend(), PagedBackend())})
+class DocumentIngestorTests(SimpleTestCase):
+    def setUp(self):
+        document = tempfile.NamedTemporaryFile(suffix=".txt", delete=False)
+        document.write(b"resume")
+        document.close()
+        self.path = document.name
+        self.addCleanup(os.remove, self.path)
+        # The forked sandbox starts out sharing this process's resident pages
+        self.ingestor = DocumentIngestor(
+            {
+                "START_METHOD": "fork",
+                "TIMEOUT": 3,
+                "CPU_SECONDS": 1,
+                "MAX_ADDRESS_SPACE_MB": 0,
+                "MAX_RSS_MB": (_rss_mb(os.getpid()) or 0) + 128,
+                "CHECK_INTERVAL": 0.05,
+            }
+        )
+
+    def ingest(self, backend_name):
+        with mock.patch("file_management.ingestion.extractor.backend", return_value=BACKENDS[backend_name]):
+            return self.ingestor.ingest(self.path, TXT)
+
+    def test_pages_stream_back_from_the_sandbox(self, *mocks):
+        result = self.ingest("test-paged")
+        self.assertTrue(result.ok)
+        self.assertEqual((result.text, result.pages), ("first page\nsecond page", 2))
+
+    def test_slow_documents_are_stopped_at_the_timeout(self, *mocks):
+        started = time.monotonic()
+        with mock.patch.object(self.ingestor, "quarantine") as quarantine:
+            result = self.ingest("test-slow")
+        self.assertLess(time.monotonic() - started, 6)
+        self.assertEqual(result.status, "quarantined")
+        self.assertIn("timed out", result.error)
+        quarantine.assert_called_once()
+
+    def test_busy_loops_hit_the_cpu_limit(self, *mocks):
+        result = self.ingest("test-spin")
+        self.assertEqual((result.status, result.error), ("quarantined", "CPU time limit exceeded"))
+
+    def test_runaway_allocations_hit_the_memory_limit(self, *mocks):
+        result = self.ingest("test-greedy")
+        self.assertEqual(result.status, "quarantined")
+        self.assertIn("resident memory", result.error)
+
+    def test_extractor_errors_fail_without_quarantine(self, *mocks):
+        with mock.patch.object(self.ingestor, "quarantine") as quarantine:
+            result = self.ingest("test-broken")
+        self.assertEqual(result.status, "failed")
+        self.assertIn("not a PDF", result.error)
+        quarantine.assert_not_called()
+
+    def test_daemonic_workers_do_not_extract_unsandboxed(self, *mocks):
+        with mock.patch(
+            "multiprocessing.process.BaseProcess.start",
+            side_effect=AssertionError("daemonic processes are not allowed to have children"),
+        ):
+            result = self.ingest("test-paged")
+        self.assertEqual(result.status, "failed")
+        self.assertIn("sandboxed extraction is unavailable", result.error)
+
+    def test_quarantined_documents_fail_fast(self, *mocks):
+        with mock.patch.object(self.ingestor, "quarantined", return_value={"reason": "timed out after 2s"}):
+            result = self.ingest("test-slow")
+        self.assertEqual((result.status, result.error), ("quarantined", "timed out after 2s"))
@@ -17,7 +17,7 @@ def download_cv_file(request, cv_id):
             return Response({'error': 'No file found for this CV.'}, status=404)
 
         file_path = cv.c_f_id.f_path.path
-        filename = os.path.basename(file_path)
+        filename = cv.c_f_id.f_name or os.path.basename(file_path)
 
         response = FileResponse(open(file_path, 'rb'), as_attachment=True, filename=filename)
         return response
@@ -40,7 +40,7 @@ def download_cv_user_file(request, user_id):
             return Response({'error': 'No file found for this CV.'}, status=404)
 
         file_path = cv.c_f_id.f_path.path
-        filename = os.path.basename(file_path)
+        filename = cv.c_f_id.f_name or os.path.basename(file_path)
 
         response = FileResponse(open(file_path, 'rb'), as_attachment=True, filename=filename)
         return response
@@ -3,6 +3,7 @@ from job_management.models import Job
 from job_management.serializers import JobSerializer
 from user_management.permissions import IsRecruiter, IsAdmin
 from file_management.tasks import save_job_attachment, save_job_application_attachment
+from file_management.staging import stage_upload
 from company_management.models import Company
 from rest_framework.response import Response
 from rest_framework import status
@@ -25,6 +26,7 @@ from job_management.models import ApplicationStage
 from django.utils import timezone
 from django.db import transaction
 from ai_agent_management.tasks import screen_candidates_applications
+from ai_agent_management.fair_share import fair_share
 
 
 class JobViewSet(viewsets.ModelViewSet):
@@ -77,7 +79,7 @@ class JobViewSet(viewsets.ModelViewSet):
                 )
 
             save_job_attachment.delay(
-                file_data_bytes=file.read(),
+                upload=stage_upload(file),
                 file_name=file.name,
                 file_type=file.content_type,
                 file_size=file.size,
@@ -304,7 +306,7 @@ class JobViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             save_job_attachment.delay(
-                file_data_bytes=file.read(),
+                upload=stage_upload(file),
                 file_name=file.name,
                 file_type=file.content_type,
                 file_size=file.size,
@@ -357,7 +359,7 @@ class JobViewSet(viewsets.ModelViewSet):
             )
         update_job_attachment.delay(
             file_id=file.id,
-            new_file_data_bytes=new_file.read(),
+            new_upload=stage_upload(new_file),
             new_file_name=new_file.name,
             new_file_type=new_file.content_type,
             new_file_size=new_file.size,
@@ -480,7 +482,12 @@ class JobViewSet(viewsets.ModelViewSet):
     )
     def screen_with_ai(self, request):
         application_ids = request.data.get("applications", [])
-        screen_candidates_applications.delay(application_ids)
+        company_id = (
+            Application.objects.filter(id__in=application_ids)
+            .values_list("j_id__c_id", flat=True)
+            .first()
+        )
+        fair_share.submit(screen_candidates_applications, company_id, application_ids)
         return Response(
             {
                 "success": True,
@@ -532,7 +539,7 @@ class JobViewSet(viewsets.ModelViewSet):
         applicationStage.save()
 
         save_job_application_attachment.delay(
-            file_data_bytes=file.read(),
+            upload=stage_upload(file),
             file_name=file.name,
             file_type=file.content_type,
             file_size=file.size,
@@ -29,3 +29,34 @@ def send_notification( message, n_type='info', is_read=False, c_id=None,user_id=
                 "message": message
             }
         )
+
+
+@shared_task
+def send_notifications_bulk(notifications):
+    """Create and push many user notifications with one insert.
+
+    Each item carries the send_notification arguments (message, n_type,
+    is_read, user_id, c_id).
+    """
+    notifications = [n for n in notifications if n.get("user_id")]
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                u_id_id=n["user_id"],
+                c_id_id=n.get("c_id"),
+                n_message=n["message"],
+                n_type=n.get("n_type", "info"),
+                n_is_read=n.get("is_read", False),
+            )
+            for n in notifications
+        ]
+    )
+    channel_layer = get_channel_layer()
+    for n in notifications:
+        async_to_sync(channel_layer.group_send)(
+            f"user_{n['user_id']}_notification", {
+                "type": "notify",
+                "message": n["message"]
+            }
+        )
+    return len(notifications)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_recruitment_system.celery import WORKER_ROLES, app, worker_argv
+
+
+class Command(BaseCommand):
+    help = "Start a Celery worker for one class of work (realtime, batch, vision, files, ingest, default or all)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("role", choices=sorted(WORKER_ROLES))
+        parser.add_argument("--concurrency", type=int, default=None)
+        parser.add_argument("--prefetch-multiplier", type=int, default=None)
+        parser.add_argument("--loglevel", default="info")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Print the worker command instead of starting it"
+        )
+
+    def handle(self, *args, **options):
+        role = options["role"]
+        if role not in WORKER_ROLES:
+            raise CommandError(f"Unknown worker role: {role}")
+
+        argv = worker_argv(
+            role,
+            concurrency=options["concurrency"],
+            prefetch_multiplier=options["prefetch_multiplier"],
+        ) + [f"--loglevel={options['loglevel']}"]
+
+        self.stdout.write("celery -A ai_recruitment_system " + " ".join(argv))
+        if not options["dry_run"]:
+            app.worker_main(argv)
@@ -11,6 +11,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from file_management.tasks import upload_file_and_save, delete_file, update_file, save_cv_file
+from file_management.staging import stage_upload
 from user_management.models import Cv
 from notification_management.serializers import NotificationSerializer
 from notification_management.models import Notification
@@ -209,9 +210,8 @@ class UserViewSet(viewsets.ModelViewSet):
             for field in ['p_picture', 'p_cover_picture']:
                 if field in request.FILES:
                     f = request.FILES[field]
-                    file_data_bytes = f.read()
                     upload_file_and_save.delay(
-                        file_data_bytes=file_data_bytes,
+                        upload=stage_upload(f),
                         file_name=f.name,
                         file_type=f.content_type,
                         file_size=f.size,
@@ -236,11 +236,10 @@ class UserViewSet(viewsets.ModelViewSet):
             for field in ['p_picture', 'p_cover_picture']:
                 if field in request.FILES:
                     f = request.FILES[field]
-                    file_data_bytes = f.read()
                     
                     update_file.delay( 
                         file_id=getattr(profile, field).id if getattr(profile, field) else None,
-                        new_file_data_bytes=file_data_bytes,
+                        new_upload=stage_upload(f),
                         new_file_name=f.name,
                         new_file_type=f.content_type,
                         new_file_size=f.size
@@ -286,9 +285,8 @@ class UserViewSet(viewsets.ModelViewSet):
 
             if 'c_f_id' in request.FILES:
                 f = request.FILES['c_f_id']
-                file_data_bytes = f.read()
                 save_cv_file.delay(
-                    file_data_bytes=file_data_bytes,
+                    upload=stage_upload(f),
                     file_name=f.name,
                     file_type=f.content_type,
                     file_size=f.size,
@@ -314,10 +312,9 @@ class UserViewSet(viewsets.ModelViewSet):
             if 'c_f_id' in request.FILES:
                 f = request.FILES['c_f_id']
                 print(f.name, f.content_type, f.size)
-                file_data_bytes = f.read()
                 update_file.delay(
                     file_id=cv.c_f_id.id if cv.c_f_id else None,
-                    new_file_data_bytes=file_data_bytes,
+                    new_upload=stage_upload(f),
                     new_file_name=f.name,
                     new_file_type=f.content_type,
                     new_file_size=f.size
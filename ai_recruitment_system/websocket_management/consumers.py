@@ -36,6 +36,11 @@ from cryptography.hazmat.backends import default_backend
 import os
 from .tasks import process_image_data
 from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
+from ai_agent_management.speculation import draft_settings
+from examination_management.models import ApplicationExam
+from ai_agent_management.tasks import draft_next_interview_question
 
        
  
@@ -273,6 +278,12 @@ class AudioConsumer(AsyncWebsocketConsumer):
         self.recognizer = KaldiRecognizer(self.vosk_model, self.sample_rate)
         self.recognizer.SetWords(True)
         self.recognizer.SetPartialWords(True)
+        # Speculative next-question drafting from partial transcripts
+        self.exam_id = None
+        self.draft_options = draft_settings()
+        self.drafted_words = 0
+        self.last_draft_at = 0.0
+        self.drafts_this_turn = 0
         print(f"Vosk initialized: {self.sample_rate}Hz, chunk_size: {self.chunk_size}")
         
     async def connect(self):
@@ -281,6 +292,9 @@ class AudioConsumer(AsyncWebsocketConsumer):
         if user.is_authenticated:
             self.group_name = f"user_{user.id}_audio"
             await self.channel_layer.group_add(self.group_name, self.channel_name)
+            query_params = parse_qs(self.scope["query_string"].decode("utf8"))
+            # Drafts are only made for the candidate's own interview
+            self.exam_id = await self.owned_exam_id(query_params.get("examId", [None])[0], user)
             
          
        
@@ -458,6 +472,8 @@ class AudioConsumer(AsyncWebsocketConsumer):
                 confidence = result.get("confidence", 0)
                 
                 if transcript:
+                     self.accumulated_transcript = f"{self.accumulated_transcript} {transcript}".strip()
+                     await self.maybe_draft_next_question("")
                      await channel_layer.group_send(
                         f"user_{user.id}_audio",
                    {
@@ -478,6 +494,7 @@ class AudioConsumer(AsyncWebsocketConsumer):
                 partial = partial_result.get("partial", "").strip()
                 
                 if partial:
+                   await self.maybe_draft_next_question(partial)
                    await channel_layer.group_send(
                         f"user_{user.id}_audio",
                    {
@@ -498,6 +515,50 @@ class AudioConsumer(AsyncWebsocketConsumer):
                 "message": f"Speech recognition error: {str(e)}"
             }))
 
+    @database_sync_to_async
+    def owned_exam_id(self, exam_id, user):
+        if not exam_id:
+            return None
+        try:
+            owned = ApplicationExam.objects.filter(id=exam_id, a_id__u_id=user).exists()
+        except (ValueError, TypeError):
+            return None
+        return exam_id if owned else None
+
+    async def maybe_draft_next_question(self, partial):
+        """Start drafting the next interview question once the answer has grown enough"""
+        if not self.exam_id or not self.draft_options["ENABLED"]:
+            return
+        if self.drafts_this_turn >= self.draft_options["MAX_PER_TURN"]:
+            return
+        transcript = f"{self.accumulated_transcript} {partial}".strip()
+        words = len(transcript.split())
+        now = time.time()
+        if (
+            words < self.draft_options["MIN_WORDS"]
+            or words - self.drafted_words < self.draft_options["MIN_NEW_WORDS"]
+            or now - self.last_draft_at < self.draft_options["MIN_INTERVAL"]
+        ):
+            return
+        self.drafted_words = words
+        self.last_draft_at = now
+        self.drafts_this_turn += 1
+        # Enqueueing talks to the broker; keep it off the event loop
+        await sync_to_async(draft_next_interview_question.delay)(
+            self.exam_id, self.scope["user"].id, transcript
+        )
+
+    def reset_answer_turn(self):
+        """Forget the transcript and draft allowance of the previous answer"""
+        self.accumulated_transcript = ""
+        self.drafted_words = 0
+        self.last_draft_at = 0.0
+        self.drafts_this_turn = 0
+
+    async def start_answer_turn(self, event):
+        # Sent once the next question is committed; the candidate starts a new answer
+        self.reset_answer_turn()
+
     async def reset_transcription(self):
         """Reset transcription state"""
         try:
@@ -506,7 +567,7 @@ class AudioConsumer(AsyncWebsocketConsumer):
                 self.recognizer.SetWords(True)
                 self.recognizer.SetPartialWords(True)
                 
-            self.accumulated_transcript = ""
+            self.reset_answer_turn()
             self.audio_buffer = b""
             self.last_activity_time = 0
             
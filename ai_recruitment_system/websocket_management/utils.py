@@ -14,4 +14,12 @@ def process_ai_response(response, user_id):
             "message_type": "info"
         }
     )
-    return "Done"
\ No newline at end of file
+    return "Done"
+
+def start_answer_turn(user_id):
+    """Tell the candidate's audio socket that a new question is waiting for an answer"""
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f"user_{user_id}_audio",
+        {"type": "start_answer_turn"}
+    )